@@ -0,0 +1,72 @@
+"""Ingest and query times of the history archive (sndslib.archive) over many archived days.
+
+Usage: python -m benchmarks.archive [--rows 5000] [--days 180]
+
+Ingests --days copies of a generated day into a fresh archive file, then prints the best of
+--repeat runs of each query: one IP's history, the per-day summaries and the period totals.
+"""
+
+from argparse import ArgumentParser
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_data
+from sndslib import sndslib
+from sndslib.archive import Archive
+
+
+DAY = 24 * 60 * 60
+FIRST_DAY = 1577836800  # 01/01/2020
+
+
+def best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    lines = make_data(args.rows).decode('utf-8').split('\r\n')
+    dates = [time.strftime('%m%d%y', time.gmtime(FIRST_DAY + day * DAY)) for day in range(args.days)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = Archive(os.path.join(directory, 'archive.sqlite3'))
+        started = time.perf_counter()
+        for date in dates:
+            archive.ingest(lines, date)
+        ingest_time = time.perf_counter() - started
+        size = os.path.getsize(archive.path)
+        print(f'{args.days} days x {args.rows} rows: ingest {ingest_time:.2f}s '
+              f'({ingest_time / args.days * 1000:.1f} ms/day), {size / 2 ** 20:.1f} MiB')
+
+        ip = lines[len(lines) // 2].split(',', 1)[0]
+        queries = [
+            ('history', lambda: archive.history(ip)),
+            ('history 30 days', lambda: archive.history(ip, dates[-30], dates[-1])),
+            ('summaries', lambda: archive.summaries()),
+            ('totals', lambda: archive.totals()),
+            ('totals of IP', lambda: archive.totals(ip=ip)),
+        ]
+        for name, query in queries:
+            elapsed, _ = best(query, args.repeat)
+            print(f'{name:<16} {elapsed * 1000:>9.2f} ms')
+
+        # Re-ingesting a day keeps the same rows, and its summary matches sndslib.summarize
+        archive.ingest(lines, dates[0])
+        assert archive.summaries(dates[0], dates[0])[dates[0]] == sndslib.summarize(lines), \
+            'archived summary differs from sndslib.summarize'
+        assert len(archive.history(ip)) == args.days, 're-ingest duplicated rows'
+
+
+if __name__ == '__main__':
+    main()
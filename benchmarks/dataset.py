@@ -0,0 +1,66 @@
+"""Memory and aggregation time of SndsDataset and of the mmap binary file versus the list-of-strings form of get_data.
+
+Usage: python -m benchmarks.dataset [--rows 200000]
+"""
+
+from argparse import ArgumentParser
+import tracemalloc
+import tempfile
+import time
+import os
+
+from benchmarks.synthetic import make_data
+from sndslib import mapped, sndslib
+from sndslib.parse import iter_lines
+
+
+def build(label, func):
+    # Time without tracemalloc (which slows allocations down), then measure retained memory
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<40} {elapsed:>8.3f}s {size / 2 ** 20:>10.2f} MiB')
+    return result
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    func()
+    print(f'{label:<40} {time.perf_counter() - started:>8.3f}s')
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+
+    body = make_data(args.rows)
+    print(f'{"operation":<40} {"time":>9} {"retained":>14}')
+    lines = build('list of strings', lambda: list(iter_lines([body])))
+    rows = build('list of dicts', lambda: [sndslib._format_ip_data(line.split(',')) for line in lines])
+    del rows
+    dataset = build('SndsDataset', lambda: sndslib.SndsDataset.from_data(lines))
+
+    timed('summarize(list of strings)', lambda: sndslib.summarize(lines))
+    timed('summarize(SndsDataset)', lambda: sndslib.summarize(dataset))
+    last_ip = lines[-1].split(',', 1)[0]
+    timed('search_ip_status(list of strings)', lambda: sndslib.search_ip_status(last_ip, lines))
+    timed('search_ip_status(SndsDataset)', lambda: sndslib.search_ip_status(last_ip, dataset))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.snds')
+        timed('mapped.write_data(SndsDataset)', lambda: mapped.write_data(path, dataset))
+        print(f'{"binary file size":<40} {os.path.getsize(path) / 2 ** 20:>20.2f} MiB')
+        timed('parse text again (iter_lines + from_data)',
+              lambda: sndslib.SndsDataset.from_data(iter_lines([body])))
+        timed('mapped.open_data + summarize', lambda: mapped.open_data(path).summarize())
+        with mapped.open_data(path, verify=False) as data:
+            timed('mapped get x1000', lambda: [data.get(last_ip) for _ in range(1000)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Scaling of the multi-process parse (sndslib.parallel) over 1, 2, 4 and 8 worker processes.
+
+Usage: python -m benchmarks.parallel [--rows 1000000] [--workers 1 2 4 8]
+
+Each line is the best of --repeat runs with an already started process pool (the pool start-up
+is printed apart), and every result is checked against the single-process parse.
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
+
+from benchmarks.synthetic import make_data
+from sndslib import parallel, sndslib
+from sndslib.dataset import SndsDataset
+from sndslib.parse import iter_lines
+
+
+def best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    body = make_data(args.rows)
+    print(f'{len(body) / 2 ** 20:.1f} MiB, {args.rows} rows, {os.cpu_count()} CPUs')
+
+    summarize_time, summary = best(lambda: sndslib.summarize(iter_lines([body])), args.repeat)
+    dataset_time, dataset = best(lambda: SndsDataset.from_data(iter_lines([body])), args.repeat)
+    print(f'{"workers":<8} {"summarize":>10} {"speedup":>8} {"dataset":>10} {"speedup":>8} {"pool start":>11}')
+    print(f'{"single":<8} {summarize_time:>9.3f}s {1:>7.2f}x {dataset_time:>9.3f}s {1:>7.2f}x')
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Starts the processes before measuring
+            list(pool.map(abs, range(workers)))
+            pool_time = time.perf_counter() - started
+
+            elapsed, result = best(lambda: parallel.summarize(body, workers, executor=pool), args.repeat)
+            assert result == summary, 'parallel summarize differs from the single-process result'
+            parse_elapsed, parsed = best(lambda: parallel.parse_dataset(body, workers, executor=pool), args.repeat)
+            assert parsed.ips == dataset.ips and parsed.texts.strings == dataset.texts.strings, \
+                'parallel dataset differs from the single-process result'
+
+        print(f'{workers:<8} {elapsed:>9.3f}s {summarize_time / elapsed:>7.2f}x '
+              f'{parse_elapsed:>9.3f}s {dataset_time / parse_elapsed:>7.2f}x {pool_time:>10.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Cold-start time of the CLI, measured with `python -X importtime`, checked against a budget.
+
+Usage: python -m benchmarks.startup [--runs 10] [--budget-ms 50] [--version-budget-ms 60]
+
+Each run is a fresh interpreter. The import time reported is the cumulative time of the
+module (median of the runs); `snds --version` is timed end to end, minus the bare interpreter
+startup. Exits with status 1 when the import of sndslib.cli or the `snds --version` run exceeds
+its budget.
+"""
+
+from argparse import ArgumentParser
+import statistics
+import subprocess
+import time
+import sys
+
+
+# Orçamentos padrão do import do sndslib.cli e do `snds --version`, em milissegundos
+BUDGET_MS = 50
+VERSION_BUDGET_MS = 60
+
+MODULES = ('sndslib', 'sndslib.sndslib', 'sndslib.cli')
+
+
+def importtime(module):
+    """Tempos (próprio, acumulado) em microssegundos de cada módulo importado por `import module`."""
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def wall(args):
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, check=True)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS,
+                        help=f'maximum median import time of sndslib.cli (default={BUDGET_MS})')
+    parser.add_argument('--version-budget-ms', type=float, default=VERSION_BUDGET_MS,
+                        help=f'maximum median time of snds --version, minus the interpreter '
+                             f'(default={VERSION_BUDGET_MS})')
+    parser.add_argument('--top', type=int, default=10, help='slowest modules listed (by own import time)')
+    args = parser.parse_args()
+
+    print(f'{"import":<40} {"median":>9}')
+    medians = {}
+    for module in MODULES:
+        runs = [importtime(module)[module][1] for _ in range(args.runs)]
+        medians[module] = statistics.median(runs) / 1000
+        print(f'{module:<40} {medians[module]:>7.1f}ms')
+
+    interpreter = statistics.median(wall(['-c', 'pass']) for _ in range(args.runs))
+    version = statistics.median(wall(['-m', 'sndslib', '--version']) for _ in range(args.runs))
+    version_ms = (version - interpreter) * 1000
+    print(f'{"snds --version (minus interpreter)":<40} {version_ms:>7.1f}ms')
+
+    print('\nslowest modules imported by sndslib.cli (own time)')
+    times = importtime('sndslib.cli')
+    for name, (own, _) in sorted(times.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f'  {name:<38} {own / 1000:>7.1f}ms')
+
+    over = []
+    if medians['sndslib.cli'] > args.budget_ms:
+        over.append(f'sndslib.cli import takes {medians["sndslib.cli"]:.1f}ms, over the {args.budget_ms:g}ms budget')
+    if version_ms > args.version_budget_ms:
+        over.append(f'snds --version takes {version_ms:.1f}ms, over the {args.version_budget_ms:g}ms budget')
+    for message in over:
+        print(message, file=sys.stderr)
+    if over:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Peak memory of buffered (get_*) versus streaming (iter_*) consumption of SNDS responses.
+
+Usage: python -m benchmarks.streaming [--rows 200000] [--ranges 2000]
+"""
+
+from argparse import ArgumentParser
+import tracemalloc
+import time
+
+from benchmarks.synthetic import make_data, make_ip_status
+from sndslib import sndslib
+from sndslib.testing import SndsStandIn
+
+
+def measure(label, func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<40} {elapsed:>8.3f}s {peak / 2 ** 20:>10.2f} MiB')
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--ranges', type=int, default=2000)
+    args = parser.parse_args()
+
+    with SndsStandIn(data=make_data(args.rows), ip_status=make_ip_status(args.ranges)) as standin:
+        sndslib.SNDS_URL = standin.url
+        print(f'{"operation":<40} {"time":>9} {"peak":>14}')
+        measure('summarize(get_data)', lambda: sndslib.summarize(sndslib.get_data('bench')))
+        measure('summarize(iter_data)', lambda: sndslib.summarize(sndslib.iter_data('bench')))
+        measure('list_blocked_ips(get_ip_status)', lambda: sndslib.list_blocked_ips(sndslib.get_ip_status('bench')))
+        measure('list_blocked_ips(iter_ip_status)', lambda: sndslib.list_blocked_ips(sndslib.iter_ip_status('bench')))
+
+
+if __name__ == '__main__':
+    main()
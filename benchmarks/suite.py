@@ -0,0 +1,140 @@
+"""Time and peak memory of the main sndslib operations over synthetic datasets, compared to a baseline.
+
+Usage: python -m benchmarks.suite [--rows 10000 100000 1000000] [--save] [--compare]
+
+--save writes the results to the baseline file (benchmarks/baseline.json by default) and
+--compare prints each operation next to the stored baseline, exiting with status 1 when an
+operation got slower than the tolerance.
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import tracemalloc
+import platform
+import json
+import time
+import sys
+
+from benchmarks.synthetic import make_data, make_ip_status, fake_resolver
+from sndslib import sndslib
+from sndslib.parse import iter_lines
+
+
+BASELINE = Path(__file__).with_name('baseline.json')
+
+# Consultas do search_ip_status por operação e IPs resolvidos no list_blocked_ips_rdns
+SEARCHES = 100
+RDNS_IPS = 2000
+
+
+def measure(func, repeat):
+    """Best wall time of `repeat` runs (without tracemalloc, which slows allocations) and peak memory."""
+
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'time': best, 'peak': peak}
+
+
+def operations(rows, ranges, latency):
+    """Operações medidas para um tamanho de dataset, como (nome, função)."""
+
+    data = list(iter_lines([make_data(rows)]))
+    ip_status = list(iter_lines([make_ip_status(ranges, mixed=True)]))
+    step = max(1, len(data) // SEARCHES)
+    # IPs espalhados pelo dataset, incluindo o último (pior caso da busca linear)
+    ips = [line.split(',', 1)[0] for line in data[step - 1::step]][:SEARCHES]
+    blocked = sndslib.list_blocked_ips(ip_status)
+    rdns_ips = [ip for ip, _ in zip(blocked, range(RDNS_IPS))]
+    resolver = fake_resolver(latency)
+    # Interpretado uma vez: o summarize(SndsDataset) mede só a agregação sobre as colunas
+    dataset = sndslib.SndsDataset.from_data(data)
+
+    def search_list():
+        for ip in ips:
+            sndslib.search_ip_status(ip, data)
+
+    def search_index():
+        index = sndslib.UsageIndex(data)
+        for ip in ips:
+            sndslib.search_ip_status(ip, index)
+
+    def blocked_ips():
+        result = sndslib.list_blocked_ips(ip_status)
+        return len(result), '20.0.0.1' in result
+
+    return [
+        ('summarize', lambda: sndslib.summarize(data)),
+        ('SndsDataset.from_data', lambda: sndslib.SndsDataset.from_data(data)),
+        ('summarize(SndsDataset)', lambda: sndslib.summarize(dataset)),
+        (f'search_ip_status x{len(ips)}', search_list),
+        (f'search_ip_status(UsageIndex) x{len(ips)}', search_index),
+        ('list_blocked_ips', blocked_ips),
+        (f'list_blocked_ips_rdns x{len(rdns_ips)}', lambda: sndslib.list_blocked_ips_rdns(rdns_ips, resolver=resolver)),
+    ]
+
+
+def compare(result, baseline, tolerance):
+    """Texto comparando o tempo com o baseline e se ficou mais lento que a tolerância."""
+
+    if not baseline:
+        return '', False
+    ratio = result['time'] / baseline['time'] if baseline['time'] else 1.0
+    slower = ratio > 1 + tolerance
+    return f'{ratio:>7.2f}x{" SLOWER" if slower else ""}', slower
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help='dataset sizes (data.aspx lines), default=10000 100000')
+    parser.add_argument('--ranges', type=int, default=5000, help='blocked ranges in ipStatus.aspx, default=5000')
+    parser.add_argument('--latency', type=float, default=0.001, help='fake resolver latency in seconds')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per operation (best is kept)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE, help='baseline file')
+    parser.add_argument('--save', action='store_true', help='stores the results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='compares the results with the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown before an operation is flagged, default=0.25 (25%%)')
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())['results'] if args.compare and args.baseline.exists() else {}
+    results = {}
+    regressions = 0
+
+    print(f'{"operation":<45} {"time":>9} {"peak":>14} {"vs baseline":>12}')
+    for rows in args.rows:
+        size = f'rows={rows}'
+        results[size] = {}
+        print(size)
+        for name, func in operations(rows, args.ranges, args.latency):
+            result = results[size][name] = measure(func, args.repeat)
+            text, slower = compare(result, baseline.get(size, {}).get(name), args.tolerance)
+            regressions += slower
+            print(f'  {name:<43} {result["time"]:>8.3f}s {result["peak"] / 2 ** 20:>10.2f} MiB {text}')
+
+    if args.save:
+        args.baseline.write_text(json.dumps({
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'ranges': args.ranges,
+            'latency': args.latency,
+            'results': results,
+        }, indent=2) + '\n')
+        print(f'baseline saved to {args.baseline}')
+
+    if regressions:
+        print(f'{regressions} operation(s) slower than the baseline', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
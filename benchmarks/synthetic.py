@@ -0,0 +1,81 @@
+"""Synthetic SNDS responses and a fake rDNS resolver for benchmarks."""
+
+import random
+import socket
+import struct
+import time
+import zlib
+
+
+# Sizes of the blocked ranges of make_ip_status(mixed=True) and their weights: mostly
+# single IPs and small blocks, with a few /20 and /16
+RANGE_SIZES = (1, 4, 16, 64, 256, 1024, 4096, 65536)
+RANGE_WEIGHTS = (30, 20, 15, 10, 12, 6, 4, 3)
+
+COMPLAINT_RATES = ('< 0.1%', '< 0.1%', '< 0.1%', '0.2%', '0.5%', '1.3%', '> 10%')
+
+
+def _ip(value):
+    return socket.inet_ntoa(struct.pack('!I', value))
+
+
+def _clock(hour):
+    return f'{hour % 12 or 12}:00 {"AM" if hour < 12 else "PM"}'
+
+
+def make_data(rows, seed=0):
+    """Returns a `data.aspx` body with `rows` lines, sorted by IP like the real report.
+
+    The IPs fill whole /24 blocks spread over 10.0.0.0/8 with random gaps, and the columns
+    vary like a real account: filter results, complaint rates, trap windows only when there
+    were trap hits and an occasional HELO/MAIL FROM sample.
+    """
+    rng = random.Random(seed)
+    lines = []
+    network = 10 << 24
+    while len(lines) < rows:
+        for host in range(min(256, rows - len(lines))):
+            recipients = rng.randint(1, 50000)
+            status = rng.choice(('GREEN', 'GREEN', 'GREEN', 'YELLOW', 'RED'))
+            traphits = rng.choice((0, 0, 0, rng.randint(1, 50)))
+            traps = '9/29/2020 8:07 AM,9/29/2020 12:03 PM' if traphits else ','
+            start, end = sorted(rng.sample(range(24), 2))
+            sample = f'mail{host}.example.com,bounce@example.com' if rng.random() < 0.05 else ','
+            lines.append(
+                f'{_ip(network + host)},9/29/2020 {_clock(start)},9/29/2020 {_clock(end)},'
+                f'{recipients},{recipients + rng.randint(0, 5)},{recipients},{status},{rng.choice(COMPLAINT_RATES)},'
+                f'{traps},{traphits},{sample},'
+            )
+        network += 256 * rng.randint(1, 4)
+    return '\r\n'.join(lines).encode('utf-8')
+
+
+def make_ip_status(ranges, size=256, seed=0, mixed=False):
+    """Returns an `ipStatus.aspx` body with `ranges` blocked ranges of `size` addresses each.
+
+    With `mixed` the sizes follow RANGE_SIZES/RANGE_WEIGHTS instead, including /16 ranges.
+    """
+    rng = random.Random(seed)
+    lines = []
+    start = 20 << 24
+    for _ in range(ranges):
+        length = rng.choices(RANGE_SIZES, RANGE_WEIGHTS)[0] if mixed else size
+        # Ranges aligned to their own size, like the blocks SNDS reports
+        start = (start + length - 1) // length * length
+        end = start + length - 1
+        lines.append(f'{_ip(start)},{_ip(end)},Yes,Blocked due to user complaints or other evidence of spamming')
+        start = end + 1 + length * rng.randint(1, 3)
+    return '\r\n'.join(lines).encode('utf-8')
+
+
+def fake_resolver(latency=0.001, nxdomain=0.1):
+    """Returns an rDNS resolver that sleeps `latency` seconds per lookup.
+
+    About a `nxdomain` fraction of the IPs (always the same ones) raise socket.herror.
+    """
+    def resolver(ip):
+        time.sleep(latency)
+        if zlib.crc32(ip.encode('ascii')) % 1000 < nxdomain * 1000:
+            raise socket.herror(1, 'Unknown host')
+        return f'mail-{ip.replace(".", "-")}.example.com'
+    return resolver
@@ -0,0 +1,68 @@
+"""Timestamp parsing of the usage data: datetime.strptime against sndslib.parse.parse_timestamp.
+
+Usage: python -m benchmarks.timestamps [--rows 200000]
+
+Parses the four time columns of every generated row with strptime, with the hand-rolled parser
+(without its cache) and with parse_timestamp (cached), checking that all of them agree, then
+times sndslib.filter_window over the same rows.
+"""
+
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+import time
+
+from benchmarks.synthetic import make_data
+from sndslib import parse, sndslib
+from sndslib.parse import IP_KEYS, NO_TIMESTAMP, TIME_KEYS, TIMESTAMP_FORMAT
+
+
+def best(func, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def strptime(value):
+    if not value:
+        return NO_TIMESTAMP
+    return int(datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp())
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    lines = make_data(args.rows).decode('utf-8').split('\r\n')
+    columns = [IP_KEYS.index(key) for key in TIME_KEYS]
+    values = [fields[column] for fields in (line.split(',') for line in lines) for column in columns]
+    print(f'{args.rows} rows, {len(values)} timestamps, {len(set(values))} distinct')
+
+    results = {}
+    print(f'{"parser":<22} {"seconds":>8} {"per value":>10} {"speedup":>8}')
+    for name, func in (('datetime.strptime', strptime), ('hand-rolled', parse._parse_timestamp),
+                       ('parse_timestamp', parse.parse_timestamp)):
+        def run():
+            # Every run starts with an empty cache, so the misses are part of the measurement
+            parse._timestamps.clear()
+            return [func(value) for value in values]
+        elapsed, results[name] = best(run, args.repeat)
+        if name == 'datetime.strptime':
+            baseline = elapsed
+        print(f'{name:<22} {elapsed:>7.3f}s {elapsed / len(values) * 1e9:>8.0f}ns {baseline / elapsed:>7.1f}x')
+    assert results['hand-rolled'] == results['datetime.strptime'] == results['parse_timestamp'], \
+        'the parsers disagree'
+
+    start = parse.parse_timestamp('9/29/2020 9:00 AM')
+    end = parse.parse_timestamp('9/29/2020 3:00 PM')
+    for window in sndslib.WINDOWS:
+        elapsed, rows = best(lambda: sndslib.filter_window(lines, start, end, window), args.repeat)
+        print(f'filter_window {window:<8} {elapsed:>7.3f}s {len(rows):>10} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Busca os dados de várias chaves do SNDS em paralelo.
+
+Exemplo de Uso:
+
+    >>> from sndslib.accounts import fetch_accounts
+    >>> accounts = fetch_accounts(['key1', 'key2', 'badkey'])
+    >>> sorted(accounts.results), list(accounts.errors)
+    (['key1', 'key2'], ['badkey'])
+    >>> accounts.summary()
+    {'red': 544, 'green': 1420, 'yellow': 1704, 'traps': 2596, 'ips': 3668, 'date': '12/31/2019'}
+    >>> len(accounts.blocked_ips())
+    42
+"""
+
+from sndslib import sndslib
+from sndslib.exceptions import SndsHttpError
+from sndslib.ipset import BlockedIpSet
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+
+
+__all__ = [
+        'Account',
+        'Accounts',
+        'fetch_accounts',
+        'merge_summaries',
+        ]
+
+
+# Número padrão de requisições simultâneas
+ACCOUNT_WORKERS = 8
+
+
+class Account:
+    """Dados de uso (sndslib.get_data) e ranges bloqueados (sndslib.get_ip_status) de uma chave."""
+
+    __slots__ = ('key', 'data', 'ip_status')
+
+    def __init__(self, key, data, ip_status) -> None:
+        self.key = key
+        self.data = data
+        self.ip_status = ip_status
+
+    def summary(self) -> dict:
+        return sndslib.summarize(self.data)
+
+
+class Accounts:
+    """Resultado do fetch_accounts: contas buscadas com sucesso e erros por chave."""
+
+    def __init__(self, results, errors) -> None:
+        self.results = results
+        self.errors = errors
+
+    def summaries(self) -> dict:
+        """Resumo (sndslib.summarize) de cada chave."""
+
+        return {key: account.summary() for key, account in self.results.items()}
+
+    def summary(self) -> dict:
+        """Resumo somado de todas as chaves."""
+
+        return merge_summaries(self.summaries().values())
+
+    def data(self):
+        """Linhas de uso de todas as chaves."""
+
+        return itertools.chain.from_iterable(account.data for account in self.results.values())
+
+    def blocked_ips(self) -> BlockedIpSet:
+        """Conjunto único dos IPs bloqueados em todas as chaves."""
+
+        return BlockedIpSet.from_ip_status(
+            itertools.chain.from_iterable(account.ip_status for account in self.results.values())
+        )
+
+
+def merge_summaries(summaries) -> dict:
+    """Soma os resumos (sndslib.summarize) de várias chaves; a data é a do primeiro resumo que tiver uma."""
+
+    merged = {'red': 0, 'green': 0, 'yellow': 0, 'traps': 0, 'ips': 0, 'date': ''}
+    for summary in summaries:
+        for field in ('red', 'green', 'yellow', 'traps', 'ips'):
+            merged[field] += summary[field]
+        merged['date'] = merged['date'] or summary['date']
+    return merged
+
+
+def fetch_accounts(keys, date=None, workers=ACCOUNT_WORKERS, cache=None, client=None) -> Accounts:
+    """Busca em paralelo os dados de uso e os ranges bloqueados de cada chave.
+
+    Uma chave com erro não interrompe as demais: o erro (SndsHttpError) fica em `Accounts.errors[chave]`.
+    """
+
+    keys = list(dict.fromkeys(keys))
+    results, errors = {}, {}
+    if not keys:
+        return Accounts(results, errors)
+
+    client = client or sndslib.get_client()
+    with ThreadPoolExecutor(max_workers=min(workers, 2 * len(keys))) as executor:
+        futures = {
+            key: (
+                executor.submit(sndslib.get_data, key, date, cache, client),
+                executor.submit(sndslib.get_ip_status, key, cache, client),
+            )
+            for key in keys
+        }
+        for key, (data, ip_status) in futures.items():
+            try:
+                results[key] = Account(key, data.result(), ip_status.result())
+            except SndsHttpError as e:
+                errors[key] = e
+
+    return Accounts(results, errors)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Agregações sobre os dados de uso dos IPs (sndslib.get_data) calculadas em uma única passada.
+
+Exemplo de Uso:
+
+    >>> from sndslib import sndslib
+    >>> from sndslib.aggregate import aggregate, Count, CountBy, Sum, Max, GroupByPrefix
+    >>> aggregate(
+    ...     sndslib.iter_data('mykey'),
+    ...     Count(),
+    ...     CountBy('filter_result'),
+    ...     Sum('message_recipients', name='volume'),
+    ...     Max('traphits'),
+    ...     GroupByPrefix(24, Sum('traphits')),
+    ... )
+    {'count': 1834,
+     'count_by_filter_result': {'GREEN': 710, 'YELLOW': 852, 'RED': 272},
+     'volume': 4592837,
+     'max_traphits': 41,
+     'by_prefix24': {'1.1.1.0/24': {'sum_traphits': 107}, ...}}
+"""
+
+from sndslib.parse import IP_KEYS, INT_KEYS, TIME_KEYS, parse_timestamp
+from sndslib.ipset import ip_to_int, int_to_ip
+import copy
+
+
+__all__ = [
+        'Aggregator',
+        'Count',
+        'CountBy',
+        'First',
+        'GroupByPrefix',
+        'Max',
+        'Min',
+        'Sum',
+        'aggregate',
+        ]
+
+
+def aggregate(response, *aggregators) -> dict:
+    """Passa uma única vez pelas linhas de uso e retorna {nome: resultado} de cada agregador.
+
+    Os agregadores começam vazios a cada chamada, então podem ser reaproveitados entre execuções.
+    """
+
+    for aggregator in aggregators:
+        aggregator.reset()
+    for line in response:
+        fields = line.split(',')
+        for aggregator in aggregators:
+            aggregator.add(fields)
+
+    return {aggregator.name: aggregator.result() for aggregator in aggregators}
+
+
+def _converter(field):
+    """Função que converte o texto da coluna para o tipo usado nas comparações e somas."""
+
+    if field in INT_KEYS:
+        return lambda value: int(value or 0)
+    if field in TIME_KEYS:
+        return parse_timestamp
+    return str
+
+
+class Aggregator:
+    """Base dos agregadores: `add` recebe os campos de cada linha e `result` o valor final.
+
+    `reset` volta ao estado vazio; o aggregate o chama no início de cada execução.
+    """
+
+    kind = ''
+
+    def __init__(self, field=None, name=None) -> None:
+        self.field = field
+        self.name = name or (f'{self.kind}_{field}' if field else self.kind)
+        self._column = IP_KEYS.index(field) if field else None
+
+    def _value(self, fields):
+        return fields[self._column] if self._column < len(fields) else ''
+
+    def spawn(self):
+        """Retorna um agregador vazio com a mesma configuração."""
+
+        aggregator = copy.deepcopy(self)
+        aggregator.reset()
+        return aggregator
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def add(self, fields) -> None:
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+
+class Count(Aggregator):
+    """Conta as linhas."""
+
+    kind = 'count'
+
+    def __init__(self, name=None) -> None:
+        super().__init__(name=name)
+        self.reset()
+
+    def reset(self) -> None:
+        self._count = 0
+
+    def add(self, fields) -> None:
+        self._count += 1
+
+    def result(self):
+        return self._count
+
+
+class CountBy(Aggregator):
+    """Conta as linhas por valor da coluna."""
+
+    kind = 'count_by'
+
+    def __init__(self, field, name=None) -> None:
+        super().__init__(field, name)
+        self.reset()
+
+    def reset(self) -> None:
+        self._counts = {}
+
+    def add(self, fields) -> None:
+        value = self._value(fields)
+        self._counts[value] = self._counts.get(value, 0) + 1
+
+    def result(self):
+        return dict(self._counts)
+
+
+class Sum(Aggregator):
+    """Soma uma coluna numérica."""
+
+    kind = 'sum'
+
+    def __init__(self, field, name=None) -> None:
+        super().__init__(field, name)
+        self.reset()
+
+    def reset(self) -> None:
+        self._sum = 0
+
+    def add(self, fields) -> None:
+        self._sum += int(self._value(fields) or 0)
+
+    def result(self):
+        return self._sum
+
+
+class Min(Aggregator):
+    """Menor valor da coluna (números, datas em epoch ou texto). Valores vazios são ignorados."""
+
+    kind = 'min'
+
+    def __init__(self, field, name=None) -> None:
+        super().__init__(field, name)
+        self._convert = _converter(field)
+        self.reset()
+
+    def reset(self) -> None:
+        self._best = None
+
+    def _better(self, value):
+        return value < self._best
+
+    def add(self, fields) -> None:
+        value = self._value(fields)
+        if not value:
+            return
+        value = self._convert(value)
+        if self._best is None or self._better(value):
+            self._best = value
+
+    def result(self):
+        return self._best
+
+
+class Max(Min):
+    """Maior valor da coluna (números, datas em epoch ou texto). Valores vazios são ignorados."""
+
+    kind = 'max'
+
+    def _better(self, value):
+        return value > self._best
+
+
+class First(Aggregator):
+    """Primeiro valor não vazio da coluna."""
+
+    kind = 'first'
+
+    def __init__(self, field, name=None) -> None:
+        super().__init__(field, name)
+        self.reset()
+
+    def reset(self) -> None:
+        self._first = None
+
+    def add(self, fields) -> None:
+        if self._first is None:
+            self._first = self._value(fields) or None
+
+    def result(self):
+        return self._first
+
+
+class GroupByPrefix(Aggregator):
+    """Aplica os agregadores informados separadamente para cada rede /`prefixlen` dos IPs.
+
+    >>> aggregate(r, GroupByPrefix(24, Count(), Sum('traphits')))
+    {'by_prefix24': {'1.1.1.0/24': {'count': 3, 'sum_traphits': 107}}}
+    """
+
+    kind = 'by_prefix'
+
+    def __init__(self, prefixlen, *aggregators, name=None) -> None:
+        super().__init__(name=name or f'by_prefix{prefixlen}')
+        self.prefixlen = prefixlen
+        self.aggregators = aggregators or (Count(),)
+        self._mask = (0xFFFFFFFF << (32 - prefixlen)) & 0xFFFFFFFF
+        self.reset()
+
+    def reset(self) -> None:
+        self._groups = {}
+
+    def add(self, fields) -> None:
+        network = ip_to_int(fields[0]) & self._mask
+        group = self._groups.get(network)
+        if group is None:
+            group = self._groups[network] = [aggregator.spawn() for aggregator in self.aggregators]
+        for aggregator in group:
+            aggregator.add(fields)
+
+    def result(self):
+        return {
+            f'{int_to_ip(network)}/{self.prefixlen}': {aggregator.name: aggregator.result() for aggregator in group}
+            for network, group in sorted(self._groups.items())
+        }
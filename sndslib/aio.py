@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Versão assíncrona (asyncio) das buscas no SNDS e das consultas de rDNS.
+
+Exemplo de Uso:
+
+    >>> import asyncio
+    >>> from sndslib import aio
+    >>> async def main():
+    ...     async with aio.AsyncSndsClient() as client:
+    ...         data, ip_status = await asyncio.gather(
+    ...             aio.get_data('mykey', client=client),
+    ...             aio.get_ip_status('mykey', client=client),
+    ...         )
+    ...     blocked_ips = sndslib.list_blocked_ips(ip_status)
+    ...     return await aio.list_blocked_ips_rdns(blocked_ips, workers=64, timeout=2)
+    >>> asyncio.run(main())
+    [{'ip': '1.1.1.1', 'rdns': 'foo.bar.exemple.com'}, ...]
+"""
+
+from sndslib import sndslib
+from sndslib.exceptions import SndsHttpError
+from sndslib.parse import LineSplitter, CHUNK_SIZE
+from urllib.parse import urlencode, urlsplit
+import ipaddress
+import asyncio
+import inspect
+import socket
+
+
+__all__ = [
+        'AsyncSndsClient',
+        'get_data',
+        'get_ip_status',
+        'iter_data',
+        'iter_ip_status',
+        'list_blocked_ips_rdns',
+        ]
+
+
+# Número padrão de conexões simultâneas com o SNDS
+CONNECTION_LIMIT = 4
+
+
+class AsyncSndsClient:
+    """Pool de conexões HTTP/1.1 persistentes com o SNDS, compartilhado pelas corrotinas.
+
+    Abre no máximo `limit` conexões; as requisições seguintes esperam uma conexão livre.
+    """
+
+    def __init__(self, base_url=None, limit=CONNECTION_LIMIT, timeout=None) -> None:
+        url = urlsplit(base_url or sndslib.SNDS_URL)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.path = url.path.rstrip('/')
+        self.timeout = timeout
+        self.connections = 0
+        self.limit = limit
+        self._idle = []
+        # Criado no primeiro open, dentro do loop em execução (no Python < 3.10 o Semaphore
+        # fica preso ao loop corrente na criação)
+        self._slots = None
+
+    async def _connect(self):
+        self.connections += 1
+        ssl = self.scheme == 'https' or None
+        return await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=ssl, server_hostname=self.host if ssl else None),
+            self.timeout,
+        )
+
+    async def _readline(self, reader):
+        return await asyncio.wait_for(reader.readline(), self.timeout)
+
+    async def _request(self, target):
+        # Uma conexão ociosa pode ter sido fechada pelo servidor: tenta uma vez em uma nova
+        for attempt in (1, 2):
+            reuse = bool(self._idle)
+            reader, writer = self._idle.pop() if reuse else await self._connect()
+            try:
+                writer.write(
+                    f'GET {target} HTTP/1.1\r\nHost: {self.host}\r\nAccept-Encoding: identity\r\n\r\n'.encode('ascii')
+                )
+                await writer.drain()
+                status_line = await self._readline(reader)
+                if not status_line:
+                    raise ConnectionResetError('connection closed by the server')
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if reuse and attempt == 1:
+                    continue
+                raise
+            except BaseException:
+                # Timeout, cancelamento...: a conexão fica em um estado desconhecido
+                writer.close()
+                raise
+
+            try:
+                try:
+                    status = int(status_line.split()[1])
+                except (IndexError, ValueError):
+                    raise ValueError(f'invalid HTTP status line: {status_line!r}')
+
+                headers = {}
+                while True:
+                    line = await self._readline(reader)
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+            except BaseException:
+                writer.close()
+                raise
+
+            return status, headers, reader, writer
+
+    async def open(self, endpoint, **params):
+        """Faz o GET no endpoint (ex.: 'data.aspx') e retorna a resposta para leitura em streaming."""
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.limit)
+        await self._slots.acquire()
+        try:
+            status, headers, reader, writer = await self._request(f'{self.path}/{endpoint}?{urlencode(params)}')
+        except BaseException as e:
+            # A vaga é devolvida em qualquer falha, inclusive no cancelamento de quem chamou
+            self._slots.release()
+            if isinstance(e, (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError)):
+                raise SndsHttpError(e)
+            raise
+
+        response = _AsyncResponse(self, status, headers, reader, writer)
+        # Como no cliente síncrono, só o 200 tem um corpo com os dados
+        if status != 200:
+            await response.close()
+            raise SndsHttpError(f'HTTP Error {status}')
+        return response
+
+    def _release(self, reader, writer, reusable):
+        if reusable:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        self._slots.release()
+
+    async def close(self) -> None:
+        """Fecha todas as conexões ociosas."""
+
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class _AsyncResponse:
+    """Corpo de uma resposta HTTP lido em blocos (Content-Length, chunked ou até o fim da conexão)."""
+
+    def __init__(self, client, status, headers, reader, writer) -> None:
+        self._client = client
+        self._reader = reader
+        self._writer = writer
+        self._done = False
+        self._released = False
+        self.status = status
+        self.headers = headers
+
+    async def _read(self, size):
+        return await asyncio.wait_for(self._reader.read(size), self._client.timeout)
+
+    async def _readexactly(self, size):
+        return await asyncio.wait_for(self._reader.readexactly(size), self._client.timeout)
+
+    async def chunks(self):
+        """Retorna os blocos do corpo da resposta conforme chegam."""
+
+        try:
+            if self.headers.get('transfer-encoding', '').lower() == 'chunked':
+                while True:
+                    size = int((await self._client._readline(self._reader)).split(b';')[0], 16)
+                    if size == 0:
+                        # Trailers opcionais até a linha em branco
+                        while (await self._client._readline(self._reader)) not in (b'\r\n', b'\n', b''):
+                            pass
+                        break
+                    yield await self._readexactly(size)
+                    await self._readexactly(2)
+            elif 'content-length' in self.headers:
+                remaining = int(self.headers['content-length'])
+                while remaining:
+                    chunk = await self._read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b'', remaining)
+                    remaining -= len(chunk)
+                    yield chunk
+            else:
+                while True:
+                    chunk = await self._read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            self._done = True
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        reusable = (
+            self._done
+            and self.headers.get('connection', '').lower() != 'close'
+            and ('content-length' in self.headers or 'transfer-encoding' in self.headers)
+        )
+        self._client._release(self._reader, self._writer, reusable)
+
+
+async def _iter_endpoint(client, endpoint, **params):
+    own_client = client is None
+    if own_client:
+        client = AsyncSndsClient()
+
+    try:
+        response = await client.open(endpoint, **params)
+        splitter = LineSplitter()
+        try:
+            async for chunk in response.chunks():
+                for line in splitter.feed(chunk):
+                    yield line
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            raise SndsHttpError(e)
+        finally:
+            # Devolve a conexão mesmo se a leitura não chegou a começar (ex.: cancelamento)
+            await response.close()
+        for line in splitter.finish():
+            yield line
+    finally:
+        if own_client:
+            await client.close()
+
+
+def iter_ip_status(key, client=None):
+    """Versão assíncrona do sndslib.iter_ip_status (`async for line in aio.iter_ip_status(key)`)."""
+
+    return _iter_endpoint(client, 'ipStatus.aspx', key=key)
+
+
+def iter_data(key, date=None, client=None):
+    """Versão assíncrona do sndslib.iter_data (`async for line in aio.iter_data(key)`)."""
+
+    if date:
+        return _iter_endpoint(client, 'data.aspx', key=key, date=date)
+    return _iter_endpoint(client, 'data.aspx', key=key)
+
+
+async def get_ip_status(key, client=None):
+    """Versão assíncrona do sndslib.get_ip_status."""
+
+    return [line async for line in iter_ip_status(key, client)]
+
+
+async def get_data(key, date=None, client=None):
+    """Versão assíncrona do sndslib.get_data."""
+
+    return [line async for line in iter_data(key, date, client)]
+
+
+async def _getnameinfo(ip):
+    """Resolvedor padrão do rDNS."""
+
+    host, _ = await asyncio.get_running_loop().getnameinfo((ip, 0), socket.NI_NAMEREQD)
+    return host
+
+
+async def list_blocked_ips_rdns(ips, resolver=None, workers=sndslib.RDNS_WORKERS,
+                                timeout=None, deadline=None, cache=None) -> list:
+    """Versão assíncrona do sndslib.list_blocked_ips_rdns, com até `workers` consultas simultâneas.
+
+    `resolver` pode ser uma corrotina ou uma função comum (executada em uma thread) que recebe
+    o IP e retorna o host ou levanta `socket.error`.
+    """
+
+    if isinstance(ips, (str, ipaddress.IPv4Address)):
+        ips = [ips]
+
+    ips = [str(ip) for ip in ips]
+    loop = asyncio.get_running_loop()
+    # O cache (SQLite) é lido e gravado em uma thread, sem bloquear o loop
+    known = await loop.run_in_executor(None, cache.load, ips) if cache is not None else {}
+    missing = list(dict.fromkeys(ip for ip in ips if ip not in known))
+
+    resolver = resolver or _getnameinfo
+    slots = asyncio.Semaphore(max(1, workers))
+
+    async def lookup(ip):
+        async with slots:
+            if inspect.iscoroutinefunction(resolver):
+                query = resolver(ip)
+            else:
+                query = loop.run_in_executor(None, resolver, ip)
+            try:
+                return await asyncio.wait_for(query, timeout)
+            except asyncio.TimeoutError:
+                # Vem antes do socket.error: no Python 3.11+ é o TimeoutError, subclasse do OSError
+                return None
+            except socket.error:
+                return sndslib.RDNS_NXDOMAIN
+
+    tasks = [asyncio.ensure_future(lookup(ip)) for ip in missing]
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    resolved = {ip: task.result() if task.done() and not task.cancelled() else None for ip, task in zip(missing, tasks)}
+
+    if cache is not None:
+        # Consultas interrompidas por timeout não são gravadas no cache
+        await loop.run_in_executor(None, cache.update, {ip: rdns for ip, rdns in resolved.items() if rdns is not None})
+
+    known.update(resolved)
+    return [{'ip': ip, 'rdns': known[ip] or sndslib.RDNS_NXDOMAIN} for ip in ips]
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Histórico local (SQLite) dos dados de uso diários, com consultas por IP e por período.
+
+Exemplo de Uso:
+
+    >>> from sndslib import sndslib
+    >>> from sndslib.archive import Archive
+    >>> archive = Archive('/tmp/snds.sqlite3')
+    >>> archive.ingest(sndslib.get_data('mykey', '092920'), '092920')
+    1834
+    >>> [(day['date'], day['filter_result'], day['traphits']) for day in archive.history('1.1.1.1')]
+    [('09/28/2020', 'GREEN', '0'), ('09/29/2020', 'YELLOW', '40')]
+    >>> archive.summaries('092820', '092920')['092920']
+    {'red': 272, 'green': 710, 'yellow': 852, 'traps': 1298, 'ips': 1834, 'date': '09/29/2020'}
+    >>> archive.totals('092820', '092920')
+    {'days': 2, 'ips': 1840, 'messages': 9185674, 'traps': 2596, 'green': 1420, 'yellow': 1704, 'red': 544}
+"""
+
+from sndslib.parse import IP_KEYS, INT_KEYS, TIME_KEYS, NO_TIMESTAMP, parse_timestamp, format_timestamp
+from sndslib.ipset import ip_to_int, int_to_ip
+from sndslib import metrics
+from contextlib import closing
+import time
+import os
+
+
+__all__ = [
+        'Archive',
+        'default_archive_path',
+        ]
+
+
+# Formato das datas aceitas (o mesmo do SNDS) e das datas retornadas
+DATE_FORMAT = '%m%d%y'
+OUTPUT_DATE_FORMAT = '%m/%d/%Y'
+
+_COLUMNS = IP_KEYS[1:]
+_ACTIVITY_END = _COLUMNS.index('activity_end')
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS usage ('
+    'ip INTEGER NOT NULL, day TEXT NOT NULL, '
+    + ', '.join(f'{key} {"INTEGER" if key in INT_KEYS or key in TIME_KEYS else "TEXT"} NOT NULL' for key in _COLUMNS)
+    + ', PRIMARY KEY (ip, day)) WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS usage_day ON usage (day, ip)',
+    'CREATE TABLE IF NOT EXISTS days ('
+    'day TEXT PRIMARY KEY, ips INTEGER NOT NULL, green INTEGER NOT NULL, yellow INTEGER NOT NULL, '
+    'red INTEGER NOT NULL, traps INTEGER NOT NULL, messages INTEGER NOT NULL, date INTEGER NOT NULL)',
+)
+
+# Resumo de um dia recalculado a cada ingestão; o 'date' segue o sndslib.summarize (primeiro activity_end)
+_SUMMARIZE_DAY = (
+    'INSERT OR REPLACE INTO days '
+    "SELECT day, count(*), sum(filter_result = 'GREEN'), sum(filter_result = 'YELLOW'), "
+    "sum(filter_result NOT IN ('GREEN', 'YELLOW')), sum(traphits), sum(message_recipients), "
+    'coalesce((SELECT activity_end FROM usage AS first WHERE first.day = usage.day AND activity_end != ? '
+    'ORDER BY ip LIMIT 1), ?) '
+    'FROM usage WHERE day = ? GROUP BY day'
+)
+
+
+def default_archive_path():
+    """Arquivo padrão do histórico ($XDG_DATA_HOME/sndslib ou ~/.local/share/sndslib)."""
+
+    base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, 'sndslib', 'archive.sqlite3')
+
+
+def _day(date):
+    """Data do SNDS (MMDDYY) no formato ISO usado nas tabelas, que ordena como texto."""
+
+    parsed = time.strptime(date, DATE_FORMAT)
+    return f'{parsed.tm_year:04}-{parsed.tm_mon:02}-{parsed.tm_mday:02}'
+
+
+def _output_date(day):
+    year, month, date = day.split('-')
+    return f'{month}/{date}/{year}'
+
+
+def _timestamp(value):
+    # Como no sndslib.summarize, uma data inválida não descarta a linha nem a ingestão
+    try:
+        return parse_timestamp(value)
+    except ValueError:
+        return NO_TIMESTAMP
+
+
+def _int(value):
+    try:
+        return int(value or 0)
+    except ValueError:
+        return 0
+
+
+# Conversão de cada coluna para o tipo gravado: epoch, inteiro ou texto
+_CONVERTERS = [_timestamp if key in TIME_KEYS else _int if key in INT_KEYS else str for key in _COLUMNS]
+
+
+class Archive:
+    """Histórico dos dados de uso (sndslib.get_data) em um arquivo SQLite, indexado por (IP, dia).
+
+    Ingerir de novo o mesmo dia substitui todas as linhas guardadas dele, então a ingestão pode
+    ser repetida sem duplicar dados. As datas dos parâmetros usam o formato do SNDS (MMDDYY).
+    """
+
+    def __init__(self, path=None) -> None:
+        self.path = path or default_archive_path()
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        import sqlite3
+        conn = sqlite3.connect(self.path)
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        return conn
+
+    def ingest(self, response, date=None) -> int:
+        """Grava as linhas de uso de um dia em uma única transação e retorna o número de linhas gravadas.
+
+        Sem `date` (MMDDYY) o dia é o do primeiro activity_end das linhas. Sem nenhuma linha de IP
+        nada é gravado e o dia guardado (se houver) é mantido.
+        """
+
+        rows = []
+        seen = set()
+        for line in response:
+            fields = line.split(',')
+            try:
+                ip = ip_to_int(fields[0])
+            except ValueError:
+                continue
+            if ip in seen:
+                # Como no sndslib.search_ip_status e no UsageIndex, vale a primeira linha do IP
+                continue
+            seen.add(ip)
+            fields = fields[1:len(IP_KEYS)] + [''] * (len(IP_KEYS) - len(fields))
+            rows.append([ip, None] + [convert(value) for convert, value in zip(_CONVERTERS, fields)])
+
+        if not rows:
+            # Uma resposta vazia (dia ainda não publicado, falha transitória) não apaga o dia guardado
+            return 0
+        if date:
+            day = _day(date)
+        else:
+            first = next((row[2 + _ACTIVITY_END] for row in rows if row[2 + _ACTIVITY_END] != NO_TIMESTAMP), None)
+            if first is None:
+                return 0
+            day = time.strftime('%Y-%m-%d', time.gmtime(first))
+        for row in rows:
+            row[1] = day
+
+        placeholders = ', '.join('?' * (len(_COLUMNS) + 2))
+        with metrics.stage('archive') as stage, closing(self._connect()) as conn, conn:
+            # O dia é substituído por inteiro: IPs que saíram de uma versão corrigida do dia não ficam
+            conn.execute('DELETE FROM usage WHERE day = ?', (day,))
+            conn.execute('DELETE FROM days WHERE day = ?', (day,))
+            conn.executemany(f'INSERT INTO usage (ip, day, {", ".join(_COLUMNS)}) VALUES ({placeholders})', rows)
+            conn.execute(_SUMMARIZE_DAY, (NO_TIMESTAMP, NO_TIMESTAMP, day))
+            stage.add(rows=len(rows))
+        return len(rows)
+
+    def _range(self, start, end):
+        """Cláusula e parâmetros do período [start, end] (MMDDYY, ambos opcionais)."""
+
+        clauses, params = [], []
+        if start:
+            clauses.append('day >= ?')
+            params.append(_day(start))
+        if end:
+            clauses.append('day <= ?')
+            params.append(_day(end))
+        return ' AND '.join(clauses) or '1', params
+
+    def dates(self) -> list:
+        """Dias guardados (MMDDYY), em ordem."""
+
+        with closing(self._connect()) as conn:
+            return [time.strftime(DATE_FORMAT, time.strptime(day, '%Y-%m-%d'))
+                    for day, in conn.execute('SELECT day FROM days ORDER BY day')]
+
+    def history(self, ip, start=None, end=None) -> list:
+        """Dados de um IP em cada dia guardado do período, como no sndslib.search_ip_status mais o 'date'."""
+
+        try:
+            ip = ip_to_int(ip)
+        except ValueError:
+            return []
+
+        where, params = self._range(start, end)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f'SELECT day, {", ".join(_COLUMNS)} FROM usage WHERE ip = ? AND {where} ORDER BY day',
+                [ip] + params,
+            ).fetchall()
+
+        history = []
+        for day, *values in rows:
+            entry = {'date': _output_date(day), 'ip_address': int_to_ip(ip)}
+            for key, value in zip(_COLUMNS, values):
+                entry[key] = format_timestamp(value) if key in TIME_KEYS else str(value)
+            history.append(entry)
+        return history
+
+    def summaries(self, start=None, end=None) -> dict:
+        """Resumo de cada dia guardado do período, indexado pelo dia (MMDDYY), no formato do sndslib.summarize."""
+
+        where, params = self._range(start, end)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f'SELECT day, red, green, yellow, traps, ips, date FROM days WHERE {where} ORDER BY day', params
+            ).fetchall()
+
+        summaries = {}
+        for day, red, green, yellow, traps, ips, date in rows:
+            summaries[time.strftime(DATE_FORMAT, time.strptime(day, '%Y-%m-%d'))] = {
+                'red': red, 'green': green, 'yellow': yellow, 'traps': traps, 'ips': ips,
+                'date': time.strftime(OUTPUT_DATE_FORMAT, time.gmtime(date)) if date != NO_TIMESTAMP else '',
+            }
+        return summaries
+
+    def totals(self, start=None, end=None, ip=None) -> dict:
+        """Totais do período: dias, IPs distintos, mensagens, spamtraps e linhas de cada status.
+
+        Com `ip` os totais são só das linhas desse IP (consulta pelo índice de (IP, dia)).
+        """
+
+        where, params = self._range(start, end)
+        with closing(self._connect()) as conn:
+            if ip is None:
+                days, messages, traps, green, yellow, red = conn.execute(
+                    'SELECT count(*), sum(messages), sum(traps), sum(green), sum(yellow), sum(red) '
+                    f'FROM days WHERE {where}', params,
+                ).fetchone()
+                ips, = conn.execute(f'SELECT count(DISTINCT ip) FROM usage WHERE {where}', params).fetchone()
+            else:
+                try:
+                    params.insert(0, ip_to_int(ip))
+                except ValueError:
+                    params.insert(0, None)
+                days, messages, traps, green, yellow, red = conn.execute(
+                    "SELECT count(*), sum(message_recipients), sum(traphits), sum(filter_result = 'GREEN'), "
+                    "sum(filter_result = 'YELLOW'), sum(filter_result NOT IN ('GREEN', 'YELLOW')) "
+                    f'FROM usage WHERE ip = ? AND {where}', params,
+                ).fetchone()
+                ips = 1 if days else 0
+
+        return {'days': days, 'ips': ips, 'messages': messages or 0, 'traps': traps or 0,
+                'green': green or 0, 'yellow': yellow or 0, 'red': red or 0}
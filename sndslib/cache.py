@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Caches locais para reaproveitar consultas entre execuções.
+
+Exemplo de Uso:
+
+    >>> from sndslib import sndslib
+    >>> from sndslib.cache import RdnsCache
+    >>> cache = RdnsCache()
+    >>> sndslib.list_blocked_ips_rdns(['1.1.1.1'], cache=cache)
+    [{'ip': '1.1.1.1', 'rdns': 'foo.bar.exemple.com'}]
+
+    >>> from sndslib.cache import ResponseCache
+    >>> cache = ResponseCache(ttl=300)
+    >>> r = sndslib.get_data('mykey', '092920', cache=cache)
+    >>> r = sndslib.get_data('mykey', '092920', cache=cache)
+    >>> cache.stats
+    {'hits': 1, 'misses': 1}
+"""
+
+from sndslib import defaults
+from contextlib import closing
+from datetime import datetime, timezone
+import hashlib
+import gzip
+import zlib
+import time
+import os
+
+
+__all__ = [
+        'RdnsCache',
+        'ResponseCache',
+        'default_cache_dir',
+        ]
+
+
+# TTLs padrão (em segundos) das respostas de rDNS
+RDNS_TTL = 7 * 24 * 60 * 60
+RDNS_NXDOMAIN_TTL = 6 * 60 * 60
+
+# IPs por consulta do RdnsCache.load (o SQLite antigo aceita até 999 parâmetros)
+RDNS_LOAD_BATCH = 500
+
+# TTL padrão (em segundos) das respostas do dia atual e do ipStatus
+RESPONSE_TTL = defaults.RESPONSE_TTL
+
+
+def default_cache_dir():
+    """Diretório de cache do sndslib ($XDG_CACHE_HOME/sndslib ou ~/.cache/sndslib)."""
+
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'sndslib')
+
+
+class RdnsCache:
+    """Cache de rDNS em disco (SQLite) com TTL separado para respostas 'NXDOMAIN'.
+
+    >>> cache = RdnsCache('/tmp/rdns.sqlite3', ttl=86400, nxdomain_ttl=3600)
+    >>> cache.update({'1.1.1.1': 'foo.bar.exemple.com', '0.0.0.1': 'NXDOMAIN'})
+    >>> cache.load(['1.1.1.1', '0.0.0.1', '2.2.2.2'])
+    {'1.1.1.1': 'foo.bar.exemple.com', '0.0.0.1': 'NXDOMAIN'}
+    """
+
+    def __init__(self, path=None, ttl=RDNS_TTL, nxdomain_ttl=RDNS_NXDOMAIN_TTL) -> None:
+        self.path = path or os.path.join(default_cache_dir(), 'rdns.sqlite3')
+        self.ttl = ttl
+        self.nxdomain_ttl = nxdomain_ttl
+
+    def _connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Importado aqui: só o -r usa o cache de rDNS
+        import sqlite3
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS rdns (ip TEXT PRIMARY KEY, rdns TEXT NOT NULL, resolved REAL NOT NULL)'
+        )
+        return conn
+
+    def load(self, ips) -> dict:
+        """Carrega de uma vez as respostas ainda válidas para os IPs informados."""
+
+        wanted = list(dict.fromkeys(ips))
+        if not wanted:
+            return {}
+
+        now = time.time()
+        known = {}
+        with closing(self._connect()) as conn:
+            # Consulta só os IPs pedidos (pela chave primária), em lotes dentro do limite de parâmetros do SQLite
+            for start in range(0, len(wanted), RDNS_LOAD_BATCH):
+                batch = wanted[start:start + RDNS_LOAD_BATCH]
+                rows = conn.execute(
+                    f'SELECT ip, rdns FROM rdns WHERE ip IN ({", ".join("?" * len(batch))}) AND '
+                    "((rdns != 'NXDOMAIN' AND resolved > ?) OR (rdns = 'NXDOMAIN' AND resolved > ?))",
+                    batch + [now - self.ttl, now - self.nxdomain_ttl],
+                )
+                known.update(rows)
+        return known
+
+    def update(self, results: dict) -> None:
+        """Grava as respostas em uma única transação e descarta as expiradas."""
+
+        if not results:
+            return
+
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO rdns (ip, rdns, resolved) VALUES (?, ?, ?)',
+                ((ip, rdns, now) for ip, rdns in results.items()),
+            )
+            conn.execute('DELETE FROM rdns WHERE resolved <= ?', (now - max(self.ttl, self.nxdomain_ttl),))
+
+    def clear(self) -> None:
+        """Remove todas as respostas do cache."""
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM rdns')
+
+
+class ResponseCache:
+    """Cache em disco das respostas do SNDS (data.aspx e ipStatus.aspx), compactadas com gzip.
+
+    Dias anteriores ao atual nunca mudam: uma resposta não vazia guardada depois do fim do dia
+    fica no cache para sempre; as demais (dia atual, sem data, ipStatus) expiram após `ttl` segundos.
+    As gravações são atômicas (arquivo temporário + rename), então várias execuções simultâneas
+    podem compartilhar o diretório.
+    """
+
+    def __init__(self, directory=None, ttl=RESPONSE_TTL) -> None:
+        self.directory = directory or os.path.join(default_cache_dir(), 'responses')
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _path(self, endpoint, key, date):
+        # A chave de acesso não aparece no nome do arquivo
+        digest = hashlib.sha256(f'{endpoint}|{key}|{date or ""}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.gz')
+
+    def _permanent(self, date, stored):
+        """Verifica se a resposta da data (MMDDYY) foi guardada depois do fim desse dia (UTC)."""
+
+        try:
+            day = datetime.strptime(date, '%m%d%y').replace(tzinfo=timezone.utc)
+        except (TypeError, ValueError):
+            return False
+        return stored >= day.timestamp() + 24 * 60 * 60
+
+    def open(self, endpoint, key, date=None):
+        """Retorna a resposta guardada para leitura ou None se não houver resposta válida.
+
+        O corpo é lido do arquivo em blocos, sem ser descompactado de uma vez. Entradas com o
+        início ilegível contam como miss e são removidas; um erro no meio do arquivo é levantado
+        na leitura (OSError) e também remove a entrada.
+        """
+
+        path = self._path(endpoint, key, date)
+        try:
+            stored = os.path.getmtime(path)
+            file = gzip.open(path, 'rb')
+        except OSError:
+            self.misses += 1
+            return None
+
+        try:
+            empty = not file.peek(1)
+        except (OSError, EOFError, zlib.error):
+            file.close()
+            _remove(path)
+            self.misses += 1
+            return None
+
+        # Um corpo vazio pode ser um dia ainda não publicado: nunca fica para sempre, só pelo TTL
+        permanent = not empty and endpoint == 'data.aspx' and self._permanent(date, stored)
+        if permanent or time.time() - stored < self.ttl:
+            self.hits += 1
+            return _CachedResponse(file, path)
+
+        file.close()
+        self.misses += 1
+        return None
+
+    def store(self, response, endpoint, key, date=None):
+        """Envolve a resposta HTTP para gravar o corpo no cache enquanto ele é lido."""
+
+        if response.status != 200:
+            return response
+        os.makedirs(self.directory, exist_ok=True)
+        return _StoringResponse(response, self._path(endpoint, key, date))
+
+    def clear(self) -> None:
+        """Remove todas as respostas do cache."""
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+        # Inclui os temporários deixados por gravações interrompidas
+        for name in names:
+            if name.endswith(('.gz', '.tmp')):
+                os.remove(os.path.join(self.directory, name))
+
+
+class _CachedResponse:
+    """Resposta lida do cache, com a mesma interface usada das respostas HTTP."""
+
+    status = 200
+
+    def __init__(self, file, path) -> None:
+        self._file = file
+        self._path = path
+
+    def read(self, amt=-1):
+        try:
+            return self._file.read(amt)
+        except (EOFError, zlib.error) as e:
+            # Entrada corrompida: é removida, e a próxima consulta busca de novo no SNDS
+            _remove(self._path)
+            raise OSError(f'corrupt cache entry {self._path}: {e}')
+        except OSError:
+            _remove(self._path)
+            raise
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _StoringResponse:
+    """Copia o corpo da resposta para um arquivo temporário e o publica no cache ao final."""
+
+    def __init__(self, response, path) -> None:
+        import tempfile
+
+        self._response = response
+        self._path = path
+        self._complete = False
+        self.status = response.status
+        tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp', delete=False)
+        self._tmp_name = tmp.name
+        self._gzip = gzip.GzipFile(fileobj=tmp, mode='wb')
+        self._tmp = tmp
+
+    def read(self, amt=None):
+        chunk = self._response.read(amt)
+        if chunk:
+            self._gzip.write(chunk)
+        else:
+            self._complete = True
+        return chunk
+
+    def close(self) -> None:
+        self._response.close()
+        if self._tmp is None:
+            return
+        self._gzip.close()
+        self._tmp.close()
+        self._tmp = None
+        # Só publica respostas lidas até o fim; leituras interrompidas são descartadas
+        if self._complete:
+            os.replace(self._tmp_name, self._path)
+        else:
+            os.remove(self._tmp_name)
@@ -3,64 +3,238 @@
 
 from __future__ import absolute_import
 from sndslib import sndslib
-from argparse import ArgumentParser
+from sndslib.exceptions import SndsHttpError
+import time
+import sys
 from .__version__ import __version__
 
+# Os demais módulos (argparse, cache, saída estruturada, várias chaves...) são importados
+# só quando usados, pois o CLI roda muitas vezes por hora no cron
+
 
 # CLI's arguments logic
-parser = ArgumentParser(prog='snds', description='Searches and formats the SNDS dashboard data')
+def _build_parser():
+    """Monta o parser dos argumentos; feito só na primeira chamada, e não ao importar o módulo."""
+
+    # Os padrões vêm do sndslib.defaults: o cache e o watch (gzip, hashlib, datetime...) só são
+    # importados pelas opções que os usam
+    from sndslib.defaults import RESPONSE_TTL, WATCH_INTERVAL
+    from sndslib.output import FORMATS
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(prog='snds', description='Searches and formats the SNDS dashboard data')
+
+    parser.add_argument('-V', '--version', action='version', version=f'sndslib {__version__}',
+                        help='returns the version of sndslib')
+
+    # A chave só é obrigatória para consultar o SNDS (verificado no _run): as consultas ao histórico são locais
+    keys_group = parser.add_mutually_exclusive_group()
+
+    keys_group.add_argument('-k', action='store', dest='key',
+                            help='snds access key automated data access')
+
+    keys_group.add_argument('-K', '--keys-file', action='store', dest='keys_file',
+                            help='file with one snds access key per line, fetched concurrently and merged')
+
+    parser.add_argument('-d', action='store', dest='data',
+                        help='returns the general status on informed date (format=MMDDYY)')
+
+    parser.add_argument('--until', action='store', dest='until',
+                        help='with -s, returns the general status of each day from -d until this date (format=MMDDYY)')
+
+    parser.add_argument('--cache-dir', action='store', dest='cache_dir',
+                        help='SNDS responses cache directory (default=~/.cache/sndslib/responses)')
+
+    parser.add_argument('--cache-ttl', action='store', dest='cache_ttl', type=float, default=RESPONSE_TTL,
+                        help=f"seconds to reuse today's data and the blocked ranges (default={RESPONSE_TTL})")
+
+    parser.add_argument('--no-cache', action='store_true', dest='no_cache',
+                        help='downloads every SNDS response without reading or writing the cache')
+
+    parser.add_argument('--clear-cache', action='store_true', dest='clear_cache',
+                        help='removes every SNDS response from the cache')
+
+    parser.add_argument('--cache-stats', action='store_true', dest='cache_stats',
+                        help='prints the SNDS responses cache hits and misses to stderr')
+
+    group1 = parser.add_mutually_exclusive_group()
+
+    group1.add_argument('-s', action='store_true',
+                        help='returns the general status of the most recent data')
+
+    group1.add_argument('-ip', action='append',
+                        help='returns the complete status of informed IP; repeat it, or use @file or - (stdin) '
+                             'for many IPs at once')
+
+    group1.add_argument('-l', action='store_true',
+                        help='returns the blocked IPs list')
+
+    group1.add_argument('-r', action='store_true',
+                        help='returns the blocked IPs list with reverses')
+
+    parser.add_argument('--cidr', action='store_true', dest='cidr',
+                        help='with -l, returns the blocked ranges as the fewest CIDR blocks instead of single IPs')
+
+    parser.add_argument('--activity-window', action='store', dest='activity_window', nargs=2, metavar=('START', 'END'),
+                        help='with -s and -ip, keeps only the IPs whose activity overlaps START..END (format=MMDDYY or '
+                             'MMDDYYHHMM, UTC; - leaves a side open)')
+
+    parser.add_argument('--trap-window', action='store', dest='trap_window', nargs=2, metavar=('START', 'END'),
+                        help='with -s and -ip, keeps only the IPs whose trap hits overlap START..END (same format as '
+                             '--activity-window)')
+
+    parser.add_argument('--rdns-workers', action='store', dest='rdns_workers', type=int, default=sndslib.RDNS_WORKERS,
+                        help=f'number of concurrent rDNS lookups (default={sndslib.RDNS_WORKERS})')
+
+    parser.add_argument('--rdns-timeout', action='store', dest='rdns_timeout', type=float,
+                        help='seconds to wait for each rDNS lookup before reporting NXDOMAIN')
+
+    parser.add_argument('--rdns-deadline', action='store', dest='rdns_deadline', type=float,
+                        help='seconds to wait for all rDNS lookups before reporting NXDOMAIN')
+
+    parser.add_argument('--rdns-cache', action='store', dest='rdns_cache',
+                        help='rDNS cache file (default=~/.cache/sndslib/rdns.sqlite3)')
+
+    parser.add_argument('--no-rdns-cache', action='store_true', dest='no_rdns_cache',
+                        help='resolves every rDNS without reading or writing the cache')
+
+    parser.add_argument('--clear-rdns-cache', action='store_true', dest='clear_rdns_cache',
+                        help='removes every entry from the rDNS cache')
+
+    parser.add_argument('--format', action='store', dest='format', choices=FORMATS, default='text',
+                        help='output format of -s, -ip, -l, -r, --diff-against and the archive queries (default=text)')
+
+    parser.add_argument('--diff-against', action='store', dest='diff_against', metavar='SNAPSHOT',
+                        help='prints the blocked ranges and IP statuses that changed since the snapshot file')
+
+    parser.add_argument('--save-snapshot', action='store', dest='save_snapshot', metavar='SNAPSHOT',
+                        help='saves the blocked ranges and usage data to the snapshot file (after --diff-against)')
+
+    parser.add_argument('--watch', action='store', dest='watch', type=float, nargs='?', const=WATCH_INTERVAL,
+                        metavar='SECONDS',
+                        help=f'keeps polling SNDS every SECONDS (default={WATCH_INTERVAL}) and prints each change '
+                             'to the blocked ranges and IP statuses as NDJSON')
+
+    parser.add_argument('--archive', action='store_true', dest='archive',
+                        help='saves the usage data of -d (or of each day from -d --until) to the history archive')
 
-parser.add_argument('-V', '--version', action='version', version=f'sndslib {__version__}',
-                    help='returns the version of sndslib')
+    parser.add_argument('--archive-file', action='store', dest='archive_file',
+                        help='history archive file (default=~/.local/share/sndslib/archive.sqlite3)')
 
-parser.add_argument('-k', action='store', dest='key',
-                    help='snds access key automated data access',
-                    required=True)
+    parser.add_argument('--history', action='store', dest='history', metavar='IP',
+                        help='returns the archived status of IP on each day, limited by -d and --until; needs no key')
 
-parser.add_argument('-d', action='store', dest='data',
-                    help='returns the general status on informed date (format=MMDDYY)')
+    parser.add_argument('--archive-days', action='store_true', dest='archive_days',
+                        help='returns the general status of each archived day, limited by -d and --until; needs no key')
 
-group1 = parser.add_mutually_exclusive_group()
+    parser.add_argument('--archive-totals', action='store', dest='archive_totals', nargs='?', const='', metavar='IP',
+                        help='returns the totals of the archived days (of IP, if given), limited by -d and --until; '
+                             'needs no key')
 
-group1.add_argument('-s', action='store_true',
-                    help='returns the general status of the most recent data')
+    parser.add_argument('--stats', action='store_true', dest='stats',
+                        help='prints the time, bytes and rows of each stage (fetch, read, decode, rdns...) to stderr')
 
-group1.add_argument('-ip', action='store',
-                    help='returns the complete status of informed IP')
+    parser.add_argument('--profile', action='store_true', dest='profile',
+                        help='prints the cProfile top functions and tracemalloc top allocations to stderr')
 
-group1.add_argument('-l', action='store_true',
-                    help='returns the blocked IPs list')
+    return parser
 
-group1.add_argument('-r', action='store_true',
-                    help='returns the blocked IPs list with reverses')
+
+_parser = None
+
+
+def get_parser():
+    global _parser
+    if _parser is None:
+        _parser = _build_parser()
+    return _parser
+
+
+def __getattr__(name):
+    # `cli.parser` continua disponível, montado no primeiro acesso
+    if name == 'parser':
+        return get_parser()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+# Colunas das saídas json, ndjson e csv
+SUMMARY_FIELDS = ['date', 'ips', 'green', 'yellow', 'red', 'traps', 'blocked', 'blocked_messages']
+SUMMARY_RANGE_FIELDS = ['date', 'ips', 'green', 'yellow', 'red', 'traps', 'error']
+DIFF_OUTPUT_FIELDS = ['kind', 'change', 'first_ip', 'last_ip', 'field', 'old', 'new']
+ARCHIVE_DAYS_FIELDS = ['date', 'ips', 'green', 'yellow', 'red', 'traps']
+ARCHIVE_TOTALS_FIELDS = ['days', 'ips', 'messages', 'green', 'yellow', 'red', 'traps']
 
 
 # Adapter class for sndslib
 class Cli:
-    def __init__(self, key, date=None) -> None:
+    def __init__(self, key, date=None, cache=None, output='text', windows=()) -> None:
         self.key = key
         self.date = date
+        self.cache = cache
+        self.output = output
+        # Filtros (window, start, end) do sndslib.filter_window aplicados aos dados de uso
+        self.windows = windows
         self._usage_data = None
+        self._all_usage_data = None
+        self._usage_index = None
         self._blocked_ips = None
+        self._ip_status = None
 
     @property
     def usage_data(self):
-        if not self._usage_data:
-            self._usage_data = sndslib.get_data(self.key, self.date)
+        if self._usage_data is None:
+            self._usage_data = self._filter(self.all_usage_data)
         return self._usage_data
 
+    @property
+    def all_usage_data(self):
+        # Sem os filtros de período: os snapshots, o diff e o histórico guardam o dia inteiro
+        if self._all_usage_data is None:
+            self._all_usage_data = sndslib.get_data(self.key, self.date, self.cache)
+        return self._all_usage_data
+
+    def _filter(self, data):
+        for window, start, end in self.windows:
+            data = sndslib.filter_window(data, start, end, window)
+        return data
+
+    @property
+    def ip_status(self):
+        if self._ip_status is None:
+            self._ip_status = sndslib.get_ip_status(self.key, self.cache)
+        return self._ip_status
+
+    @property
+    def usage_index(self):
+        if self._usage_index is None:
+            self._usage_index = sndslib.UsageIndex(self.usage_data)
+        return self._usage_index
+
     @property
     def blocked_ips(self):
-        if not self._blocked_ips:
-            _ip_status = sndslib.get_ip_status(self.key)
+        if self._blocked_ips is None:
+            _ip_status = self._ip_status or sndslib.iter_ip_status(self.key, self.cache)
             self._blocked_ips = sndslib.list_blocked_ips(_ip_status)
         return self._blocked_ips
 
     def summary(self):
         _summary = sndslib.summarize(self.usage_data)
-        self._print_summary(_summary, self.blocked_ips)
+        _blocked_messages = self._blocked_messages(self.usage_data, self.blocked_ips)
+        if self.output == 'text':
+            self._print_summary(_summary, self.blocked_ips, _blocked_messages)
+        else:
+            with self._writer(SUMMARY_FIELDS) as writer:
+                writer.write(dict(_summary, blocked=len(self.blocked_ips), blocked_messages=_blocked_messages))
+
+    def _blocked_messages(self, data, blocked_ips):
+        # Volume de mensagens dos IPs de uso que estão dentro dos ranges bloqueados
+        return sndslib.join_blocked(data, blocked_ips, rows=False).blocked['messages']
 
-    def _print_summary(self, summary, blocked_ips):
+    def _writer(self, fields, **options):
+        from sndslib.output import get_writer
+        return get_writer(self.output, sys.stdout, fields, **options)
+
+    def _print_summary(self, summary, blocked_ips, blocked_messages=None):
         message = (
             f"Date: {summary['date']:>9} \n"
             f"IPs: {summary['ips']:>10} \n"
@@ -70,8 +244,36 @@ class Cli:
             f"Trap Hits: {summary['traps']:>4} \n"
             f"Blocked: {len(blocked_ips):>6}"
         )
+        if blocked_messages is not None:
+            message += f" \nBlocked Msgs: {blocked_messages}"
         print(message)
 
+    def summary_range(self, until):
+        _results, _errors = sndslib.get_data_range(self.key, self.date, until, cache=self.cache)
+        _summaries = {date: sndslib.summarize(self._filter(rows)) for date, rows in _results.items()}
+        if self.output == 'text':
+            self._print_summary_range(_summaries, _errors)
+            return
+
+        with self._writer(SUMMARY_RANGE_FIELDS) as writer:
+            for date in sorted(set(_summaries) | set(_errors), key=lambda d: (d[4:], d[:4])):
+                if date in _errors:
+                    writer.write({'date': date, 'error': str(_errors[date].reason)})
+                else:
+                    writer.write(dict(_summaries[date], date=_summaries[date]['date'] or date))
+
+    def _print_summary_range(self, summaries, errors):
+        print(f"{'Date':<10} {'IPs':>6} {'Green':>6} {'Yellow':>6} {'Red':>6} {'Traps':>6}")
+        for date in sorted(set(summaries) | set(errors), key=lambda d: (d[4:], d[:4])):
+            if date in errors:
+                print(f'{date:<10} error: {errors[date].reason}')
+                continue
+            summary = summaries[date]
+            print(
+                f"{summary['date'] or date:<10} {summary['ips']:>6} {summary['green']:>6} "
+                f"{summary['yellow']:>6} {summary['red']:>6} {summary['traps']:>6}"
+            )
+
     def ip_data(self, ip):
         _ip_data = sndslib.search_ip_status(ip, self.usage_data)
         if _ip_data:
@@ -79,6 +281,28 @@ class Cli:
         else:
             print('No data found for the given IP.')
 
+    def ips_data(self, ips):
+        ips = list(dict.fromkeys(ips))
+        if len(ips) == 1 and self.output == 'text':
+            return self.ip_data(ips[0])
+
+        # Os dados de uso são indexados uma única vez para todas as consultas
+        _found = self.usage_index.get_many(ips)
+        if self.output == 'text':
+            for ip in ips:
+                if ip in _found:
+                    self._print_ip_data(_found[ip])
+        else:
+            from sndslib.parse import IP_KEYS
+            with self._writer(IP_KEYS) as writer:
+                writer.write_many(_found[ip] for ip in ips if ip in _found)
+
+        _missing = [ip for ip in ips if ip not in _found]
+        if _missing:
+            # Nos formatos estruturados a saída padrão fica só com os registros
+            print(f"No data found for {len(_missing)} of {len(ips)} IPs: {', '.join(_missing)}",
+                  file=sys.stdout if self.output == 'text' else sys.stderr)
+
     def _print_ip_data(self, ipdata):
         message = (
             f"Activity: {ipdata['activity_start']} until {ipdata['activity_end']} \n"
@@ -90,34 +314,404 @@ class Cli:
         )
         print(message)
 
-    def list_blocked_ips(self):
-        self._print_list_blocked_ips(self.blocked_ips)
+    def list_blocked_ips(self, cidr=False):
+        if cidr:
+            self._print_list_blocked_cidrs(self.blocked_ips.cidrs())
+        else:
+            self._print_list_blocked_ips(self.blocked_ips)
+
+    def _print_list_blocked_cidrs(self, cidrs):
+        from sndslib.output import LineWriter
+
+        if self.output == 'text':
+            with LineWriter(sys.stdout) as writer:
+                writer.write_many(cidrs)
+        else:
+            with self._writer(['cidr']) as writer:
+                writer.write_many({'cidr': cidr} for cidr in cidrs)
 
     def _print_list_blocked_ips(self, blocked_ips):
-        print('\n'.join(blocked_ips))
+        from sndslib.output import LineWriter
 
-    def list_blocked_ips_rdns(self):
-        _rdns = sndslib.list_blocked_ips_rdns(self.blocked_ips)
+        # Os IPs são gerados a partir dos ranges conforme são escritos
+        if self.output == 'text':
+            with LineWriter(sys.stdout) as writer:
+                writer.write_many(blocked_ips)
+        else:
+            with self._writer(['ip']) as writer:
+                writer.write_many({'ip': ip} for ip in blocked_ips)
+
+    def list_blocked_ips_rdns(self, workers=sndslib.RDNS_WORKERS, timeout=None, deadline=None, cache=None):
+        # Cada IP é escrito assim que ele e os anteriores estão resolvidos
+        _rdns = sndslib.iter_blocked_ips_rdns(self.blocked_ips, workers=workers, timeout=timeout, deadline=deadline,
+                                              cache=cache)
         self._print_list_blocked_ips_rdns(_rdns)
 
     def _print_list_blocked_ips_rdns(self, blocked_ips_rdns):
-        for ip in blocked_ips_rdns:
-            print(ip['ip'] + ';' + ip['rdns'])
+        from sndslib.output import LineWriter
+
+        # Sem buffer: as linhas chegam à saída conforme as consultas terminam
+        if self.output == 'text':
+            with LineWriter(sys.stdout, buffer_rows=1) as writer:
+                writer.write_many(f"{ip['ip']};{ip['rdns']}" for ip in blocked_ips_rdns)
+        else:
+            with self._writer(['ip', 'rdns'], buffer_rows=1) as writer:
+                writer.write_many(blocked_ips_rdns)
+
+    def diff(self, snapshot):
+        from sndslib.diff import diff_data, diff_ip_status, records
+
+        _records = records(diff_ip_status(snapshot['ip_status'], self.ip_status),
+                           diff_data(snapshot['data'], self.all_usage_data))
+        if self.output != 'text':
+            with self._writer(DIFF_OUTPUT_FIELDS) as writer:
+                writer.write_many(_records)
+            return
+
+        _changes = 0
+        for record in _records:
+            _changes += 1
+            self._print_diff_record(record)
+        if not _changes:
+            print('No changes since the snapshot.')
+
+    def _print_diff_record(self, record):
+        sign = {'added': '+', 'removed': '-', 'changed': '~'}[record['change']]
+        ips = record['first_ip'] if record['kind'] == 'ip' else f"{record['first_ip']}-{record['last_ip']}"
+        if record['change'] == 'changed':
+            print(f"{sign} {record['kind']} {ips} {record['field']}: {record['old']} -> {record['new']}")
+        else:
+            value = record.get('new' if record['change'] == 'added' else 'old')
+            print(f"{sign} {record['kind']} {ips}" + (f' {value}' if value else ''))
+
+    def save_snapshot(self, path):
+        from sndslib.diff import save_snapshot
+        save_snapshot(path, self.ip_status, self.all_usage_data)
+
+    def archive(self, archive, until=None):
+        # O resultado da gravação vai para o stderr, para não misturar com a saída das demais opções
+        if until:
+            _results, _errors = sndslib.get_data_range(self.key, self.date, until, cache=self.cache)
+            for date in sorted(_results, key=lambda d: (d[4:], d[:4])):
+                print(f'Archived {archive.ingest(_results[date], date)} IPs of {date}', file=sys.stderr)
+            for date, error in _errors.items():
+                print(f'{date}: {error.reason}', file=sys.stderr)
+            return
+
+        _rows = archive.ingest(self.all_usage_data, self.date)
+        print(f"Archived {_rows} IPs of {self.date or 'the most recent day'}", file=sys.stderr)
+
+    def history(self, archive, ip, until=None):
+        _history = archive.history(ip, self.date, until)
+        if self.output != 'text':
+            from sndslib.parse import IP_KEYS
+            with self._writer(['date'] + list(IP_KEYS)) as writer:
+                writer.write_many(_history)
+            return
+
+        if not _history:
+            print('No archived data found for the given IP.')
+            return
+        print(f"{'Date':<10} {'Filter':>6} {'Messages':>9} {'Complaint':>9} {'Traps':>6}")
+        for day in _history:
+            print(
+                f"{day['date']:<10} {day['filter_result']:>6} {day['message_recipients']:>9} "
+                f"{day['complaint_rate']:>9} {day['traphits']:>6}"
+            )
+
+    def archive_days(self, archive, until=None):
+        _summaries = archive.summaries(self.date, until)
+        if self.output == 'text':
+            self._print_summary_range(_summaries, {})
+            return
+
+        with self._writer(ARCHIVE_DAYS_FIELDS) as writer:
+            for date, summary in _summaries.items():
+                writer.write(dict(summary, date=summary['date'] or date))
+
+    def archive_totals(self, archive, ip=None, until=None):
+        _totals = archive.totals(self.date, until, ip or None)
+        if self.output != 'text':
+            with self._writer(ARCHIVE_TOTALS_FIELDS) as writer:
+                writer.write(_totals)
+            return
+
+        print(
+            f"Days: {_totals['days']:>9} \n"
+            f"IPs: {_totals['ips']:>10} \n"
+            f"Messages: {_totals['messages']:>5} \n"
+            f"Green: {_totals['green']:>8} \n"
+            f"Yellow: {_totals['yellow']:>7} \n"
+            f"Red: {_totals['red']:>10} \n"
+            f"Trap Hits: {_totals['traps']:>4}"
+        )
+
+
+# Adapter class for many SNDS keys at once
+class MultiCli(Cli):
+    def __init__(self, keys, date=None, cache=None, output='text') -> None:
+        super().__init__(None, date, cache, output)
+        self.keys = keys
+        self._accounts = None
+
+    @property
+    def accounts(self):
+        if self._accounts is None:
+            from sndslib.accounts import fetch_accounts
+            self._accounts = fetch_accounts(self.keys, self.date, cache=self.cache)
+            for key, error in self._accounts.errors.items():
+                print(f'{_mask_key(key)}: {error}', file=sys.stderr)
+        return self._accounts
+
+    @property
+    def failed(self):
+        return bool(self._accounts and self._accounts.errors)
+
+    @property
+    def usage_data(self):
+        if self._usage_data is None:
+            self._usage_data = list(self.accounts.data())
+        return self._usage_data
+
+    @property
+    def all_usage_data(self):
+        # Os filtros de período não são aceitos com várias chaves
+        return self.usage_data
+
+    @property
+    def ip_status(self):
+        if self._ip_status is None:
+            self._ip_status = [line for account in self.accounts.results.values() for line in account.ip_status]
+        return self._ip_status
+
+    @property
+    def blocked_ips(self):
+        if self._blocked_ips is None:
+            self._blocked_ips = self.accounts.blocked_ips()
+        return self._blocked_ips
+
+    def summary(self):
+        if self.output != 'text':
+            with self._writer(['key'] + SUMMARY_FIELDS) as writer:
+                for key, account in self.accounts.results.items():
+                    blocked = sndslib.list_blocked_ips(account.ip_status)
+                    writer.write(dict(account.summary(), key=_mask_key(key), blocked=len(blocked),
+                                      blocked_messages=self._blocked_messages(account.data, blocked)))
+                writer.write(dict(self.accounts.summary(), key='all', blocked=len(self.blocked_ips),
+                                  blocked_messages=self._blocked_messages(self.usage_data, self.blocked_ips)))
+            return
+
+        for key, account in self.accounts.results.items():
+            print(f'Key: {_mask_key(key)}')
+            blocked = sndslib.list_blocked_ips(account.ip_status)
+            self._print_summary(account.summary(), blocked, self._blocked_messages(account.data, blocked))
+            print()
+        print('All keys')
+        self._print_summary(self.accounts.summary(), self.blocked_ips,
+                            self._blocked_messages(self.usage_data, self.blocked_ips))
+
+
+def _mask_key(key):
+    return f'{key[:8]}...' if len(key) > 8 else key
+
+
+def _read_ips(values):
+    """IPs das opções -ip: o próprio IP, '@arquivo' ou '-' (stdin), separados por espaços, vírgulas ou linhas."""
+
+    ips = []
+    for value in values:
+        if value == '-':
+            text = sys.stdin.read()
+        elif value.startswith('@'):
+            with open(value[1:]) as f:
+                text = f.read()
+        else:
+            text = value
+        for line in text.splitlines():
+            ips.extend(line.split('#', 1)[0].replace(',', ' ').split())
+    return ips
+
+
+def _window_time(value, end=False):
+    """Epoch (UTC) de MMDDYY ou MMDDYYHHMM; sem a hora, o fim do período é o último minuto do dia."""
+
+    if value == '-':
+        return None
+    import calendar
+    if len(value) == 6:
+        value += '2359' if end else '0000'
+    return calendar.timegm(time.strptime(value, '%m%d%y%H%M'))
+
+
+def _read_keys(path):
+    with open(path) as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith('#')]
+
+
+# Número de funções e de alocações mostradas pelo --profile
+PROFILE_FUNCTIONS = 25
+PROFILE_ALLOCATIONS = 10
 
 
 # Parsing and execution
 def main():
-    args = parser.parse_args()
-    command = Cli(args.key, args.data)
+    if sys.argv[1:] in (['-V'], ['--version']):
+        # Atalho para não montar o parser (nem importar o argparse) só para mostrar a versão
+        print(f'sndslib {__version__}')
+        return
+
+    args = get_parser().parse_args()
+
+    if args.stats:
+        from sndslib import metrics
+        stats = metrics.Stats()
+        metrics.add_listener(stats)
+    if args.profile:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        _run(args)
+    except SndsHttpError as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        if args.profile:
+            profiler.disable()
+            _print_profile(profiler)
+        if args.stats:
+            metrics.remove_listener(stats)
+            print(stats.report(), file=sys.stderr)
+
+
+def _print_profile(profiler):
+    import tracemalloc
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    import pstats
+
+    pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(PROFILE_FUNCTIONS)
+    print(f'Top {PROFILE_ALLOCATIONS} allocations', file=sys.stderr)
+    for stat in snapshot.statistics('lineno')[:PROFILE_ALLOCATIONS]:
+        print(stat, file=sys.stderr)
+
 
-    if args.s:
+def _run(args):
+    from sndslib.cache import RdnsCache, ResponseCache
+
+    parser = get_parser()
+    _archive_queries = args.history or args.archive_days or args.archive_totals is not None
+    if not args.key and not args.keys_file and (args.archive or not _archive_queries):
+        parser.error('one of the arguments -k -K/--keys-file is required')
+    if args.until and not args.data:
+        parser.error('--until requires -d')
+    if args.until and args.keys_file:
+        parser.error('--until does not support --keys-file')
+    dates = {}
+    for option, value in (('-d', args.data), ('--until', args.until)):
+        if value:
+            try:
+                dates[option] = time.strptime(value, '%m%d%y')
+            except ValueError:
+                parser.error(f'{option}: dates must be MMDDYY')
+    if args.until and dates['--until'] < dates['-d']:
+        parser.error(f'--until: {args.until} is before -d {args.data}')
+    if args.cidr and not args.l:
+        parser.error('--cidr requires -l')
+    if args.watch is not None:
+        # O --watch só acompanha as mudanças, sempre em NDJSON: as demais saídas seriam ignoradas
+        for option, value in (('--keys-file', args.keys_file), ('-d', args.data), ('-s', args.s), ('-ip', args.ip),
+                              ('-l', args.l), ('-r', args.r), ('--diff-against', args.diff_against),
+                              ('--save-snapshot', args.save_snapshot), ('--archive', args.archive),
+                              ('--history', args.history), ('--archive-days', args.archive_days),
+                              ('--archive-totals', args.archive_totals is not None),
+                              ('--activity-window', args.activity_window), ('--trap-window', args.trap_window)):
+            if value:
+                parser.error(f'--watch does not support {option}')
+        if args.format not in ('text', 'ndjson'):
+            parser.error(f'--watch does not support --format {args.format} (changes are written as NDJSON)')
+    windows = []
+    for window, option in (('activity', args.activity_window), ('trap', args.trap_window)):
+        if option is None:
+            continue
+        if args.keys_file:
+            parser.error(f'--{window}-window does not support --keys-file')
+        try:
+            windows.append((window, _window_time(option[0]), _window_time(option[1], end=True)))
+        except ValueError:
+            parser.error(f'--{window}-window: dates must be MMDDYY or MMDDYYHHMM, or -')
+    if args.watch is not None:
+        from sndslib.watch import Watcher
+        try:
+            Watcher(args.key, interval=args.watch).run()
+        except KeyboardInterrupt:
+            pass
+        return
+    cache = ResponseCache(args.cache_dir, args.cache_ttl)
+    if args.clear_cache:
+        cache.clear()
+    if args.no_cache:
+        cache = None
+    if args.keys_file:
+        command = MultiCli(_read_keys(args.keys_file), args.data, cache, args.format)
+    else:
+        command = Cli(args.key, args.data, cache, args.format, windows)
+
+    rdns_cache = RdnsCache(args.rdns_cache)
+    if args.clear_rdns_cache:
+        rdns_cache.clear()
+    if args.no_rdns_cache:
+        rdns_cache = None
+
+    if args.s and args.until:
+        command.summary_range(args.until)
+    elif args.s:
         command.summary()
 
     if args.ip:
-        command.ip_data(args.ip)
+        try:
+            ips = _read_ips(args.ip)
+        except OSError as e:
+            parser.error(f'-ip: {e}')
+        if not ips:
+            parser.error('-ip: no IPs given')
+        command.ips_data(ips)
 
     if args.l:
-        command.list_blocked_ips()
+        command.list_blocked_ips(args.cidr)
 
     if args.r:
-        command.list_blocked_ips_rdns()
+        command.list_blocked_ips_rdns(args.rdns_workers, args.rdns_timeout, args.rdns_deadline, rdns_cache)
+
+    if args.diff_against:
+        from sndslib.diff import load_snapshot
+        try:
+            snapshot = load_snapshot(args.diff_against)
+        except (OSError, ValueError) as e:
+            parser.error(f'--diff-against: {e}')
+        command.diff(snapshot)
+
+    if args.save_snapshot:
+        command.save_snapshot(args.save_snapshot)
+
+    if args.archive or _archive_queries:
+        from sndslib.archive import Archive
+        archive = Archive(args.archive_file)
+        if args.archive:
+            command.archive(archive, args.until)
+        if args.history:
+            command.history(archive, args.history, args.until)
+        if args.archive_days:
+            command.archive_days(archive, args.until)
+        if args.archive_totals is not None:
+            command.archive_totals(archive, args.archive_totals, args.until)
+
+    if args.cache_stats and cache is not None:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses", file=sys.stderr)
+
+    if isinstance(command, MultiCli) and command.failed:
+        sys.exit(1)
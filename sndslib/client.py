@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Cliente HTTP do SNDS: conexões persistentes (keep-alive), timeouts, novas tentativas e gzip.
+
+Exemplo de Uso:
+
+    >>> from sndslib.client import SndsClient
+    >>> with SndsClient('https://sendersupport.olc.protection.outlook.com/snds', timeout=30) as client:
+    ...     response = client.open('data.aspx', key='mykey', date='092920')
+    ...     response.read()
+
+    O mesmo cliente pode ser passado para as funções do sndslib (e apontado para um servidor local nos testes):
+    >>> sndslib.get_data('mykey', client=client)
+"""
+
+from urllib.error import HTTPError
+from urllib.parse import urlencode, urlsplit
+import http.client
+import threading
+import random
+import time
+import zlib
+
+
+__all__ = [
+        'SndsClient',
+        ]
+
+
+# Limites padrão (em segundos) para abrir a conexão e para cada leitura da resposta
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 60
+
+# Novas tentativas após falhas de conexão ou respostas com os status abaixo, com espera
+# aleatória entre 0 e backoff * 2^n segundos antes da tentativa n + 1
+RETRIES = 2
+BACKOFF = 0.5
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Número máximo de conexões ociosas mantidas abertas
+POOL_SIZE = 8
+
+
+class SndsClient:
+    """Pool de conexões persistentes com o servidor do SNDS, seguro para uso por várias threads.
+
+    Cada requisição usa uma conexão ociosa do pool (ou abre uma nova) e a devolve quando o corpo
+    da resposta é lido por completo, então o número de conexões abertas acompanha o número de
+    requisições simultâneas.
+    """
+
+    def __init__(self, base_url, timeout=READ_TIMEOUT, connect_timeout=CONNECT_TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF, compress=True) -> None:
+        url = urlsplit(base_url)
+        self.base_url = base_url
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port
+        self.path = url.path.rstrip('/')
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.headers = {'Accept-Encoding': 'gzip'} if compress else {}
+        self.connections = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        factory = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        conn = factory(self.host, self.port, timeout=self.connect_timeout)
+        conn.connect()
+        # Depois de conectado, o timeout passa a valer para cada leitura do socket
+        conn.sock.settimeout(self.timeout)
+        with self._lock:
+            self.connections += 1
+        return conn
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _release(self, conn) -> None:
+        with self._lock:
+            if len(self._idle) < POOL_SIZE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _send(self, url):
+        conn, reused = self._checkout()
+        try:
+            conn.request('GET', url, headers=self.headers)
+            return conn, conn.getresponse()
+        except (ConnectionError, http.client.BadStatusLine):
+            conn.close()
+            if not reused:
+                raise
+        except BaseException:
+            # Timeouts e os demais erros seguem para as novas tentativas do open, com o backoff
+            conn.close()
+            raise
+
+        # O servidor pode ter fechado a conexão ociosa: tenta imediatamente em uma conexão nova
+        conn = self._connect()
+        try:
+            conn.request('GET', url, headers=self.headers)
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    def open(self, endpoint, **params):
+        """Faz o GET no endpoint (ex.: 'data.aspx') e retorna a resposta para leitura em streaming.
+
+        Falhas de conexão, timeouts e os status de RETRY_STATUSES são tentados de novo até
+        `retries` vezes. Levanta HTTPError para respostas com status diferente de 200 e OSError ou
+        HTTPException quando as tentativas se esgotam.
+        """
+
+        url = f'{self.path}/{endpoint}?{urlencode(params)}'
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+
+            try:
+                conn, response = self._send(url)
+            except (OSError, http.client.HTTPException):
+                if attempt == self.retries:
+                    raise
+                continue
+
+            # Só o 200 tem os dados: um redirecionamento ou 204 não é um corpo vazio válido
+            if response.status == 200:
+                return _PooledResponse(self, conn, response)
+
+            response.read()
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            if response.status not in RETRY_STATUSES or attempt == self.retries:
+                raise HTTPError(f'{self.scheme}://{self.host}{url}', response.status, response.reason,
+                                response.headers, None)
+
+    def close(self) -> None:
+        """Fecha todas as conexões ociosas."""
+
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _PooledResponse:
+    """Resposta que descompacta o gzip em streaming e devolve a conexão ao pool quando o corpo foi lido."""
+
+    def __init__(self, client, conn, response) -> None:
+        self._client = client
+        self._conn = conn
+        self._response = response
+        self._released = False
+        self.status = response.status
+        self.headers = response.headers
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        else:
+            self._decompressor = None
+
+    def read(self, amt=None):
+        if self._decompressor is None:
+            return self._response.read(amt)
+
+        if amt is None or amt < 0:
+            return self._decompressor.decompress(self._response.read()) + self._decompressor.flush()
+
+        # Um bloco compactado pode não gerar saída ainda: lê até ter dados ou chegar ao fim
+        while True:
+            chunk = self._response.read(amt)
+            if not chunk:
+                return self._decompressor.flush()
+            data = self._decompressor.decompress(chunk)
+            if data:
+                return data
+
+    def close(self) -> None:
+        if self._released:
+            return
+        self._released = True
+
+        # O http.client fecha a resposta sozinho ao fim do corpo; se ainda houver dados
+        # pendentes, ou o servidor pediu para fechar, a conexão não pode ser reaproveitada
+        if self._response.isclosed() and not self._response.will_close:
+            self._client._release(self._conn)
+        else:
+            self._response.close()
+            self._conn.close()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Dados de uso dos IPs (sndslib.get_data) interpretados uma única vez em colunas tipadas.
+
+Exemplo de Uso:
+
+    >>> from sndslib import sndslib
+    >>> dataset = sndslib.SndsDataset.from_data(sndslib.iter_data('mykey'))
+    >>> sndslib.summarize(dataset)
+    {'red': 272, 'green': 710, 'yellow': 852, 'traps': 1298, 'ips': 1834, 'date': '12/31/2019'}
+    >>> row = dataset.find('1.1.1.1')
+    >>> row.filter_result, row.message_recipients, row.activity_end
+    ('GREEN', 1894, 1577818800)
+"""
+
+from sndslib.parse import IP_KEYS, INT_KEYS, TIME_KEYS, TEXT_KEYS, NO_TIMESTAMP, parse_timestamp, format_timestamp
+from sndslib.ipset import ip_to_int, int_to_ip
+from array import array
+import enum
+import time
+
+
+__all__ = [
+        'FilterResult',
+        'SndsDataset',
+        'SndsRow',
+        ]
+
+
+class FilterResult(enum.IntEnum):
+    """Código da coluna filter_result."""
+
+    GREEN = 0
+    YELLOW = 1
+    RED = 2
+    # Qualquer outro texto; o SndsDataset guarda o texto original dessas linhas
+    UNKNOWN = 3
+
+
+def complaint_rate_value(value):
+    """Valor numérico (em %) da faixa de reclamação do SNDS ('< 0.1%' -> 0.1)."""
+
+    try:
+        return float(value.strip('<> %'))
+    except ValueError:
+        return 0.0
+
+
+class _StringTable:
+    """Tabela de strings distintas; as colunas guardam apenas o índice."""
+
+    __slots__ = ('strings', '_codes')
+
+    def __init__(self) -> None:
+        self.strings = ['']
+        self._codes = {'': 0}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+
+# Colunas copiadas sem conversão pelo SndsDataset.extend
+_VALUE_COLUMNS = ('ips', 'filter_results') + TIME_KEYS + INT_KEYS
+
+
+class SndsRow:
+    """Visão de uma linha do SndsDataset, com os valores já tipados."""
+
+    __slots__ = ('_dataset', '_index')
+
+    def __init__(self, dataset, index) -> None:
+        self._dataset = dataset
+        self._index = index
+
+    @property
+    def ip_address(self):
+        return int_to_ip(self._dataset.ips[self._index])
+
+    @property
+    def filter_result(self):
+        code = self._dataset.filter_results[self._index]
+        if code == FilterResult.UNKNOWN:
+            return self._dataset.unknown_filter_results[self._index]
+        return FilterResult(code).name
+
+    @property
+    def complaint_rate(self):
+        return self._dataset.complaint_rates.strings[self._dataset.complaint_rate_codes[self._index]]
+
+    def __getattr__(self, name):
+        dataset = self._dataset
+        if name in INT_KEYS or name in TIME_KEYS:
+            return getattr(dataset, name)[self._index]
+        if name in TEXT_KEYS:
+            return dataset.texts.strings[getattr(dataset, name)[self._index]]
+        raise AttributeError(name)
+
+    def as_dict(self) -> dict:
+        """Retorna a linha no mesmo formato do sndslib.search_ip_status."""
+
+        ip_data = {}
+        for key in IP_KEYS:
+            value = getattr(self, key)
+            if key in TIME_KEYS:
+                value = format_timestamp(value)
+            ip_data[key] = str(value)
+        return ip_data
+
+    def __repr__(self) -> str:
+        return f'SndsRow({self.ip_address!r}, {self.filter_result!r})'
+
+
+class SndsDataset:
+    """Colunas tipadas dos dados de uso: IPs em uint32, contadores inteiros, datas em epoch,
+    `filter_result` como FilterResult e textos em uma tabela de strings compartilhada.
+
+    Um filter_result diferente de GREEN, YELLOW e RED tem o código UNKNOWN e o texto original
+    em `unknown_filter_results` (posição da linha -> texto), então as linhas voltam sem perdas.
+    """
+
+    def __init__(self) -> None:
+        self.ips = array('I')
+        self.activity_start = array('q')
+        self.activity_end = array('q')
+        self.rcpt_commands = array('q')
+        self.data_commands = array('q')
+        self.message_recipients = array('q')
+        self.filter_results = array('b')
+        self.unknown_filter_results = {}
+        self.complaint_rate_codes = array('H')
+        self.trap_message_start = array('q')
+        self.trap_message_end = array('q')
+        self.traphits = array('q')
+        self.sample_helo = array('I')
+        self.sample_mailfrom = array('I')
+        self.comments = array('I')
+        # Textos distintos referenciados pelas colunas de código
+        self.complaint_rates = _StringTable()
+        self.texts = _StringTable()
+
+    @classmethod
+    def from_data(cls, response):
+        """Interpreta as linhas de uso (sndslib.get_data ou sndslib.iter_data) em colunas."""
+
+        dataset = cls()
+        filter_codes = {result.name: int(result) for result in FilterResult if result != FilterResult.UNKNOWN}
+        for line in response:
+            fields = line.split(',')
+            if len(fields) < len(IP_KEYS):
+                fields += [''] * (len(IP_KEYS) - len(fields))
+            (ip, activity_start, activity_end, rcpt_commands, data_commands, message_recipients,
+             filter_result, complaint_rate, trap_message_start, trap_message_end, traphits,
+             sample_helo, sample_mailfrom, comments) = fields[:len(IP_KEYS)]
+
+            dataset.ips.append(ip_to_int(ip))
+            dataset.activity_start.append(parse_timestamp(activity_start))
+            dataset.activity_end.append(parse_timestamp(activity_end))
+            dataset.rcpt_commands.append(int(rcpt_commands or 0))
+            dataset.data_commands.append(int(data_commands or 0))
+            dataset.message_recipients.append(int(message_recipients or 0))
+            code = filter_codes.get(filter_result)
+            if code is None:
+                code = FilterResult.UNKNOWN
+                dataset.unknown_filter_results[len(dataset.filter_results)] = filter_result
+            dataset.filter_results.append(code)
+            dataset.complaint_rate_codes.append(dataset.complaint_rates.code(complaint_rate))
+            dataset.trap_message_start.append(parse_timestamp(trap_message_start))
+            dataset.trap_message_end.append(parse_timestamp(trap_message_end))
+            dataset.traphits.append(int(traphits or 0))
+            dataset.sample_helo.append(dataset.texts.code(sample_helo))
+            dataset.sample_mailfrom.append(dataset.texts.code(sample_mailfrom))
+            dataset.comments.append(dataset.texts.code(comments))
+
+        return dataset
+
+    def extend(self, other) -> None:
+        """Acrescenta as linhas de outro SndsDataset, convertendo os códigos das tabelas de strings.
+
+        O resultado é igual ao de interpretar as linhas dos dois datasets em sequência.
+        """
+
+        complaint_rates = [self.complaint_rates.code(rate) for rate in other.complaint_rates.strings]
+        texts = [self.texts.code(text) for text in other.texts.strings]
+        offset = len(self)
+        self.unknown_filter_results.update(
+            (offset + index, text) for index, text in other.unknown_filter_results.items()
+        )
+        for name in _VALUE_COLUMNS:
+            getattr(self, name).extend(getattr(other, name))
+        self.complaint_rate_codes.extend(array('H', (complaint_rates[code] for code in other.complaint_rate_codes)))
+        for name in TEXT_KEYS:
+            getattr(self, name).extend(array('I', (texts[code] for code in getattr(other, name))))
+
+    def complaint_rate_values(self):
+        """Valor numérico (em %) da faixa de reclamação de cada linha."""
+
+        values = [complaint_rate_value(rate) for rate in self.complaint_rates.strings]
+        return array('d', (values[code] for code in self.complaint_rate_codes))
+
+    def find(self, ip):
+        """Retorna a primeira linha do IP informado ou None."""
+
+        try:
+            return SndsRow(self, self.ips.index(ip_to_int(ip)))
+        except ValueError:
+            return None
+
+    def summarize(self) -> dict:
+        """Mesmo retorno do sndslib.summarize, calculado direto sobre as colunas."""
+
+        green = self.filter_results.count(FilterResult.GREEN)
+        yellow = self.filter_results.count(FilterResult.YELLOW)
+        summary = {
+            # Assim como no sndslib.summarize, qualquer status diferente de GREEN e YELLOW conta como RED
+            'red': len(self) - green - yellow,
+            'green': green,
+            'yellow': yellow,
+            'traps': sum(self.traphits),
+            'ips': len(self),
+            'date': '',
+        }
+        # A data é o primeiro activity_end não vazio, como no sndslib.summarize
+        first = next((value for value in self.activity_end if value != NO_TIMESTAMP), NO_TIMESTAMP)
+        if first != NO_TIMESTAMP:
+            summary['date'] = time.strftime('%m/%d/%Y', time.gmtime(first))
+        return summary
+
+    def __len__(self) -> int:
+        return len(self.ips)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('SndsDataset index out of range')
+        return SndsRow(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield SndsRow(self, index)
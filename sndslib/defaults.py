@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+"""Valores padrão usados pelo parser do CLI, sem importar os módulos que os usam."""
+
+# TTL padrão (em segundos) das respostas do dia atual e do ipStatus (sndslib.cache)
+RESPONSE_TTL = 5 * 60
+
+# Intervalo padrão entre as consultas do sndslib.watch, em segundos
+WATCH_INTERVAL = 300
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Diferença entre dois snapshots do SNDS: ranges bloqueados (sndslib.get_ip_status) e dados de uso (sndslib.get_data).
+
+Exemplo de Uso:
+
+    >>> from sndslib import diff
+    >>> old = ['1.1.1.0,1.1.1.7,Yes,Blocked due to user complaints']
+    >>> new = ['1.1.1.4,1.1.1.9,Yes,Blocked due to user complaints']
+    >>> changes = diff.diff_ip_status(old, new)
+    >>> changes.added, changes.removed
+    ([('1.1.1.8', '1.1.1.9')], [('1.1.1.0', '1.1.1.3')])
+
+    >>> changes = diff.diff_data(sndslib.get_data('mykey', '092820'), sndslib.get_data('mykey', '092920'))
+    >>> changes.changed
+    [{'ip_address': '1.1.1.1', 'filter_result': ('GREEN', 'YELLOW')}]
+
+    Snapshots gravados em disco permitem comparar com a execução anterior:
+    >>> diff.save_snapshot('snds.json', sndslib.get_ip_status('mykey'), sndslib.get_data('mykey'))
+    >>> snapshot = diff.load_snapshot('snds.json')
+    >>> diff.diff_ip_status(snapshot['ip_status'], sndslib.get_ip_status('mykey'))
+"""
+
+from sndslib.ipset import BlockedIpSet, ip_to_int, int_to_ip
+from sndslib.parse import format_ip_data
+from sndslib import metrics
+import time
+import sys
+import os
+
+
+__all__ = [
+        'Diff',
+        'data_state',
+        'diff_data',
+        'diff_data_state',
+        'diff_ip_status',
+        'diff_ip_status_state',
+        'ip_status_state',
+        'load_snapshot',
+        'records',
+        'save_snapshot',
+        ]
+
+
+# Colunas dos dados de uso comparadas por padrão no diff_data
+DIFF_FIELDS = ('filter_result',)
+
+SNAPSHOT_VERSION = 1
+
+
+class Diff:
+    """Entradas adicionadas, removidas e alteradas entre o snapshot antigo e o novo."""
+
+    __slots__ = ('added', 'removed', 'changed')
+
+    def __init__(self, added, removed, changed) -> None:
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return f'Diff(added={len(self.added)}, removed={len(self.removed)}, changed={len(self.changed)})'
+
+
+def _subtract(intervals, other):
+    """Intervalos de `intervals` que não estão em `other` (ambos ordenados e sem sobreposição)."""
+
+    other = list(other)
+    result = []
+    first = 0
+    for start, end in intervals:
+        # Intervalos de `other` que terminam antes deste não afetam os próximos
+        while first < len(other) and other[first][1] < start:
+            first += 1
+
+        index = first
+        while index < len(other) and other[index][0] <= end:
+            other_start, other_end = other[index]
+            if other_start > start:
+                result.append((start, other_start - 1))
+            start = max(start, other_end + 1)
+            if start > end:
+                break
+            index += 1
+        if start <= end:
+            result.append((start, end))
+    return result
+
+
+def ip_status_state(response) -> dict:
+    """Estado compacto dos ranges bloqueados: {(inicio, fim): colunas após o range}, com os IPs como inteiros."""
+
+    state = {}
+    for line in response:
+        start, end, rest = (line.split(',', 2) + [''])[:3]
+        try:
+            state[ip_to_int(start), ip_to_int(end)] = sys.intern(rest)
+        except ValueError:
+            continue
+    return state
+
+
+def diff_ip_status(old, new) -> Diff:
+    """Compara dois snapshots dos ranges bloqueados (linhas do sndslib.get_ip_status).
+
+    Os ranges de cada snapshot são ordenados e mesclados e as diferenças saem de uma única
+    varredura das duas listas, sem expandir os IPs: `added` e `removed` são os trechos
+    (primeiro IP, último IP) que passaram a ser ou deixaram de ser bloqueados, e `changed` os
+    ranges presentes nos dois snapshots cujo motivo mudou, como dicts com 'first_ip',
+    'last_ip' e 'reason' (antigo, novo).
+    """
+
+    return diff_ip_status_state(ip_status_state(old), ip_status_state(new))
+
+
+def diff_ip_status_state(old, new) -> Diff:
+    """Igual ao diff_ip_status, para estados já montados pelo ip_status_state."""
+
+    with metrics.stage('diff') as stage:
+        old_set, new_set = BlockedIpSet(old), BlockedIpSet(new)
+        added = _subtract(new_set.intervals(), old_set.intervals())
+        removed = _subtract(old_set.intervals(), new_set.intervals())
+        changed = [
+            {'first_ip': int_to_ip(start), 'last_ip': int_to_ip(end), 'reason': (old[start, end], reason)}
+            for (start, end), reason in sorted(new.items())
+            if (start, end) in old and old[start, end] != reason
+        ]
+        stage.add(rows=len(old) + len(new))
+
+    return Diff(
+        [(int_to_ip(start), int_to_ip(end)) for start, end in added],
+        [(int_to_ip(start), int_to_ip(end)) for start, end in removed],
+        changed,
+    )
+
+
+def _rows_by_ip(response):
+    rows = {}
+    for line in response:
+        values = line.split(',')
+        try:
+            key = ip_to_int(values[0])
+        except ValueError:
+            continue
+        # Mantém a primeira ocorrência do IP, como o search_ip_status
+        if key not in rows:
+            rows[key] = format_ip_data(values)
+    return rows
+
+
+def data_state(response, fields=DIFF_FIELDS) -> dict:
+    """Estado compacto dos dados de uso: {ip como inteiro: valores das colunas `fields`}."""
+
+    return {key: tuple(sys.intern(row.get(field, '')) for field in fields)
+            for key, row in _rows_by_ip(response).items()}
+
+
+def _changes(key, old, new, fields):
+    """Colunas alteradas de um IP, no formato das entradas de Diff.changed (ou None)."""
+
+    changes = {field: (old_value, new_value)
+               for field, old_value, new_value in zip(fields, old, new) if old_value != new_value}
+    return dict(ip_address=int_to_ip(key), **changes) if changes else None
+
+
+def diff_data(old, new, fields=DIFF_FIELDS) -> Diff:
+    """Compara dois snapshots dos dados de uso (linhas do sndslib.get_data) pelo IP.
+
+    `added` e `removed` são os dados (dicts, como no search_ip_status) dos IPs que entraram ou
+    saíram, e `changed` os IPs presentes nos dois cujas colunas `fields` mudaram, como dicts com
+    'ip_address' e (antigo, novo) de cada coluna alterada. A saída é ordenada por IP.
+    """
+
+    with metrics.stage('diff') as stage:
+        old, new = _rows_by_ip(old), _rows_by_ip(new)
+        added, removed, changed = [], [], []
+        for key in sorted(old.keys() | new.keys()):
+            if key not in old:
+                added.append(new[key])
+            elif key not in new:
+                removed.append(old[key])
+            else:
+                entry = _changes(key, [old[key].get(field) for field in fields],
+                                 [new[key].get(field) for field in fields], fields)
+                if entry:
+                    changed.append(entry)
+        stage.add(rows=len(old) + len(new))
+
+    return Diff(added, removed, changed)
+
+
+def diff_data_state(old, new, fields=DIFF_FIELDS) -> Diff:
+    """Igual ao diff_data, para estados montados pelo data_state com as mesmas `fields`.
+
+    `added` e `removed` trazem só 'ip_address' e as colunas `fields`.
+    """
+
+    with metrics.stage('diff') as stage:
+        added, removed, changed = [], [], []
+        for key in sorted(old.keys() | new.keys()):
+            if key not in old:
+                added.append(dict(zip(fields, new[key]), ip_address=int_to_ip(key)))
+            elif key not in new:
+                removed.append(dict(zip(fields, old[key]), ip_address=int_to_ip(key)))
+            elif old[key] != new[key]:
+                changed.append(_changes(key, old[key], new[key], fields))
+        stage.add(rows=len(old) + len(new))
+
+    return Diff(added, removed, changed)
+
+
+def records(ip_status_diff=None, data_diff=None, fields=DIFF_FIELDS):
+    """Entradas dos diffs como registros planos, com as colunas 'kind' ('blocked' para os ranges
+    e 'ip' para os dados de uso), 'change', 'first_ip', 'last_ip', 'field', 'old' e 'new'.
+    """
+
+    if ip_status_diff is not None:
+        for change, ranges in (('added', ip_status_diff.added), ('removed', ip_status_diff.removed)):
+            for first_ip, last_ip in ranges:
+                yield {'kind': 'blocked', 'change': change, 'first_ip': first_ip, 'last_ip': last_ip}
+        for entry in ip_status_diff.changed:
+            old, new = entry['reason']
+            yield {'kind': 'blocked', 'change': 'changed', 'first_ip': entry['first_ip'],
+                   'last_ip': entry['last_ip'], 'field': 'reason', 'old': old, 'new': new}
+
+    if data_diff is not None:
+        for change, rows in (('added', data_diff.added), ('removed', data_diff.removed)):
+            for row in rows:
+                # IPs que entraram ou saíram mostram o valor da primeira coluna comparada
+                value = {'old' if change == 'removed' else 'new': row.get(fields[0])}
+                yield dict({'kind': 'ip', 'change': change, 'first_ip': row['ip_address'],
+                            'last_ip': row['ip_address'], 'field': fields[0]}, **value)
+        for entry in data_diff.changed:
+            for field, values in entry.items():
+                if field != 'ip_address':
+                    yield {'kind': 'ip', 'change': 'changed', 'first_ip': entry['ip_address'],
+                           'last_ip': entry['ip_address'], 'field': field, 'old': values[0], 'new': values[1]}
+
+
+def save_snapshot(path, ip_status, data) -> None:
+    """Grava os ranges bloqueados e os dados de uso (linhas do SNDS) em um arquivo JSON.
+
+    Assim como no sndslib.cache, a gravação é atômica (arquivo temporário + rename): uma falha no
+    meio não deixa o snapshot anterior truncado.
+    """
+
+    import tempfile
+    import json
+    snapshot = {'version': SNAPSHOT_VERSION, 'created': int(time.time()),
+                'ip_status': list(ip_status), 'data': list(data)}
+    path = os.fspath(path)
+    tmp = tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path) or '.', suffix='.tmp', delete=False)
+    try:
+        with tmp:
+            json.dump(snapshot, tmp)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.remove(tmp.name)
+        raise
+
+
+def load_snapshot(path) -> dict:
+    """Lê um snapshot gravado pelo save_snapshot: {'created', 'ip_status', 'data'}.
+
+    Levanta ValueError se o arquivo não for um snapshot do sndslib.
+    """
+
+    import json
+    with open(path) as f:
+        snapshot = json.load(f)
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f'{path} is not a sndslib snapshot')
+    return snapshot
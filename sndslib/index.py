@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Índice dos dados de uso dos IPs (sndslib.get_data) para consultas exatas por IP.
+
+Exemplo de Uso:
+
+    >>> from sndslib import sndslib
+    >>> r = sndslib.get_data('mykey')
+    >>> index = sndslib.UsageIndex(r)
+    >>> index.get('1.1.1.1')['filter_result']
+    'GREEN'
+    >>> sorted(index.get_many(['1.1.1.1', '9.9.9.9']))
+    ['1.1.1.1']
+    >>> [ip_data['ip_address'] for ip_data in index.search_network('1.1.1.0/24')]
+    ['1.1.1.0', '1.1.1.1', '1.1.1.2']
+"""
+
+from sndslib.parse import format_ip_data
+from sndslib.ipset import ip_to_int
+from bisect import bisect_left, bisect_right
+from array import array
+
+
+__all__ = [
+        'UsageIndex',
+        ]
+
+
+class UsageIndex:
+    """Indexa as linhas de uso pelo IP (primeira coluna) convertido para inteiro.
+
+    As consultas exatas são O(1) e as consultas por rede (CIDR) usam busca binária
+    sobre as chaves ordenadas, montadas apenas na primeira consulta desse tipo.
+    """
+
+    def __init__(self, response) -> None:
+        self._rows = {}
+        self._keys = None
+
+        for line in response:
+            try:
+                key = ip_to_int(line.split(',', 1)[0])
+            except ValueError:
+                continue
+            # Mantém a primeira ocorrência do IP, como a busca linear
+            self._rows.setdefault(key, line)
+
+    def _format(self, line):
+        return format_ip_data(line.split(','))
+
+    def get(self, ip) -> dict:
+        """Retorna os dados de um IP específico ou {} se ele não estiver nos dados de uso."""
+
+        try:
+            line = self._rows.get(ip_to_int(ip))
+        except ValueError:
+            return {}
+
+        return self._format(line) if line is not None else {}
+
+    def get_many(self, ips) -> dict:
+        """Retorna {ip: dados} para os IPs encontrados entre os informados."""
+
+        found = {}
+        for ip in ips:
+            ip_data = self.get(ip)
+            if ip_data:
+                found[str(ip)] = ip_data
+        return found
+
+    def search_network(self, network) -> list:
+        """Retorna, em ordem de IP, os dados de todos os IPs dentro de uma rede ('1.1.1.0/24')."""
+
+        import ipaddress
+        network = ipaddress.IPv4Network(network, strict=False)
+        if self._keys is None:
+            self._keys = array('I', sorted(self._rows))
+
+        first = bisect_left(self._keys, int(network.network_address))
+        last = bisect_right(self._keys, int(network.broadcast_address))
+        return [self._format(self._rows[key]) for key in self._keys[first:last]]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, ip) -> bool:
+        try:
+            return ip_to_int(ip) in self._rows
+        except ValueError:
+            return False
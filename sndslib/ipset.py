@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Conjunto compacto de IPs bloqueados, armazenado como intervalos inteiros.
+
+Exemplo de Uso:
+
+    >>> from sndslib.ipset import BlockedIpSet
+    >>> blocked = BlockedIpSet([('1.1.1.0', '1.1.1.3'), ('1.1.1.2', '1.1.1.5')])
+    >>> len(blocked)
+    6
+    >>> '1.1.1.4' in blocked
+    True
+    >>> list(blocked)
+    ['1.1.1.0', '1.1.1.1', '1.1.1.2', '1.1.1.3', '1.1.1.4', '1.1.1.5']
+    >>> list(blocked.cidrs())
+    ['1.1.1.0/30', '1.1.1.4/31']
+"""
+
+from bisect import bisect_right
+from array import array
+import socket
+import struct
+
+
+__all__ = [
+        'BlockedIpSet',
+        ]
+
+
+_UINT32 = struct.Struct('!I')
+
+
+def ip_to_int(ip):
+    """Converte um IPv4 (str, int ou IPv4Address) para inteiro."""
+
+    if isinstance(ip, int):
+        return ip
+    try:
+        return _UINT32.unpack(socket.inet_pton(socket.AF_INET, ip))[0]
+    except (OSError, TypeError):
+        # Caminho lento: IPv4Address ou valor inválido (levanta ValueError)
+        import ipaddress
+        return int(ipaddress.IPv4Address(ip))
+
+
+def int_to_ip(value):
+    """Converte um inteiro para a notação decimal do IPv4."""
+
+    return socket.inet_ntoa(_UINT32.pack(value))
+
+
+class BlockedIpSet:
+    """Conjunto de IPs formado por intervalos [inicio, fim] ordenados e mesclados.
+
+    A contagem, o teste de pertinência (busca binária) e a iteração não expandem os
+    intervalos, então um /8 bloqueado ocupa o mesmo espaço que um único IP.
+    """
+
+    __slots__ = ('_starts', '_ends', '_count')
+
+    def __init__(self, ranges=()) -> None:
+        self._starts = array('I')
+        self._ends = array('I')
+        self._count = 0
+
+        # Ordena (já com os intervalos invertidos corrigidos) e mescla os sobrepostos ou adjacentes
+        pairs = ((ip_to_int(start), ip_to_int(end)) for start, end in ranges)
+        for start, end in sorted((min(start, end), max(start, end)) for start, end in pairs):
+            if self._ends and start <= self._ends[-1] + 1:
+                if end > self._ends[-1]:
+                    self._count += end - self._ends[-1]
+                    self._ends[-1] = end
+                continue
+            self._starts.append(start)
+            self._ends.append(end)
+            self._count += end - start + 1
+
+    @classmethod
+    def from_ip_status(cls, response):
+        """Cria o conjunto a partir das linhas de ranges bloqueados (sndslib.get_ip_status)."""
+
+        return cls(line.split(',', 2)[:2] for line in response)
+
+    def intervals(self):
+        """Itera pelos intervalos (inicio, fim) como inteiros."""
+
+        return zip(self._starts, self._ends)
+
+    def ranges(self):
+        """Itera pelos intervalos (inicio, fim) na notação decimal do IPv4."""
+
+        for start, end in self.intervals():
+            yield int_to_ip(start), int_to_ip(end)
+
+    def cidrs(self):
+        """Itera pelo menor conjunto de blocos CIDR ('1.1.1.0/30') que cobre exatamente os intervalos.
+
+        Cada intervalo gera no máximo 62 blocos, sem expandir os IPs.
+        """
+
+        for start, end in self.intervals():
+            while start <= end:
+                # Maior bloco alinhado no início do intervalo que não passa do fim
+                size = start & -start or 1 << 32
+                while size > end - start + 1:
+                    size >>= 1
+                yield f'{int_to_ip(start)}/{33 - size.bit_length()}'
+                start += size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, ip) -> bool:
+        try:
+            value = ip_to_int(ip)
+        except ValueError:
+            return False
+
+        index = bisect_right(self._starts, value) - 1
+        return index >= 0 and value <= self._ends[index]
+
+    def __iter__(self):
+        for start, end in self.intervals():
+            for value in range(start, end + 1):
+                yield int_to_ip(value)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BlockedIpSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self) -> str:
+        ranges = ', '.join(f'{start}-{end}' for start, end in self.ranges())
+        return f'BlockedIpSet([{ranges}])'
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Cruzamento dos dados de uso (sndslib.get_data) com os ranges bloqueados (sndslib.get_ip_status).
+
+Exemplo de Uso:
+
+    >>> from sndslib.join import join_blocked
+    >>> joined = join_blocked(sndslib.get_data('mykey'), sndslib.get_ip_status('mykey'))
+    >>> joined.blocked
+    {'ips': 2, 'messages': 60409, 'traps': 81}
+    >>> joined.unblocked
+    {'ips': 1, 'messages': 12960, 'traps': 26}
+    >>> [(row['ip_address'], row['blocked']) for row in joined.rows]
+    [('1.1.1.0', True), ('1.1.1.1', True), ('1.1.1.2', False)]
+"""
+
+from sndslib.ipset import BlockedIpSet, ip_to_int
+from sndslib.parse import IP_KEYS, format_ip_data
+from sndslib import metrics
+
+
+__all__ = [
+        'BlockedJoin',
+        'join_blocked',
+        ]
+
+
+_MESSAGES = IP_KEYS.index('message_recipients')
+_TRAPS = IP_KEYS.index('traphits')
+
+
+class BlockedJoin:
+    """Linhas de uso marcadas com 'blocked' e os totais dos IPs bloqueados e não bloqueados.
+
+    Os totais têm 'ips', 'messages' (message_recipients) e 'traps' (traphits).
+    """
+
+    __slots__ = ('rows', 'blocked', 'unblocked')
+
+    def __init__(self, rows, blocked, unblocked) -> None:
+        self.rows = rows
+        self.blocked = blocked
+        self.unblocked = unblocked
+
+
+def _int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+def join_blocked(data, ip_status, rows=True) -> BlockedJoin:
+    """Marca cada linha de uso com 'blocked' (o IP está em um range bloqueado) e soma os totais.
+
+    `ip_status` são as linhas do sndslib.get_ip_status ou um sndslib.BlockedIpSet. As linhas de
+    uso são ordenadas pelo IP como inteiro e cruzadas com os ranges ordenados em uma única
+    varredura, sem expandir os IPs dos ranges. Com `rows=False` só os totais são calculados.
+    As linhas retornadas ficam na ordem dos IPs.
+    """
+
+    if not isinstance(ip_status, BlockedIpSet):
+        ip_status = BlockedIpSet.from_ip_status(ip_status)
+
+    with metrics.stage('join') as stage:
+        joined = _join(data, ip_status, rows)
+        stage.add(rows=joined.blocked['ips'] + joined.unblocked['ips'])
+    return joined
+
+
+def _join(data, ip_status, rows):
+    keyed = []
+    for line in data:
+        fields = line.split(',')
+        try:
+            keyed.append((ip_to_int(fields[0]), fields))
+        except ValueError:
+            continue
+    keyed.sort(key=lambda item: item[0])
+
+    totals = {True: {'ips': 0, 'messages': 0, 'traps': 0}, False: {'ips': 0, 'messages': 0, 'traps': 0}}
+    joined = []
+    intervals = iter(ip_status.intervals())
+    start, end = next(intervals, (None, None))
+    for ip, fields in keyed:
+        # Avança pelos ranges que terminam antes do IP; os IPs seguintes são maiores ou iguais
+        while end is not None and end < ip:
+            start, end = next(intervals, (None, None))
+        blocked = start is not None and start <= ip
+
+        total = totals[blocked]
+        total['ips'] += 1
+        total['messages'] += _int(fields[_MESSAGES]) if len(fields) > _MESSAGES else 0
+        total['traps'] += _int(fields[_TRAPS]) if len(fields) > _TRAPS else 0
+        if rows:
+            row = format_ip_data(fields)
+            row['blocked'] = blocked
+            joined.append(row)
+
+    return BlockedJoin(joined, totals[True], totals[False])
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Formato binário dos dados de uso (sndslib.get_data) e dos ranges bloqueados (sndslib.get_ip_status)
+já interpretados, lido via mmap sem decodificar nem interpretar o CSV de novo.
+
+O arquivo tem um cabeçalho (versão, tipo, número de registros, checksum CRC-32 do conteúdo),
+registros de tamanho fixo ordenados pelo IP e uma tabela de strings (helo, mailfrom, comments,
+faixa de reclamação e motivo do bloqueio). As consultas por IP são buscas binárias direto no
+buffer mapeado e os resumos percorrem os registros sem montar as linhas.
+
+Exemplo de Uso:
+
+    >>> from sndslib import mapped, sndslib
+    >>> mapped.write_data('092920.snds', sndslib.get_data('mykey', '092920'))
+    1834
+    >>> with mapped.open_data('092920.snds') as data:
+    ...     data.summarize()
+    ...     data.get('1.1.1.1')['filter_result']
+    {'red': 272, 'green': 710, 'yellow': 852, 'traps': 1298, 'ips': 1834, 'date': '09/29/2020'}
+    'GREEN'
+
+    >>> mapped.write_ip_status('blocked.snds', sndslib.get_ip_status('mykey'))
+    5
+    >>> with mapped.open_ip_status('blocked.snds') as blocked:
+    ...     '1.1.1.2' in blocked, blocked.blocked_count()
+    (True, 42)
+"""
+
+from sndslib.dataset import FilterResult, SndsDataset
+from sndslib.parse import IP_KEYS, INT_KEYS, TIME_KEYS, TEXT_KEYS, NO_TIMESTAMP, format_timestamp
+from sndslib.ipset import ip_to_int, int_to_ip
+import struct
+import mmap
+import zlib
+import time
+import os
+
+
+__all__ = [
+        'MappedData',
+        'MappedIpStatus',
+        'open_data',
+        'open_ip_status',
+        'write_data',
+        'write_ip_status',
+        ]
+
+
+MAGIC = b'SNDSMAP\0'
+VERSION = 1
+
+DATA = 1
+IP_STATUS = 2
+
+# magic, versão, tipo, registros, início da tabela de strings, primeiro activity_end (na ordem
+# original das linhas, para o summarize) e CRC-32 de tudo que vem depois do cabeçalho
+_HEADER = struct.Struct('<8sHHIQqI4x')
+
+# Ordem das colunas de data e contadores nos registros de uso
+_VALUE_KEYS = TIME_KEYS + INT_KEYS
+
+# ip, filter_result, faixa de reclamação, datas, contadores e textos (índices da tabela de strings)
+_DATA_PREFIX = '<Ib3xI'
+_DATA_RECORD = struct.Struct(_DATA_PREFIX + 'q' * len(_VALUE_KEYS) + 'I' * len(TEXT_KEYS))
+# Só filter_result e traphits, para o resumo; os deslocamentos seguem a ordem das colunas do parse
+_TRAPHITS_OFFSET = struct.calcsize(_DATA_PREFIX) + 8 * _VALUE_KEYS.index('traphits')
+_DATA_SUMMARY = struct.Struct(f'<4xb{_TRAPHITS_OFFSET - 5}xq{_DATA_RECORD.size - _TRAPHITS_OFFSET - 8}x')
+assert _DATA_SUMMARY.size == _DATA_RECORD.size
+
+# início, fim, maior fim até este registro e motivo (índice da tabela de strings)
+_RANGE_RECORD = struct.Struct('<IIII')
+
+_UINT32 = struct.Struct('<I')
+
+
+def _strings(strings) -> bytes:
+    """Tabela de strings: quantidade, deslocamentos (quantidade + 1) e os textos em UTF-8."""
+
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return struct.pack(f'<I{len(offsets)}I', len(encoded), *offsets) + b''.join(encoded)
+
+
+def _write(path, kind, count, records, strings, first_date=NO_TIMESTAMP) -> None:
+    table = _strings(strings)
+    body = records + table
+    header = _HEADER.pack(MAGIC, VERSION, kind, count, _HEADER.size + len(records), first_date, zlib.crc32(body))
+
+    # Gravação atômica (arquivo temporário + rename), como no sndslib.cache: quem tem o arquivo
+    # anterior mapeado continua lendo a versão antiga, e uma falha não deixa o arquivo truncado
+    import tempfile
+    path = os.fspath(path)
+    tmp = tempfile.NamedTemporaryFile(dir=os.path.dirname(path) or '.', suffix='.tmp', delete=False)
+    try:
+        with tmp:
+            tmp.write(header)
+            tmp.write(body)
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.remove(tmp.name)
+        raise
+
+
+def write_data(path, response) -> int:
+    """Grava os dados de uso (linhas do sndslib.get_data ou um SndsDataset) no formato binário.
+
+    Retorna o número de registros gravados.
+    """
+
+    dataset = response if isinstance(response, SndsDataset) else SndsDataset.from_data(response)
+
+    # Faixas de reclamação e textos ficam na mesma tabela de strings
+    strings = list(dataset.texts.strings)
+    complaint_codes = [len(strings) + code for code in range(len(dataset.complaint_rates.strings))]
+    strings.extend(dataset.complaint_rates.strings)
+
+    columns = [getattr(dataset, key) for key in _VALUE_KEYS]
+    texts = [getattr(dataset, key) for key in TEXT_KEYS]
+    records = bytearray(_DATA_RECORD.size * len(dataset))
+    # Ordenação estável: IPs repetidos mantêm a ordem original, e a busca retorna o primeiro
+    for position, index in enumerate(sorted(range(len(dataset)), key=dataset.ips.__getitem__)):
+        _DATA_RECORD.pack_into(
+            records, position * _DATA_RECORD.size,
+            dataset.ips[index], dataset.filter_results[index], complaint_codes[dataset.complaint_rate_codes[index]],
+            *(column[index] for column in columns), *(column[index] for column in texts),
+        )
+
+    first_date = next((value for value in dataset.activity_end if value != NO_TIMESTAMP), NO_TIMESTAMP)
+    _write(path, DATA, len(dataset), bytes(records), strings, first_date)
+    return len(dataset)
+
+
+def write_ip_status(path, response) -> int:
+    """Grava os ranges bloqueados (linhas do sndslib.get_ip_status) no formato binário.
+
+    Os ranges são gravados como vieram (ordenados pelo início), sem mesclar, para manter o
+    motivo de cada um. Retorna o número de registros gravados.
+    """
+
+    strings, codes, ranges = [''], {'': 0}, []
+    for line in response:
+        start, end, reason = (line.split(',', 2) + [''])[:3]
+        try:
+            start, end = ip_to_int(start), ip_to_int(end)
+        except ValueError:
+            continue
+        if start > end:
+            start, end = end, start
+        code = codes.get(reason)
+        if code is None:
+            code = codes[reason] = len(strings)
+            strings.append(reason)
+        ranges.append((start, end, code))
+
+    ranges.sort()
+    records = bytearray(_RANGE_RECORD.size * len(ranges))
+    max_end = 0
+    for position, (start, end, code) in enumerate(ranges):
+        max_end = max(max_end, end)
+        _RANGE_RECORD.pack_into(records, position * _RANGE_RECORD.size, start, end, max_end, code)
+
+    _write(path, IP_STATUS, len(ranges), bytes(records), strings)
+    return len(ranges)
+
+
+class _MappedFile:
+    """Arquivo binário mapeado em memória: valida o cabeçalho e lê a tabela de strings sob demanda."""
+
+    kind = None
+    record = None
+
+    def __init__(self, path, verify=True) -> None:
+        with open(path, 'rb') as f:
+            try:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f'{path} is not a sndslib binary file')
+
+        try:
+            if len(self._buffer) < _HEADER.size:
+                raise ValueError(f'{path} is not a sndslib binary file')
+            magic, version, kind, count, strings, first_date, checksum = _HEADER.unpack_from(self._buffer)
+            if magic != MAGIC:
+                raise ValueError(f'{path} is not a sndslib binary file')
+            if version != VERSION:
+                raise ValueError(f'{path}: unsupported version {version}')
+            if kind != self.kind:
+                raise ValueError(f'{path} does not hold {type(self).__name__} records')
+            if verify and zlib.crc32(memoryview(self._buffer)[_HEADER.size:]) != checksum:
+                raise ValueError(f'{path}: checksum mismatch')
+        except ValueError:
+            self._buffer.close()
+            raise
+
+        self._count = count
+        self._first_date = first_date
+        self._strings_count = _UINT32.unpack_from(self._buffer, strings)[0]
+        self._offsets = strings + _UINT32.size
+        self._texts = self._offsets + _UINT32.size * (self._strings_count + 1)
+
+    def _string(self, code) -> str:
+        start, end = struct.unpack_from('<II', self._buffer, self._offsets + _UINT32.size * code)
+        return self._buffer[self._texts + start:self._texts + end].decode('utf-8')
+
+    def _key(self, index):
+        return _UINT32.unpack_from(self._buffer, _HEADER.size + index * self.record.size)[0]
+
+    def _bisect_right(self, value) -> int:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if value < self._key(middle):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def _view(self):
+        """Trecho do buffer com os registros."""
+
+        return memoryview(self._buffer)[_HEADER.size:_HEADER.size + self._count * self.record.size]
+
+    def _records(self):
+        """Registros desempacotados um a um, sem montar a lista."""
+
+        return self.record.iter_unpack(self._view())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MappedData(_MappedFile):
+    """Dados de uso gravados pelo write_data."""
+
+    kind = DATA
+    record = _DATA_RECORD
+
+    def _format(self, values) -> dict:
+        ip, filter_result, complaint_rate, *numbers = values
+        numbers, texts = numbers[:len(_VALUE_KEYS)], numbers[len(_VALUE_KEYS):]
+        row = dict.fromkeys(IP_KEYS, '')
+        row['ip_address'] = int_to_ip(ip)
+        row['filter_result'] = FilterResult(filter_result).name
+        row['complaint_rate'] = self._string(complaint_rate)
+        for key, value in zip(_VALUE_KEYS, numbers):
+            row[key] = format_timestamp(value) if key in TIME_KEYS else str(value)
+        for key, code in zip(TEXT_KEYS, texts):
+            row[key] = self._string(code)
+        return row
+
+    def get(self, ip) -> dict:
+        """Dados de um IP no formato do sndslib.search_ip_status, ou {} se ele não estiver no arquivo."""
+
+        try:
+            value = ip_to_int(ip)
+        except ValueError:
+            return {}
+
+        # Primeiro registro com este IP
+        index = self._bisect_right(value - 1) if value else 0
+        if index >= self._count or self._key(index) != value:
+            return {}
+        return self._format(self.record.unpack_from(self._buffer, _HEADER.size + index * self.record.size))
+
+    def __contains__(self, ip) -> bool:
+        return bool(self.get(ip))
+
+    def __iter__(self):
+        """Linhas no formato do sndslib.search_ip_status, em ordem de IP."""
+
+        for values in self._records():
+            yield self._format(values)
+
+    def summarize(self) -> dict:
+        """Mesmo retorno do sndslib.summarize sobre as linhas gravadas."""
+
+        counts = [0, 0, 0]
+        traps = 0
+        for filter_result, traphits in _DATA_SUMMARY.iter_unpack(self._view()):
+            counts[filter_result] += 1
+            traps += traphits
+
+        summary = {
+            'red': self._count - counts[FilterResult.GREEN] - counts[FilterResult.YELLOW],
+            'green': counts[FilterResult.GREEN],
+            'yellow': counts[FilterResult.YELLOW],
+            'traps': traps,
+            'ips': self._count,
+            'date': '',
+        }
+        if self._first_date != NO_TIMESTAMP:
+            summary['date'] = time.strftime('%m/%d/%Y', time.gmtime(self._first_date))
+        return summary
+
+
+class MappedIpStatus(_MappedFile):
+    """Ranges bloqueados gravados pelo write_ip_status. `len` é o número de ranges gravados."""
+
+    kind = IP_STATUS
+    record = _RANGE_RECORD
+
+    def reason(self, ip):
+        """Motivo do range bloqueado que contém o IP (o de início mais próximo, se houver vários), ou None."""
+
+        try:
+            value = ip_to_int(ip)
+        except ValueError:
+            return None
+
+        # Ranges que começam até o IP, do último para o primeiro, enquanto algum anterior ainda o alcança
+        index = self._bisect_right(value) - 1
+        while index >= 0:
+            start, end, max_end, code = self.record.unpack_from(self._buffer, _HEADER.size + index * self.record.size)
+            if max_end < value:
+                break
+            if end >= value:
+                return self._string(code)
+            index -= 1
+        return None
+
+    def __contains__(self, ip) -> bool:
+        return self.reason(ip) is not None
+
+    def ranges(self):
+        """Itera por (primeiro IP, último IP, motivo) de cada range gravado, ordenados pelo início."""
+
+        for start, end, _, code in self._records():
+            yield int_to_ip(start), int_to_ip(end), self._string(code)
+
+    def blocked_count(self) -> int:
+        """Número de IPs bloqueados (sem contar duas vezes os ranges sobrepostos), como o len do list_blocked_ips."""
+
+        total = 0
+        current_start = current_end = None
+        for start, end, _, _ in self._records():
+            if current_end is not None and start <= current_end + 1:
+                current_end = max(current_end, end)
+                continue
+            if current_end is not None:
+                total += current_end - current_start + 1
+            current_start, current_end = start, end
+        if current_end is not None:
+            total += current_end - current_start + 1
+        return total
+
+
+def open_data(path, verify=True) -> MappedData:
+    """Abre um arquivo gravado pelo write_data. Com `verify` o checksum do conteúdo é conferido.
+
+    Levanta ValueError se o arquivo não for desse formato, de outra versão ou estiver corrompido.
+    """
+
+    return MappedData(path, verify)
+
+
+def open_ip_status(path, verify=True) -> MappedIpStatus:
+    """Abre um arquivo gravado pelo write_ip_status. Com `verify` o checksum do conteúdo é conferido."""
+
+    return MappedIpStatus(path, verify)
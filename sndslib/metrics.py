@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Medição das etapas internas do sndslib (busca HTTP, leitura, decodificação, resumo, ranges e rDNS).
+
+Sem nenhum listener registrado as etapas não medem nada. Cada listener é chamado ao fim de
+cada etapa com o nome dela e um dicionário com 'seconds' (tempo próprio, sem as etapas
+internas), 'bytes' e 'rows'.
+
+Exemplo de Uso:
+
+    >>> from sndslib import metrics, sndslib
+    >>> with metrics.Stats() as stats:
+    ...     sndslib.summarize(sndslib.iter_data('mykey'))
+    >>> print(stats.report())
+    stage          calls   seconds        bytes     rows
+    fetch              1     0.412            0        0
+    read               5     0.087       182004        0
+    decode             5     0.006            0     1834
+    summarize          1     0.011            0     1834
+
+    Para enviar os números a um sistema de métricas:
+    >>> metrics.add_listener(lambda stage, values: statsd.timing(f'snds.{stage}', values['seconds']))
+"""
+
+import threading
+import time
+
+
+__all__ = [
+        'Stats',
+        'add_listener',
+        'enabled',
+        'remove_listener',
+        'stage',
+        ]
+
+
+_listeners = []
+_local = threading.local()
+
+
+def add_listener(callback) -> None:
+    """Registra `callback(stage, values)`, chamado ao fim de cada etapa medida."""
+
+    _listeners.append(callback)
+
+
+def remove_listener(callback) -> None:
+    _listeners.remove(callback)
+
+
+def enabled() -> bool:
+    """Indica se há algum listener registrado."""
+
+    return bool(_listeners)
+
+
+class _Stage:
+    """Etapa em andamento: mede o tempo próprio e acumula bytes e linhas."""
+
+    __slots__ = ('name', 'bytes', 'rows', '_started', '_children')
+
+    def __init__(self, name) -> None:
+        self.name = name
+        self.bytes = 0
+        self.rows = 0
+        self._children = 0.0
+
+    def add(self, bytes=0, rows=0) -> None:
+        self.bytes += bytes
+        self.rows += rows
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._started
+        stack = _local.stack
+        stack.pop()
+        if stack:
+            # O tempo desta etapa não entra no tempo próprio da etapa que a contém
+            stack[-1]._children += elapsed
+
+        values = {'seconds': elapsed - self._children, 'bytes': self.bytes, 'rows': self.rows}
+        for callback in list(_listeners):
+            callback(self.name, values)
+
+
+class _NullStage:
+    """Etapa usada quando a medição está desligada: não faz nada."""
+
+    __slots__ = ()
+
+    def add(self, bytes=0, rows=0) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Context manager que mede a etapa `name` (`with metrics.stage('fetch') as s: ... s.add(rows=n)`)."""
+
+    return _Stage(name) if _listeners else _NULL_STAGE
+
+
+class Stats:
+    """Listener que soma as chamadas, o tempo, os bytes e as linhas de cada etapa."""
+
+    def __init__(self) -> None:
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage, values) -> None:
+        with self._lock:
+            totals = self.stages.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'bytes': 0, 'rows': 0})
+            totals['calls'] += 1
+            for field in ('seconds', 'bytes', 'rows'):
+                totals[field] += values[field]
+
+    def report(self) -> str:
+        """Tabela com os totais de cada etapa, na ordem em que apareceram."""
+
+        lines = [f"{'stage':<12} {'calls':>7} {'seconds':>9} {'bytes':>12} {'rows':>8}"]
+        for name, totals in self.stages.items():
+            lines.append(
+                f"{name:<12} {totals['calls']:>7} {totals['seconds']:>9.3f} {totals['bytes']:>12} {totals['rows']:>8}"
+            )
+        return '\n'.join(lines)
+
+    def __enter__(self):
+        add_listener(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_listener(self)
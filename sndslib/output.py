@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Escrita em streaming de registros em JSON, NDJSON ou CSV, com buffer.
+
+Os registros são gravados conforme chegam e o buffer é esvaziado a cada BUFFER_ROWS linhas,
+então a memória usada não depende do número de registros. Com `buffer_rows=1` cada registro
+chega à saída assim que é escrito, para fontes que geram os registros aos poucos.
+
+Exemplo de Uso:
+
+    >>> import sys
+    >>> from sndslib.output import get_writer
+    >>> with get_writer('csv', sys.stdout, ['ip', 'rdns']) as writer:
+    ...     writer.write({'ip': '1.1.1.1', 'rdns': 'foo.bar.exemple.com'})
+    ip,rdns
+    1.1.1.1,foo.bar.exemple.com
+"""
+
+import io
+
+# json e csv são importados pelos escritores que os usam: o CLI importa este módulo
+# mesmo para a saída em texto
+
+
+__all__ = [
+        'CsvWriter',
+        'FORMATS',
+        'JsonWriter',
+        'LineWriter',
+        'NdjsonWriter',
+        'get_writer',
+        ]
+
+
+FORMATS = ('text', 'json', 'ndjson', 'csv')
+
+# Linhas acumuladas antes de cada escrita na saída
+BUFFER_ROWS = 1024
+
+
+class _Writer:
+    """Base dos escritores: `write` formata o registro e acumula até `buffer_rows` linhas."""
+
+    def __init__(self, stream, fields=(), buffer_rows=None) -> None:
+        self.stream = stream
+        self.fields = list(fields)
+        self.buffer_rows = buffer_rows or BUFFER_ROWS
+        self.rows = 0
+        self._buffer = []
+
+    def _encode(self, record) -> str:
+        raise NotImplementedError
+
+    def _select(self, record) -> dict:
+        return {field: record.get(field) for field in self.fields} if self.fields else record
+
+    def write(self, record) -> None:
+        self._buffer.append(self._encode(record))
+        self.rows += 1
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+            if self.buffer_rows == 1:
+                self.stream.flush()
+
+    def write_many(self, records) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write(''.join(self._buffer))
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            # Com erro as linhas já escritas saem sem o fechamento do formato (o ']' do JSON),
+            # para que a saída incompleta não pareça uma lista válida
+            _Writer.close(self)
+
+
+class LineWriter(_Writer):
+    """Grava registros já formatados como texto, um por linha."""
+
+    def _encode(self, record) -> str:
+        return f'{record}\n'
+
+
+class NdjsonWriter(_Writer):
+    """Um objeto JSON por linha."""
+
+    def __init__(self, stream, fields=(), buffer_rows=None) -> None:
+        import json
+        super().__init__(stream, fields, buffer_rows)
+        self._dumps = json.dumps
+
+    def _encode(self, record) -> str:
+        return self._dumps(self._select(record), ensure_ascii=False) + '\n'
+
+
+class JsonWriter(NdjsonWriter):
+    """Uma lista JSON, aberta no primeiro registro e fechada no `close`."""
+
+    def _encode(self, record) -> str:
+        return ('[\n' if not self.rows else ',\n') + self._dumps(self._select(record), ensure_ascii=False)
+
+    def close(self) -> None:
+        self._buffer.append('\n]\n' if self.rows else '[]\n')
+        super().close()
+
+
+class CsvWriter(_Writer):
+    """CSV com cabeçalho na primeira linha."""
+
+    def __init__(self, stream, fields=(), buffer_rows=None) -> None:
+        import csv
+        super().__init__(stream, fields, buffer_rows)
+        self._line = io.StringIO()
+        self._csv = csv.writer(self._line, lineterminator='\n')
+        self._buffer.append(self._row(self.fields))
+
+    def _row(self, values) -> str:
+        self._line.seek(0)
+        self._line.truncate()
+        self._csv.writerow(values)
+        return self._line.getvalue()
+
+    def _encode(self, record) -> str:
+        return self._row(['' if record.get(field) is None else record.get(field) for field in self.fields])
+
+
+_WRITERS = {
+    'json': JsonWriter,
+    'ndjson': NdjsonWriter,
+    'csv': CsvWriter,
+}
+
+
+def get_writer(format, stream, fields=(), buffer_rows=None):
+    """Escritor do formato ('json', 'ndjson' ou 'csv') com as colunas `fields`."""
+
+    return _WRITERS[format](stream, fields, buffer_rows)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Interpretação dos dados de uso (sndslib.get_data_body) dividida entre vários processos.
+
+O corpo da resposta é dividido em blocos terminados em fim de linha e cada processo interpreta
+e agrega o seu bloco. Os processos devolvem resultados compactos (o resumo de contadores ou as
+colunas em arrays do SndsDataset), que são combinados na ordem dos blocos: o resultado é igual
+ao do sndslib.summarize e do SndsDataset.from_data em um único processo.
+
+Exemplo de Uso:
+
+    >>> from sndslib import parallel, sndslib
+    >>> body = sndslib.get_data_body('mykey')
+    >>> parallel.summarize(body, workers=4)
+    {'red': 272, 'green': 710, 'yellow': 852, 'traps': 1298, 'ips': 1834, 'date': '12/31/2019'}
+    >>> dataset = parallel.parse_dataset(body, workers=4)
+    >>> len(dataset)
+    1834
+"""
+
+from sndslib.accounts import merge_summaries
+from sndslib.dataset import SndsDataset
+from sndslib.parse import iter_lines
+from sndslib import sndslib, metrics
+import os
+
+
+__all__ = [
+        'parse_dataset',
+        'split_body',
+        'summarize',
+        ]
+
+
+# Blocos por processo (para equilibrar a carga) e tamanho mínimo de cada bloco, em bytes
+CHUNKS_PER_WORKER = 4
+MIN_CHUNK_SIZE = 1024 * 1024
+
+_LINE_END = b'\r\n'
+
+
+def split_body(body, parts) -> list:
+    """Divide o corpo em até `parts` blocos de tamanho parecido, cada um terminando em fim de linha."""
+
+    size = len(body)
+    chunks = []
+    start = 0
+    for part in range(1, parts):
+        end = body.find(_LINE_END, max(start, size * part // parts))
+        if end < 0:
+            break
+        end += len(_LINE_END)
+        chunks.append(body[start:end])
+        start = end
+    if start < size:
+        chunks.append(body[start:])
+    return chunks
+
+
+def _summarize_chunk(chunk) -> dict:
+    return sndslib.summarize(iter_lines([chunk]))
+
+
+def _parse_chunk(chunk) -> SndsDataset:
+    # O SndsDataset é formado por arrays, serializados como bytes na volta para o processo principal
+    return SndsDataset.from_data(iter_lines([chunk]))
+
+
+def _map(func, body, workers, executor):
+    """Aplica `func` a cada bloco do corpo e retorna os resultados na ordem dos blocos."""
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    parts = min(workers * CHUNKS_PER_WORKER, len(body) // MIN_CHUNK_SIZE + 1)
+    chunks = split_body(body, parts)
+    if executor is None and (workers <= 1 or len(chunks) <= 1):
+        return [func(chunk) for chunk in chunks]
+
+    if executor is not None:
+        return list(executor.map(func, chunks))
+
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return list(pool.map(func, chunks))
+
+
+def summarize(body, workers=None, executor=None) -> dict:
+    """Mesmo retorno do sndslib.summarize, com os blocos do corpo resumidos em `workers` processos.
+
+    `workers` é o número de processos (padrão: número de CPUs) e `executor` um
+    concurrent.futures.ProcessPoolExecutor já criado, para reaproveitar os processos entre chamadas.
+    Corpos menores que MIN_CHUNK_SIZE são resumidos no próprio processo.
+    """
+
+    with metrics.stage('summarize') as stage:
+        summary = merge_summaries(_map(_summarize_chunk, body, workers, executor))
+        stage.add(bytes=len(body), rows=summary['ips'])
+    return summary
+
+
+def parse_dataset(body, workers=None, executor=None) -> SndsDataset:
+    """Mesmo retorno do SndsDataset.from_data, com os blocos do corpo interpretados em `workers` processos."""
+
+    dataset = SndsDataset()
+    with metrics.stage('dataset') as stage:
+        for part in _map(_parse_chunk, body, workers, executor):
+            dataset.extend(part)
+        stage.add(bytes=len(body), rows=len(dataset))
+    return dataset
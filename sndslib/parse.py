@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+"""Interpretação das linhas retornadas pelo SNDS, compartilhada pelos módulos do sndslib."""
+
+import codecs
+import time
+
+
+# Cabeçalho das colunas dos dados de uso de IP especificado pelo SNDS
+IP_KEYS = (
+    'ip_address',
+    'activity_start',
+    'activity_end',
+    'rcpt_commands',
+    'data_commands',
+    'message_recipients',
+    'filter_result',
+    'complaint_rate',
+    'trap_message_start',
+    'trap_message_end',
+    'traphits',
+    'sample_helo',
+    'sample_mailfrom',
+    'comments',
+)
+
+# Colunas numéricas, de data e de texto livre
+INT_KEYS = ('rcpt_commands', 'data_commands', 'message_recipients', 'traphits')
+TIME_KEYS = ('activity_start', 'activity_end', 'trap_message_start', 'trap_message_end')
+TEXT_KEYS = ('sample_helo', 'sample_mailfrom', 'comments')
+
+TIMESTAMP_FORMAT = '%m/%d/%Y %I:%M %p'
+
+# Valor das colunas de data vazias
+NO_TIMESTAMP = -1
+
+
+def format_ip_data(ip_status):
+    """Nomeia os dados de cada linha de status de IP com base no cabeçalho especificado pelo SNDS"""
+
+    return dict(zip(IP_KEYS, ip_status))
+
+
+# Máximo de datas convertidas guardadas pelo parse_timestamp (o cache é esvaziado ao atingir)
+TIMESTAMP_CACHE_SIZE = 65536
+
+_timestamps = {}
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+_MERIDIEM = {'AM': 0, 'PM': 12}
+
+
+def parse_timestamp(value):
+    """Converte a data no formato do SNDS ('9/29/2020 9:00 PM', UTC) para epoch.
+
+    As datas do SNDS se repetem muito entre as linhas (e entre as colunas), então cada texto
+    é convertido uma vez e guardado; a conversão é feita à mão, sem o strptime.
+    """
+
+    try:
+        return _timestamps[value]
+    except KeyError:
+        pass
+
+    parsed = _parse_timestamp(value)
+    if len(_timestamps) >= TIMESTAMP_CACHE_SIZE:
+        _timestamps.clear()
+    _timestamps[value] = parsed
+    return parsed
+
+
+def _parse_timestamp(value):
+    if not value:
+        return NO_TIMESTAMP
+
+    parts = value.split(' ')
+    if len(parts) == 3:
+        date, clock, meridiem = parts
+        date, clock = date.split('/'), clock.split(':')
+        if (len(date) == 3 and len(clock) == 2 and len(clock[1]) == 2 and len(date[2]) == 4
+                and all(part.isdigit() for part in date + clock) and meridiem.upper() in _MERIDIEM):
+            month, day, year = int(date[0]), int(date[1]), int(date[2])
+            hour, minute = int(clock[0]), int(clock[1])
+            if 1 <= month <= 12 and 1 <= day <= _days_in_month(year, month) and 1 <= hour <= 12 and minute < 60:
+                hour = hour % 12 + _MERIDIEM[meridiem.upper()]
+                return (_days_from_civil(year, month, day) * 24 + hour) * 3600 + minute * 60
+
+    raise ValueError(f'time data {value!r} does not match format {TIMESTAMP_FORMAT!r}')
+
+
+def _days_in_month(year, month):
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+
+def _days_from_civil(year, month, day):
+    """Dias desde 1/1/1970 no calendário gregoriano (algoritmo days_from_civil de Howard Hinnant)."""
+
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def format_timestamp(value):
+    """Converte o epoch para a data no formato do SNDS ('9/29/2020 9:00 PM')."""
+
+    if value == NO_TIMESTAMP:
+        return ''
+    t = time.gmtime(value)
+    hour = t.tm_hour % 12 or 12
+    return f"{t.tm_mon}/{t.tm_mday}/{t.tm_year} {hour}:{t.tm_min:02d} {'PM' if t.tm_hour >= 12 else 'AM'}"
+
+
+# Tamanho dos blocos lidos da resposta HTTP
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(response, chunk_size=CHUNK_SIZE):
+    """Lê a resposta em blocos de bytes até o fim do corpo."""
+
+    while True:
+        chunk = response.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class LineSplitter:
+    """Decodifica blocos de bytes e separa as linhas não vazias do CSV assim que ficam completas.
+
+    Usado tanto pela leitura síncrona (iter_lines) quanto pela assíncrona (sndslib.aio).
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._pending = ''
+
+    def feed(self, chunk) -> list:
+        lines = (self._pending + self._decoder.decode(chunk)).split('\r\n')
+        # A última parte pode ser uma linha incompleta
+        self._pending = lines.pop()
+        return [line for line in lines if line]
+
+    def finish(self) -> list:
+        last = self._pending + self._decoder.decode(b'', final=True)
+        self._pending = ''
+        return [last] if last else []
+
+
+def iter_lines(chunks):
+    """Decodifica blocos de bytes e retorna as linhas não vazias do CSV assim que ficam completas."""
+
+    splitter = LineSplitter()
+    for chunk in chunks:
+        yield from splitter.feed(chunk)
+    yield from splitter.finish()
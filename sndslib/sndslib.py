@@ -33,17 +33,33 @@ Exemplo de Uso:
 """
 
 from sndslib.exceptions import SndsHttpError
-from urllib.request import urlopen
-from urllib.error import HTTPError
-from datetime import datetime
-import ipaddress
+from sndslib.parse import format_ip_data as _format_ip_data, iter_chunks, iter_lines, LineSplitter, CHUNK_SIZE
+from sndslib.parse import IP_KEYS, NO_TIMESTAMP, parse_timestamp
+from sndslib import metrics
+from functools import partial
+import threading
 import socket
-import re
+import time
+import sys
 
+# Os demais módulos (http.client, concurrent.futures, ipaddress, sqlite3...) são importados
+# apenas nas funções que os usam, para o CLI iniciar rápido
 
-__all__ = [
+
+__all__ = [  # noqa: F822 (exportados sob demanda pelo __getattr__)
+        'BlockedIpSet',
+        'SndsDataset',
+        'UsageIndex',
+        'filter_window',
         'get_data',
+        'get_data_body',
+        'get_data_range',
         'get_ip_status',
+        'iter_blocked_ips_rdns',
+        'iter_data',
+        'iter_ip_status',
+        'join_blocked',
+        'list_blocked_cidrs',
         'list_blocked_ips',
         'list_blocked_ips_rdns',
         'search_ip_status',
@@ -51,39 +67,230 @@ __all__ = [
         ]
 
 
-def get_ip_status(key):
-    """Searches SNDS Automated Data Access to blocked IP ranges."""
+# Número padrão de consultas de rDNS simultâneas
+RDNS_WORKERS = 32
+RDNS_NXDOMAIN = 'NXDOMAIN'
+
+SNDS_URL = 'https://sendersupport.olc.protection.outlook.com/snds'
+
+# Formato das datas aceitas pelo SNDS e número padrão de dias buscados em paralelo
+DATE_FORMAT = '%m%d%y'
+DATA_RANGE_WORKERS = 4
+
+# Colunas de início e fim de cada período das linhas de uso, usadas pelo filter_window
+WINDOWS = {
+    'activity': (IP_KEYS.index('activity_start'), IP_KEYS.index('activity_end')),
+    'trap': (IP_KEYS.index('trap_message_start'), IP_KEYS.index('trap_message_end')),
+}
+
+# Classes e funções exportadas por este módulo, importadas no primeiro acesso
+_LAZY_EXPORTS = {
+    'BlockedIpSet': 'sndslib.ipset',
+    'SndsDataset': 'sndslib.dataset',
+    'UsageIndex': 'sndslib.index',
+    'join_blocked': 'sndslib.join',
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    import importlib
+    value = globals()[name] = getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    return value
+
+
+def _loaded(module, name):
+    """Classe `name` do módulo se ele já foi importado; senão nenhum objeto pode ser instância dela."""
+
+    return getattr(sys.modules.get(module), name, None)
+
+
+def _http_errors():
+    """Erros de rede e do http.client, que só é importado quando há uma exceção para comparar."""
+
+    from http.client import HTTPException
+    return (OSError, HTTPException)
+
+
+# Cliente HTTP compartilhado pelas funções quando nenhum `client` é informado
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client():
+    """Retorna o cliente HTTP (sndslib.client.SndsClient) compartilhado, criado no primeiro uso.
+
+    As conexões com o SNDS ficam abertas e são reaproveitadas entre as chamadas.
+    """
+
+    from sndslib.client import SndsClient
+
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = SndsClient(SNDS_URL)
+        return _default_client
+
+
+def get_ip_status(key, cache=None, client=None):
+    """Searches SNDS Automated Data Access to blocked IP ranges.
+
+    With a `cache` (sndslib.cache.ResponseCache) a recent copy of the response is reused.
+    `client` (sndslib.client.SndsClient) replaces the shared HTTP client.
+    """
+
+    return list(iter_ip_status(key, cache, client))
+
+
+def iter_ip_status(key, cache=None, client=None):
+    """Streaming version of get_ip_status: yields each blocked range line as the response arrives."""
+
+    return _iter_endpoint(cache, 'ipStatus.aspx', key, None, partial(_open, client, 'ipStatus.aspx', key=key))
+
+
+def get_data(key, date=None, cache=None, client=None):
+    """Busca os dados de uso dos IP no SNDS Automated Data Access.
+
+    Com um `cache` (sndslib.cache.ResponseCache) os dias anteriores são buscados uma única vez
+    e os dados do dia atual são reaproveitados enquanto não expirarem. `client`
+    (sndslib.client.SndsClient) substitui o cliente HTTP compartilhado.
+    """
+
+    return list(iter_data(key, date, cache, client))
+
+
+def iter_data(key, date=None, cache=None, client=None):
+    """Versão em streaming do get_data: retorna cada linha de uso conforme a resposta chega."""
+
+    if date:
+        opener = partial(_open, client, 'data.aspx', key=key, date=date)
+    else:
+        opener = partial(_open, client, 'data.aspx', key=key)
+
+    return _iter_endpoint(cache, 'data.aspx', key, date, opener)
+
+
+def get_data_body(key, date=None, cache=None, client=None) -> bytes:
+    """Corpo bruto (CSV em UTF-8) da resposta dos dados de uso, sem separar as linhas.
+
+    Usado pela interpretação em vários processos (sndslib.parallel), que divide o corpo entre eles.
+    """
+
+    params = {'key': key, 'date': date} if date else {'key': key}
+    opener = partial(_open, client, 'data.aspx', **params)
+    response = None if cache is None else cache.open('data.aspx', key, date)
+    if response is None:
+        response = opener() if cache is None else cache.store(opener(), 'data.aspx', key, date)
 
     try:
-        response = urlopen(f'https://sendersupport.olc.protection.outlook.com/snds/ipStatus.aspx?key={key}')
-    except HTTPError as e:
+        if response.status != 200:
+            return b''
+        with metrics.stage('read') as stage:
+            body = b''.join(iter_chunks(response))
+            stage.add(bytes=len(body))
+        return body
+    except _http_errors() as e:
         raise SndsHttpError(e)
+    finally:
+        response.close()
 
-    csv = []
-    if response.status == 200:
-        csv = list(response.read().decode('utf-8').split('\r\n'))
-        csv = list(filter(None, csv))
 
-    return csv
+def get_data_range(key, start, end, workers=DATA_RANGE_WORKERS, cache=None, client=None):
+    """Busca os dados de uso de todos os dias entre `start` e `end` (inclusive, formato MMDDYY).
 
+    Os dias são buscados em paralelo em até `workers` conexões persistentes com o SNDS.
+    Retorna dois dicionários indexados pela data: as linhas de cada dia e os erros
+    (SndsHttpError) dos dias que falharam. Com um `cache` (sndslib.cache.ResponseCache) apenas os dias ainda não
+    guardados são buscados. Levanta ValueError se `end` for anterior a `start`.
 
-def get_data(key, date=None):
-    """Busca os dados de uso dos IP no SNDS Automated Data Access."""
+    >>> results, errors = sndslib.get_data_range('mykey', '092820', '093020')
+    >>> sorted(results)
+    ['092820', '092920', '093020']
+    >>> errors
+    {}
+    """
 
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime, timedelta
+
+    first = datetime.strptime(start, DATE_FORMAT).date()
+    last = datetime.strptime(end, DATE_FORMAT).date()
+    if last < first:
+        raise ValueError(f'end date {end} is before start date {start}')
+    dates = [(first + timedelta(days=n)).strftime(DATE_FORMAT) for n in range((last - first).days + 1)]
+
+    results, errors = {}, {}
+    client = client or get_client()
+    with ThreadPoolExecutor(max_workers=min(workers, len(dates))) as executor:
+        futures = {date: executor.submit(get_data, key, date, cache, client) for date in dates}
+        for date, future in futures.items():
+            try:
+                results[date] = future.result()
+            except SndsHttpError as e:
+                errors[date] = e
+
+    return results, errors
+
+
+def _open(client, endpoint, **params):
     try:
-        if date:
-            response = urlopen(f'https://sendersupport.olc.protection.outlook.com/snds/data.aspx?key={key}&date={date}')
-        else:
-            response = urlopen(f'https://sendersupport.olc.protection.outlook.com/snds/data.aspx?key={key}')
-    except HTTPError as e:
+        with metrics.stage('fetch'):
+            return (client or get_client()).open(endpoint, **params)
+    except _http_errors() as e:
+        # HTTPError (status de erro), timeouts e falhas de conexão depois das novas tentativas
         raise SndsHttpError(e)
 
-    csv = []
-    if response.status == 200:
-        csv = list(response.read().decode('utf-8').split('\r\n'))
-        csv = list(filter(None, csv))
 
-    return csv
+def _iter_endpoint(cache, endpoint, key, date, opener):
+    """Lê a resposta do cache, se houver, ou do SNDS (guardando-a no cache durante a leitura)."""
+
+    if cache is None:
+        return _iter_response(opener())
+
+    response = cache.open(endpoint, key, date)
+    if response is None:
+        response = cache.store(opener(), endpoint, key, date)
+
+    return _iter_response(response)
+
+
+def _iter_response(response):
+    """Decodifica o corpo da resposta em blocos, sem manter o corpo inteiro em memória."""
+
+    try:
+        if response.status == 200:
+            if metrics.enabled():
+                yield from _iter_response_measured(response)
+            else:
+                yield from iter_lines(iter_chunks(response))
+    except _http_errors() as e:
+        # Timeout ou conexão interrompida no meio do corpo
+        raise SndsHttpError(e)
+    finally:
+        response.close()
+
+
+def _iter_response_measured(response):
+    """Igual ao iter_lines(iter_chunks(response)), medindo a leitura e a decodificação de cada bloco."""
+
+    splitter = LineSplitter()
+    while True:
+        with metrics.stage('read') as stage:
+            chunk = response.read(CHUNK_SIZE)
+            stage.add(bytes=len(chunk))
+        if not chunk:
+            break
+        with metrics.stage('decode') as stage:
+            lines = splitter.feed(chunk)
+            stage.add(rows=len(lines))
+        yield from lines
+
+    with metrics.stage('decode') as stage:
+        lines = splitter.finish()
+        stage.add(rows=len(lines))
+    yield from lines
 
 
 def summarize(response):
@@ -92,26 +299,47 @@ def summarize(response):
     >>> r = sndslib.get_data('mykey')
     >>> sndslib.summarize(r)
     {'red': 272, 'green': 710, 'yellow': 852, 'traps': 1298, 'ips': 1834, 'date': '12/31/2019'}
-    """
 
-    # Contagem de incidências do status e total de spamtraps
-    summary = {'red': 0, 'green': 0, 'yellow': 0, 'traps': 0, 'ips': len(response), 'date': ''}
-
-    for ip_status in response:
-        status = _format_ip_data(ip_status.split(','))
-
-        if status['filter_result'] == 'GREEN':
-            summary['green'] += 1
-        elif status['filter_result'] == 'YELLOW':
-            summary['yellow'] += 1
-        else:
-            summary['red'] += 1
+    Também aceita o streaming do sndslib.iter_data, sem carregar todas as linhas em memória.
+    >>> sndslib.summarize(sndslib.iter_data('mykey'))
+    {'red': 272, 'green': 710, 'yellow': 852, 'traps': 1298, 'ips': 1834, 'date': '12/31/2019'}
 
-        summary['traps'] += int(status['traphits'])
+    Com um sndslib.SndsDataset a contagem é feita direto sobre as colunas tipadas. Para outras
+    estatísticas na mesma passada, veja sndslib.aggregate.
+    """
 
-        if not summary.get('date'):
-            data = datetime.strptime(status['activity_end'], '%m/%d/%Y %I:%M %p')
-            summary['date'] = data.strftime('%m/%d/%Y')
+    dataset = _loaded('sndslib.dataset', 'SndsDataset')
+    if dataset is not None and isinstance(response, dataset):
+        return response.summarize()
+
+    from sndslib.aggregate import aggregate, Count, CountBy, First, Sum
+
+    # Contagem de incidências do status e total de spamtraps em uma única passada
+    with metrics.stage('summarize') as stage:
+        result = aggregate(
+            response,
+            Count(name='ips'),
+            CountBy('filter_result', name='status'),
+            Sum('traphits', name='traps'),
+            First('activity_end', name='date'),
+        )
+        stage.add(rows=result['ips'])
+
+    green = result['status'].get('GREEN', 0)
+    yellow = result['status'].get('YELLOW', 0)
+    summary = {
+        'red': result['ips'] - green - yellow,
+        'green': green,
+        'yellow': yellow,
+        'traps': result['traps'],
+        'ips': result['ips'],
+        'date': '',
+    }
+
+    if result['date']:
+        # '9/29/2020 9:00 PM' -> '09/29/2020', sem carregar o strptime (e o re) só para isso
+        month, day, year = result['date'].split(' ', 1)[0].split('/')
+        summary['date'] = f'{int(month):02}/{int(day):02}/{year}'
 
     return summary
 
@@ -135,71 +363,115 @@ def search_ip_status(ip, response):
     'sample_helo': '',
     'sample_mailfrom': '',
     'comments': ''}
+
+    Para várias consultas nos mesmos dados, passe um índice (sndslib.UsageIndex) no lugar
+    da lista: cada consulta passa a ser O(1).
+    >>> index = sndslib.UsageIndex(r)
+    >>> sndslib.search_ip_status('3.3.3.3', index)['filter_result']
+    'GREEN'
+
+    Também aceita um sndslib.SndsDataset.
     """
 
-    for line in response:
-        if re.search(ip, line):
-            line = line.split(',')
-            break
-    else:
-        return {}
+    index = _loaded('sndslib.index', 'UsageIndex')
+    if index is not None and isinstance(response, index):
+        return response.get(ip)
 
-    ip_data = _format_ip_data(line)
+    dataset = _loaded('sndslib.dataset', 'SndsDataset')
+    if dataset is not None and isinstance(response, dataset):
+        row = response.find(ip)
+        return row.as_dict() if row is not None else {}
 
-    return ip_data
+    # Compara o IP exato da primeira coluna ('1.1.1.1' não deve achar '1.1.1.10')
+    ip = str(ip)
+    found, rows = None, 0
+    with metrics.stage('search') as stage:
+        for rows, line in enumerate(response, 1):
+            if line.split(',', 1)[0] == ip:
+                found = line
+                break
+        stage.add(rows=rows)
 
+    return _format_ip_data(found.split(',')) if found is not None else {}
 
-def _format_ip_data(ip_status):
-    """Nomeia os dados de cada linha de status de IP com base no cabeçalho especificado pelo SNDS"""
 
-    ip_keys = (
-        'ip_address',
-        'activity_start',
-        'activity_end',
-        'rcpt_commands',
-        'data_commands',
-        'message_recipients',
-        'filter_result',
-        'complaint_rate',
-        'trap_message_start',
-        'trap_message_end',
-        'traphits',
-        'sample_helo',
-        'sample_mailfrom',
-        'comments',
-    )
-    ip_data = dict(zip(ip_keys, ip_status))
+def filter_window(response, start=None, end=None, window='activity') -> list:
+    """Linhas de uso (sndslib.get_data) cujo período de atividade tem interseção com [start, end].
 
-    return ip_data
+    `start` e `end` são epoch (UTC) e None deixa o lado aberto. Com window='trap' o período
+    comparado é o das mensagens em spamtraps, e as linhas sem spamtraps ficam de fora, assim
+    como as linhas com datas inválidas.
+    As linhas são retornadas como vieram, então o resultado serve para as demais funções.
+
+    >>> r = sndslib.get_data('mykey')
+    >>> rows = sndslib.filter_window(r, parse_timestamp('9/29/2020 12:00 PM'), window='trap')
+    >>> sndslib.summarize(rows)
+    {'red': 0, 'green': 1, 'yellow': 1, 'traps': 81, 'ips': 2, 'date': '09/29/2020'}
+    """
+
+    try:
+        first_column, last_column = WINDOWS[window]
+    except KeyError:
+        raise ValueError(f'window must be one of {", ".join(WINDOWS)}: {window!r}')
+
+    rows = []
+    with metrics.stage('filter') as stage:
+        for line in response:
+            fields = line.split(',')
+            if len(fields) <= last_column:
+                continue
+            try:
+                first, last = parse_timestamp(fields[first_column]), parse_timestamp(fields[last_column])
+            except ValueError:
+                # Como as datas vazias, uma data inválida deixa a linha fora da janela
+                continue
+            if first == NO_TIMESTAMP or last == NO_TIMESTAMP:
+                continue
+            if (end is None or first <= end) and (start is None or last >= start):
+                rows.append(line)
+        stage.add(rows=len(rows))
+    return rows
 
 
 def list_blocked_ips(response):
-    """Calcula a lista de IPs bloqueados com base na lista de ranges bloqueados (sndslib.get_ip_status).
+    """Calcula o conjunto de IPs bloqueados com base na lista de ranges bloqueados (sndslib.get_ip_status).
 
     >>> sndslib.get_ip_status('mykey')
     ['1.1.1.1,1.1.1.3,Yes,Blocked due to user complaints or other evidence of spamming']
 
-    >>> sndslib.list_blocked_ips(r)
-    [1.1.1.1, 1.1.1.2, 1.1.1.3]
+    >>> blocked_ips = sndslib.list_blocked_ips(r)
+    >>> len(blocked_ips), '1.1.1.2' in blocked_ips
+    (3, True)
+    >>> list(blocked_ips)
+    ['1.1.1.1', '1.1.1.2', '1.1.1.3']
+
+    Os ranges são mantidos como intervalos (sndslib.ipset.BlockedIpSet) e os IPs só são
+    gerados durante a iteração.
     """
-    # Lista que receberá o total de IPs bloqueados
-    lista = []
-    # Calcula a diferença entre IP de inicio fim do range bloqueado
-    for value in response:
-        inicial = ipaddress.IPv4Address(value.split(',')[0])
-        final = ipaddress.IPv4Address(value.split(',')[1])
 
-        lista.append(str(inicial))
-        # Calcula o próximo IP bloqueado se existir mais de um no range
-        while inicial != final:
-            inicial += 1
-            # Adiciona IP atualizado a lista
-            lista.append(str(inicial))
+    from sndslib.ipset import BlockedIpSet
 
-    return lista
+    with metrics.stage('ranges') as stage:
+        blocked_ips = BlockedIpSet.from_ip_status(response)
+        stage.add(rows=len(blocked_ips))
+    return blocked_ips
 
 
-def list_blocked_ips_rdns(ips: list) -> list:
+def list_blocked_cidrs(response) -> list:
+    """Menor lista de blocos CIDR que cobre os ranges bloqueados (sndslib.get_ip_status).
+
+    Ranges sobrepostos ou adjacentes são mesclados antes da divisão em blocos, e os IPs não
+    são expandidos.
+
+    >>> sndslib.list_blocked_cidrs(['1.1.1.0,1.1.1.4,Yes,Blocked', '1.1.1.5,1.1.1.7,Yes,Blocked'])
+    ['1.1.1.0/29']
+    """
+
+    return list(list_blocked_ips(response).cidrs())
+
+
+def list_blocked_ips_rdns(ips, resolver=None, workers: int = RDNS_WORKERS,
+                          timeout: float = None, deadline: float = None, cache=None) -> list:
     """Busca o host de uma lista de endereços IP (sndslib.list_blocked_ips).
 
     >>> sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'])
@@ -208,30 +480,177 @@ def list_blocked_ips_rdns(ips: list) -> list:
     No caso do IP não tem um rDNS válido ou retornar erro na pesquisa, o retorno será 'NXDOMAIN'
     >>> sndslib.list_blocked_ips_rdns(['0.0.0.1'])
     [{'ip': '0.0.0.1', 'rdns': 'NXDOMAIN'}]
+
+    As consultas rodam em paralelo em até `workers` threads e o retorno mantém a ordem de entrada.
+    `timeout` limita cada consulta e `deadline` o tempo total (em segundos); consultas que
+    estourarem esses limites retornam 'NXDOMAIN', e a consulta que estoura o `timeout` libera
+    a vaga para o próximo IP. `resolver` substitui o `socket.gethostbyaddr`
+    e deve receber um IP e retornar o host (ou levantar `socket.error`).
+
+    Com um `cache` (sndslib.cache.RdnsCache) apenas os IPs sem resposta válida no cache são
+    consultados, e as novas respostas são gravadas nele ao final.
+
+    Para processar os resultados conforme chegam, veja sndslib.iter_blocked_ips_rdns.
+    """
+
+    return list(iter_blocked_ips_rdns(ips, resolver, workers, timeout, deadline, cache))
+
+
+def iter_blocked_ips_rdns(ips, resolver=None, workers: int = RDNS_WORKERS,
+                          timeout: float = None, deadline: float = None, cache=None):
+    """Mesmo resultado do sndslib.list_blocked_ips_rdns, gerado na ordem de entrada conforme as consultas terminam.
+
+    Cada IP é gerado assim que ele e todos os anteriores têm resposta, então a saída começa
+    antes do fim das consultas. As novas respostas são gravadas no `cache` ao final (ou quando
+    a iteração é interrompida).
     """
 
-    data = []
+    import ipaddress
 
-    if not isinstance(ips, list):
+    if isinstance(ips, (str, ipaddress.IPv4Address)):
         # Caso seja passado apenas um IP
-        ip = str(ips)
+        ips = [ips]
+
+    with metrics.stage('expand') as stage:
+        ips = [str(ip) for ip in ips]
+        stage.add(rows=len(ips))
+
+    with metrics.stage('rdns_cache') as stage:
+        known = cache.load(ips) if cache is not None else {}
+        stage.add(rows=len(known))
+
+    missing = list(dict.fromkeys(ip for ip in ips if ip not in known))
+    resolved = {}
+    position = 0
+
+    def ready():
+        # IPs seguintes que já têm resposta, mantendo a ordem de entrada
+        nonlocal position
+        while position < len(ips) and (ips[position] in known or ips[position] in resolved):
+            ip = ips[position]
+            position += 1
+            yield {'ip': ip, 'rdns': (known[ip] if ip in known else resolved[ip]) or RDNS_NXDOMAIN}
+
+    try:
+        yield from ready()
+        lookups = _iter_resolved(missing, resolver or _gethostbyaddr, workers, timeout, deadline)
         try:
-            rdns = socket.gethostbyaddr(ip)[0]
-        except socket.error:
-            # 'socket.gethostbyaddr' levanta exceção caso o IP não tenha rdns
-            rdns = 'NXDOMAIN'
+            while True:
+                # A etapa mede só a espera por cada resposta, não o consumo das linhas geradas
+                with metrics.stage('rdns') as stage:
+                    item = next(lookups, None)
+                    if item is not None:
+                        resolved[missing[item[0]]] = item[1]
+                        stage.add(rows=1)
+                if item is None:
+                    break
+                yield from ready()
+        finally:
+            lookups.close()
+
+        # Depois do deadline, os IPs ainda sem resposta saem como NXDOMAIN
+        for ip in ips[position:]:
+            yield {'ip': ip, 'rdns': (known.get(ip) or resolved.get(ip)) or RDNS_NXDOMAIN}
+    finally:
+        if cache is not None:
+            # Consultas interrompidas por timeout não são gravadas no cache
+            with metrics.stage('rdns_cache'):
+                cache.update({ip: rdns for ip, rdns in resolved.items() if rdns is not None})
+
+
+def _gethostbyaddr(ip):
+    """Resolvedor padrão do rDNS."""
+    return socket.gethostbyaddr(ip)[0]
+
+
+def _iter_resolved(ips, resolver, workers, timeout=None, deadline=None):
+    """Gera (posição, host) de cada IP conforme as consultas terminam.
+
+    As threads são daemon, então uma consulta presa além do `timeout` ou do `deadline` não
+    segura a saída do processo. A consulta que estoura o `timeout` é abandonada (gera None) e
+    uma nova thread assume as consultas seguintes no lugar da que ficou presa. Os IPs não
+    consultados até o `deadline` não são gerados.
+    """
 
-        data.append({'ip': ip, 'rdns': rdns})
+    import queue
 
-        return data
-    else:
-        # Caso seja passada uma lista de IPs
-        for ip in ips:
+    if not ips:
+        return
+
+    todo = queue.SimpleQueue()
+    for item in enumerate(ips):
+        todo.put(item)
+    results = queue.SimpleQueue()
+    lock = threading.Lock()
+    # Início das consultas em andamento, e as abandonadas por timeout
+    running = {}
+    expired = set()
+    stopped = threading.Event()
+
+    def worker():
+        while not stopped.is_set():
             try:
-                rdns = socket.gethostbyaddr(ip)[0]
+                index, ip = todo.get_nowait()
+            except queue.Empty:
+                return
+            with lock:
+                running[index] = time.monotonic()
+            try:
+                result = (resolver(ip), None)
             except socket.error:
-                rdns = 'NXDOMAIN'
+                # 'socket.gethostbyaddr' levanta exceção caso o IP não tenha rdns
+                result = (RDNS_NXDOMAIN, None)
+            except Exception as e:
+                result = (None, e)
+            with lock:
+                running.pop(index, None)
+                if index in expired:
+                    # Outra thread já assumiu as consultas desta
+                    return
+            results.put((index,) + result)
+
+    def spawn():
+        threading.Thread(target=worker, daemon=True).start()
+
+    for _ in range(max(1, min(workers, len(ips)))):
+        spawn()
+    stop = time.monotonic() + deadline if deadline is not None else None
+    remaining = len(ips)
 
-            data.append({'ip': str(ip), 'rdns': rdns})
+    try:
+        while remaining:
+            now = time.monotonic()
+            limits = []
+            if stop is not None:
+                limits.append(stop - now)
+            if timeout is not None:
+                with lock:
+                    limits.extend(started + timeout - now for started in running.values())
+                limits.append(timeout)
+            wait_for = max(0, min(limits)) if limits else None
 
-        return data
+            try:
+                index, host, error = results.get(timeout=wait_for)
+            except queue.Empty:
+                pass
+            else:
+                if error is not None:
+                    raise error
+                remaining -= 1
+                yield index, host
+
+            now = time.monotonic()
+            if stop is not None and now >= stop:
+                return
+            if timeout is not None:
+                with lock:
+                    late = [index for index, started in running.items() if now - started >= timeout]
+                    for index in late:
+                        del running[index]
+                        expired.add(index)
+                for index in late:
+                    remaining -= 1
+                    spawn()
+                    yield index, None
+    finally:
+        stopped.set()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Servidor HTTP local que responde como os endpoints do SNDS, usado pelos testes e benchmarks.
+
+Exemplo de Uso:
+
+    >>> from sndslib import sndslib
+    >>> from sndslib.client import SndsClient
+    >>> from sndslib.testing import SndsStandIn
+    >>> with SndsStandIn(data=b'1.1.1.1,...') as standin:
+    ...     sndslib.get_data('test', client=SndsClient(standin.url))
+    ['1.1.1.1,...']
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+import threading
+import gzip
+import time
+
+
+__all__ = [
+        'SndsStandIn',
+        ]
+
+
+class SndsStandIn:
+    """Serves `data.aspx` and `ipStatus.aspx` from memory on 127.0.0.1.
+
+    `data` and `ip_status` are either bytes or callables receiving the query
+    parameters and returning bytes, or an int to answer with that HTTP status.
+    With `compress` the body is gzipped for clients sending `Accept-Encoding: gzip`.
+    """
+
+    def __init__(self, data=b'', ip_status=b'', latency=0.0, chunk_size=64 * 1024, chunked=False, compress=False):
+        self.routes = {'/snds/data.aspx': data, '/snds/ipStatus.aspx': ip_status}
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunked = chunked
+        self.compress = compress
+        self.headers = []
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/snds'
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with standin._lock:
+                    standin.connections += 1
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                params = dict(parse_qsl(url.query))
+                with standin._lock:
+                    standin.requests.append((url.path, params))
+                    standin.headers.append(dict(self.headers))
+
+                body = standin.routes.get(url.path, 404)
+                if callable(body):
+                    body = body(params)
+                if standin.latency:
+                    time.sleep(standin.latency)
+
+                if isinstance(body, int):
+                    self.send_response(body)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                if standin.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    self.send_header('Content-Encoding', 'gzip')
+                if standin.chunked:
+                    self.send_header('Transfer-Encoding', 'chunked')
+                else:
+                    self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                view = memoryview(body)
+                for start in range(0, len(body), standin.chunk_size):
+                    chunk = view[start:start + standin.chunk_size]
+                    if standin.chunked:
+                        self.wfile.write(b'%x\r\n' % len(chunk) + bytes(chunk) + b'\r\n')
+                    else:
+                        self.wfile.write(chunk)
+                if standin.chunked:
+                    self.wfile.write(b'0\r\n\r\n')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# sndslib by @undersfx
+
+r"""
+Acompanha o SNDS continuamente, consultando os ranges bloqueados e os dados de uso em intervalos
+e emitindo apenas o que mudou.
+
+Entre as consultas fica em memória só o estado compacto da última resposta de cada endpoint
+(ranges como inteiros e as colunas comparadas de cada IP) e o hash do corpo, então respostas
+iguais à anterior não são interpretadas de novo e a memória não cresce com o tempo de execução.
+
+Exemplo de Uso:
+
+    >>> from sndslib.watch import Watcher
+    >>> watcher = Watcher('mykey', callback=print, interval=600)
+    >>> watcher.run()
+    {'kind': 'blocked', 'change': 'added', 'first_ip': '1.1.1.8', 'last_ip': '1.1.1.9', 'time': 1601413200}
+    {'kind': 'ip', 'change': 'changed', 'first_ip': '1.1.1.1', 'last_ip': '1.1.1.1', 'field': 'filter_result',
+     'old': 'GREEN', 'new': 'YELLOW', 'time': 1601413200}
+
+    Sem `callback` os eventos são escritos em NDJSON na saída padrão.
+"""
+
+from sndslib.diff import DIFF_FIELDS, data_state, diff_data_state, diff_ip_status_state, ip_status_state, records
+from sndslib.exceptions import SndsHttpError
+from sndslib.parse import iter_chunks, iter_lines
+from sndslib import sndslib, metrics, defaults
+import threading
+import time
+import sys
+
+
+__all__ = [
+        'Watcher',
+        ]
+
+
+# Intervalo padrão entre as consultas, em segundos
+WATCH_INTERVAL = defaults.WATCH_INTERVAL
+
+ENDPOINTS = ('ipStatus.aspx', 'data.aspx')
+
+
+class Watcher:
+    """Consulta o SNDS a cada `interval` segundos e chama `callback(evento)` para cada mudança.
+
+    Os eventos têm o formato dos registros do sndslib.diff.records, com o campo 'time' (epoch da
+    consulta). Falhas de uma consulta viram eventos com 'kind' igual a 'error' e não interrompem
+    o acompanhamento. A primeira consulta de cada endpoint só registra o estado inicial.
+
+    Um corpo vazio depois de um estado com dados costuma ser uma falha transitória do SNDS: vira
+    um evento de erro e o estado anterior é mantido. Só um segundo corpo vazio seguido é aceito
+    como o novo estado (ex.: todos os ranges desbloqueados).
+    """
+
+    def __init__(self, key, callback=None, interval=WATCH_INTERVAL, fields=DIFF_FIELDS, client=None) -> None:
+        import hashlib
+        self.key = key
+        self.callback = callback or _ndjson_callback(sys.stdout)
+        self.interval = interval
+        self.fields = tuple(fields)
+        self.client = client or sndslib.get_client()
+        self.polls = 0
+        self.unchanged = 0
+        self._hash = hashlib.blake2b
+        self._digests = {}
+        self._states = {}
+        # Endpoints cuja última resposta foi um corpo vazio ainda não aceito
+        self._empty = set()
+        self._stopped = threading.Event()
+
+    def _fetch(self, endpoint):
+        """Blocos do corpo da resposta e o hash deles."""
+
+        from http.client import HTTPException
+
+        digest = self._hash(digest_size=16)
+        try:
+            with metrics.stage('fetch'):
+                response = self.client.open(endpoint, key=self.key)
+            try:
+                with metrics.stage('read') as stage:
+                    chunks = list(iter_chunks(response))
+                    for chunk in chunks:
+                        digest.update(chunk)
+                        stage.add(bytes=len(chunk))
+            finally:
+                response.close()
+        except (OSError, HTTPException) as e:
+            raise SndsHttpError(e)
+        return chunks, digest.digest()
+
+    def _state(self, endpoint, lines):
+        if endpoint == 'ipStatus.aspx':
+            return ip_status_state(lines)
+        return data_state(lines, self.fields)
+
+    def _diff(self, endpoint, old, new):
+        if endpoint == 'ipStatus.aspx':
+            return records(ip_status_diff=diff_ip_status_state(old, new))
+        return records(data_diff=diff_data_state(old, new, self.fields), fields=self.fields)
+
+    def poll(self) -> list:
+        """Faz uma consulta de cada endpoint e retorna os eventos das mudanças desde a anterior."""
+
+        now = int(time.time())
+        events = []
+        for endpoint in ENDPOINTS:
+            try:
+                chunks, digest = self._fetch(endpoint)
+            except SndsHttpError as e:
+                events.append({'kind': 'error', 'endpoint': endpoint, 'error': str(e.reason), 'time': now})
+                continue
+
+            if self._digests.get(endpoint) == digest:
+                self._empty.discard(endpoint)
+                self.unchanged += 1
+                continue
+
+            if not any(chunks) and self._states.get(endpoint) and endpoint not in self._empty:
+                self._empty.add(endpoint)
+                events.append({'kind': 'error', 'endpoint': endpoint, 'error': 'empty response', 'time': now})
+                continue
+            self._empty.discard(endpoint)
+
+            with metrics.stage('decode') as stage:
+                lines = list(iter_lines(chunks))
+                stage.add(rows=len(lines))
+            # O corpo é descartado aqui: só o estado compacto fica até a próxima consulta
+            del chunks
+            state = self._state(endpoint, lines)
+            del lines
+
+            if endpoint in self._states:
+                events.extend(dict(record, time=now) for record in self._diff(endpoint, self._states[endpoint], state))
+            self._states[endpoint] = state
+            self._digests[endpoint] = digest
+
+        self.polls += 1
+        return events
+
+    def run(self, polls=None) -> None:
+        """Consulta até `polls` vezes (ou até o stop), esperando `interval` segundos entre elas."""
+
+        self._stopped.clear()
+        count = 0
+        while not self._stopped.is_set():
+            for event in self.poll():
+                self.callback(event)
+            count += 1
+            if polls is not None and count >= polls:
+                break
+            self._stopped.wait(self.interval)
+
+    def stop(self) -> None:
+        """Interrompe o run, inclusive durante a espera entre as consultas."""
+
+        self._stopped.set()
+
+
+def _ndjson_callback(stream):
+    import json
+
+    def callback(event):
+        stream.write(json.dumps(event, ensure_ascii=False) + '\n')
+        stream.flush()
+    return callback
@@ -1,8 +1,11 @@
 import pytest
+import io
 from unittest.mock import Mock
 from sndslib import sndslib
+from sndslib.testing import SndsStandIn
 from urllib.error import HTTPError
 import socket
+import time
 
 
 IP_STATUS_VALUE = b"""1.1.1.0,1.1.1.1,Yes,Blocked due to user complaints or other evidence of spamming\r
@@ -16,13 +19,25 @@ DATA_VALUE = b"""1.1.1.0,12/31/2019 8:00 AM,9/29/2020 9:00 PM,14129,14129,13025,
 1.1.1.2,12/31/2019 9:00 PM,9/29/2020 9:00 PM,14121,14121,12960,RED,< 0.1%,9/29/2020 8:07 AM,9/29/2020 11:53 AM,26,,,"""  # noqa
 
 
-@pytest.fixture
-def get_ip_status_urlopen_mock(mocker):
+def response_mock(body, status=200):
     resp_mock = Mock()
-    resp_mock.status = 200
-    resp_mock.read.return_value = IP_STATUS_VALUE
-    mock = mocker.patch('sndslib.sndslib.urlopen')
-    mock.return_value = resp_mock
+    resp_mock.status = status
+    resp_mock.read.side_effect = io.BytesIO(body).read
+    return resp_mock
+
+
+@pytest.fixture(autouse=True)
+def cache_home_mock(tmp_path, monkeypatch):
+    """Keeps the on-disk caches and the history archive inside the test's temporary directory."""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    monkeypatch.setenv('XDG_DATA_HOME', str(tmp_path / 'data'))
+    return tmp_path / 'cache'
+
+
+@pytest.fixture
+def get_ip_status_http_mock(mocker):
+    mock = mocker.patch('sndslib.client.SndsClient.open')
+    mock.side_effect = lambda *args, **kwargs: response_mock(IP_STATUS_VALUE)
     return mock
 
 
@@ -30,18 +45,16 @@ def get_ip_status_urlopen_mock(mocker):
 def get_ip_status_function_mock(mocker):
     csv = list(IP_STATUS_VALUE.decode('utf-8').split('\r\n'))
     csv = list(filter(None, csv))
+    mocker.patch('sndslib.sndslib.iter_ip_status', side_effect=lambda *args, **kwargs: iter(csv))
     mock = mocker.patch('sndslib.sndslib.get_ip_status')
     mock.return_value = csv
     return mock
 
 
 @pytest.fixture
-def get_data_urlopen_mock(mocker):
-    resp_mock = Mock()
-    resp_mock.status = 200
-    resp_mock.read.return_value = DATA_VALUE
-    mock = mocker.patch('sndslib.sndslib.urlopen')
-    mock.return_value = resp_mock
+def get_data_http_mock(mocker):
+    mock = mocker.patch('sndslib.client.SndsClient.open')
+    mock.side_effect = lambda *args, **kwargs: response_mock(DATA_VALUE)
     return mock
 
 
@@ -49,6 +62,7 @@ def get_data_urlopen_mock(mocker):
 def get_data_function_mock(mocker):
     csv = list(DATA_VALUE.decode('utf-8').split('\r\n'))
     csv = list(filter(None, csv))
+    mocker.patch('sndslib.sndslib.iter_data', side_effect=lambda *args, **kwargs: iter(csv))
     mock = mocker.patch('sndslib.sndslib.get_data')
     mock.return_value = csv
     return mock
@@ -69,14 +83,14 @@ def socket_error_mock(mocker):
 
 
 @pytest.fixture
-def blocked_ips_mock(get_ip_status_urlopen_mock):
+def blocked_ips_mock(get_ip_status_http_mock):
     resp = sndslib.get_ip_status('test')
     blocked_ips = sndslib.list_blocked_ips(resp)
     return blocked_ips
 
 
 @pytest.fixture
-def blocked_ips_rdns_mock(get_ip_status_urlopen_mock, socket_mock):
+def blocked_ips_rdns_mock(get_ip_status_http_mock, socket_mock):
     resp = sndslib.get_ip_status('test')
     blocked_ips = sndslib.list_blocked_ips(resp)
     blocked_ips_with_rdns = sndslib.list_blocked_ips_rdns(blocked_ips)
@@ -84,7 +98,32 @@ def blocked_ips_rdns_mock(get_ip_status_urlopen_mock, socket_mock):
 
 
 @pytest.fixture
-def urlopen_raises_httperror_mock(mocker):
-    mock = mocker.patch('sndslib.sndslib.urlopen')
+def http_raises_httperror_mock(mocker):
+    mock = mocker.patch('sndslib.client.SndsClient.open')
     mock.side_effect = HTTPError('test', '000', 'Mock HTTPError', {}, {})
     return mock
+
+
+@pytest.fixture
+def slow_resolver():
+    """Fake resolver that answers `<ip>.rdns.mock.com` after a per-IP delay."""
+    def factory(delays=None, default=0.0, failures=()):
+        def resolver(ip):
+            time.sleep((delays or {}).get(ip, default))
+            if ip in failures:
+                raise socket.error
+            return f'{ip}.rdns.mock.com'
+        return resolver
+    return factory
+
+
+@pytest.fixture
+def snds_standin(monkeypatch):
+    """Local HTTP server answering like SNDS, with sndslib pointed at it."""
+    with SndsStandIn(data=DATA_VALUE, ip_status=IP_STATUS_VALUE) as standin:
+        monkeypatch.setattr(sndslib, 'SNDS_URL', standin.url)
+        # Each test gets its own shared client, pointed at this server
+        monkeypatch.setattr(sndslib, '_default_client', None)
+        yield standin
+        if sndslib._default_client is not None:
+            sndslib._default_client.close()
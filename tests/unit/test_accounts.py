@@ -0,0 +1,65 @@
+from sndslib.accounts import fetch_accounts, merge_summaries
+from sndslib.exceptions import SndsHttpError
+from tests.conftest import DATA_VALUE, IP_STATUS_VALUE
+import pytest
+import time
+
+
+OTHER_DATA = b'2.2.2.2,9/28/2020 9:00 PM,9/29/2020 9:00 PM,10,10,10,GREEN,< 0.1%,,,5,,,'
+OTHER_IP_STATUS = b'1.1.1.0,1.1.1.5,Yes,Blocked\r\n3.3.3.3,3.3.3.3,Yes,Blocked'
+
+
+@pytest.fixture
+def accounts_standin(snds_standin):
+    bodies = {'key1': (DATA_VALUE, IP_STATUS_VALUE), 'key2': (OTHER_DATA, OTHER_IP_STATUS)}
+    snds_standin.routes['/snds/data.aspx'] = lambda params: bodies.get(params['key'], (403,))[0]
+    snds_standin.routes['/snds/ipStatus.aspx'] = lambda params: bodies.get(params['key'], (403, 403))[1]
+    return snds_standin
+
+
+def test_sndshttperror_does_not_exit():
+    error = SndsHttpError('boom')
+    assert str(error) == 'Could not connect to SNDS API. Reason: boom'
+    assert error.reason == 'boom'
+
+
+def test_fetch_accounts_results_and_errors(accounts_standin):
+    accounts = fetch_accounts(['key1', 'bad', 'key2'])
+    assert sorted(accounts.results) == ['key1', 'key2']
+    assert list(accounts.errors) == ['bad']
+    assert isinstance(accounts.errors['bad'], SndsHttpError)
+    assert len(accounts.results['key1'].data) == 3
+
+
+def test_fetch_accounts_deduplicates_keys(accounts_standin):
+    accounts = fetch_accounts(['key1', 'key1'])
+    assert list(accounts.results) == ['key1']
+    assert len(accounts_standin.requests) == 2
+
+
+def test_fetch_accounts_empty():
+    accounts = fetch_accounts([])
+    assert accounts.results == {} and accounts.errors == {}
+
+
+def test_fetch_accounts_merged_summary(accounts_standin):
+    accounts = fetch_accounts(['key1', 'key2'])
+    assert accounts.summaries()['key2']['traps'] == 5
+    assert accounts.summary() == {'red': 1, 'green': 2, 'yellow': 1, 'traps': 112, 'ips': 4, 'date': '09/29/2020'}
+
+
+def test_fetch_accounts_merged_blocked_ips(accounts_standin):
+    blocked = fetch_accounts(['key1', 'key2']).blocked_ips()
+    assert '1.1.1.4' in blocked and '3.3.3.3' in blocked
+    assert len(blocked) == 11 + 3 + 1
+
+
+def test_fetch_accounts_concurrent(accounts_standin):
+    accounts_standin.latency = 0.2
+    started = time.monotonic()
+    fetch_accounts(['key1', 'key2', 'bad'])
+    assert time.monotonic() - started < 0.2 * 6 / 2
+
+
+def test_merge_summaries_empty():
+    assert merge_summaries([]) == {'red': 0, 'green': 0, 'yellow': 0, 'traps': 0, 'ips': 0, 'date': ''}
@@ -0,0 +1,76 @@
+from sndslib.aggregate import aggregate, Count, CountBy, First, GroupByPrefix, Max, Min, Sum
+from sndslib.parse import parse_timestamp
+from tests.conftest import DATA_VALUE
+
+
+LINES = DATA_VALUE.decode('utf-8').split('\r\n') + [
+    '1.1.2.9,9/28/2020 8:00 PM,9/29/2020 9:00 PM,10,10,10,GREEN,< 0.1%,,,0,,,',
+]
+
+
+def test_aggregate_empty_response():
+    assert aggregate([], Count(), Sum('traphits'), Max('traphits'), First('activity_end')) == {
+        'count': 0, 'sum_traphits': 0, 'max_traphits': None, 'first_activity_end': None,
+    }
+
+
+def test_aggregate_default_names():
+    result = aggregate(LINES, Count(), CountBy('filter_result'), Sum('message_recipients'))
+    assert result == {
+        'count': 4,
+        'count_by_filter_result': {'GREEN': 2, 'YELLOW': 1, 'RED': 1},
+        'sum_message_recipients': 13025 + 47384 + 12960 + 10,
+    }
+
+
+def test_aggregate_custom_name():
+    assert aggregate(LINES, Sum('traphits', name='traps')) == {'traps': 107}
+
+
+def test_aggregate_min_max_numbers():
+    result = aggregate(LINES, Min('message_recipients'), Max('message_recipients'))
+    assert result == {'min_message_recipients': 10, 'max_message_recipients': 47384}
+
+
+def test_aggregate_min_max_timestamps_skip_empty():
+    result = aggregate(LINES, Min('trap_message_start'), Max('activity_start'))
+    assert result['min_trap_message_start'] == parse_timestamp('9/28/2020 9:08 PM')
+    assert result['max_activity_start'] == parse_timestamp('9/28/2020 8:00 PM')
+
+
+def test_aggregate_first():
+    assert aggregate(LINES, First('filter_result')) == {'first_filter_result': 'GREEN'}
+
+
+def test_aggregate_group_by_prefix():
+    result = aggregate(LINES, GroupByPrefix(24, Count(), Sum('traphits')))
+    assert result == {
+        'by_prefix24': {
+            '1.1.1.0/24': {'count': 3, 'sum_traphits': 107},
+            '1.1.2.0/24': {'count': 1, 'sum_traphits': 0},
+        }
+    }
+
+
+def test_aggregate_group_by_prefix_default_count():
+    assert aggregate(LINES, GroupByPrefix(16)) == {'by_prefix16': {'1.1.0.0/16': {'count': 4}}}
+
+
+def test_aggregate_single_pass():
+    consumed = []
+
+    def stream():
+        for line in LINES:
+            consumed.append(line)
+            yield line
+
+    aggregate(stream(), Count(), Sum('traphits'), GroupByPrefix(24))
+    assert consumed == LINES
+
+
+def test_aggregators_can_be_reused():
+    aggregators = (Count(), CountBy('filter_result'), Sum('traphits'), Min('traphits'), First('activity_end'),
+                   GroupByPrefix(24, Count()))
+    first = aggregate(LINES, *aggregators)
+    assert aggregate(LINES, *aggregators) == first
+    assert aggregate([], *aggregators)['count'] == 0
@@ -0,0 +1,204 @@
+from sndslib import aio, sndslib
+from sndslib.cache import RdnsCache
+from sndslib.exceptions import SndsHttpError
+from unittest.mock import patch
+import threading
+import asyncio
+import socket
+import pytest
+import time
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_aio_get_data_same_as_sync(snds_standin, get_data_http_mock):
+    assert run(aio.get_data('test')) == sndslib.get_data('test')
+
+
+def test_aio_get_data_with_date(snds_standin):
+    assert len(run(aio.get_data('test', '092920'))) == 3
+    assert snds_standin.requests == [('/snds/data.aspx', {'key': 'test', 'date': '092920'})]
+
+
+def test_aio_get_ip_status(snds_standin):
+    resp = run(aio.get_ip_status('test'))
+    assert resp[0] == '1.1.1.0,1.1.1.1,Yes,Blocked due to user complaints or other evidence of spamming'
+    assert len(resp) == 5
+
+
+def test_aio_chunked_small_reads(snds_standin):
+    snds_standin.chunked = True
+    snds_standin.chunk_size = 7
+    assert len(run(aio.get_data('test'))) == 3
+
+
+def test_aio_http_error(snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = 503
+    with pytest.raises(SndsHttpError):
+        run(aio.get_data('test'))
+
+
+def test_aio_redirect_is_an_error(snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = 302
+    with pytest.raises(SndsHttpError):
+        run(aio.get_data('test'))
+
+
+def test_aio_client_created_outside_the_loop(snds_standin):
+    client = aio.AsyncSndsClient()
+
+    async def main():
+        async with client:
+            return await aio.get_data('test', client=client)
+
+    # Cada asyncio.run usa um loop novo
+    assert len(run(main())) == 3
+    assert len(run(main())) == 3
+
+
+def test_aio_connection_error():
+    async def main():
+        async with aio.AsyncSndsClient('http://127.0.0.1:9/snds', timeout=1) as client:
+            await aio.get_data('test', client=client)
+
+    with pytest.raises(SndsHttpError):
+        run(main())
+
+
+def test_aio_client_shares_connections(snds_standin):
+    async def main():
+        async with aio.AsyncSndsClient(limit=2) as client:
+            results = await asyncio.gather(*(aio.get_data('test', client=client) for _ in range(6)))
+            return results, client.connections
+
+    results, connections = run(main())
+    assert all(len(rows) == 3 for rows in results)
+    assert connections <= 2
+    assert snds_standin.connections <= 2
+
+
+def test_aio_client_reuses_connection_sequentially(snds_standin):
+    async def main():
+        async with aio.AsyncSndsClient() as client:
+            await aio.get_data('test', client=client)
+            await aio.get_ip_status('test', client=client)
+            await aio.get_data('test', client=client)
+
+    run(main())
+    assert snds_standin.connections == 1
+
+
+def test_aio_iter_data_is_async_iterator(snds_standin):
+    async def main():
+        return [line.split(',')[0] async for line in aio.iter_data('test')]
+
+    assert run(main()) == ['1.1.1.0', '1.1.1.1', '1.1.1.2']
+
+
+def test_aio_rdns_keeps_order_and_bounds_concurrency():
+    active = {'now': 0, 'max': 0}
+
+    async def resolver(ip):
+        active['now'] += 1
+        active['max'] = max(active['max'], active['now'])
+        await asyncio.sleep(0.01 * (10 - int(ip.split('.')[-1])))
+        active['now'] -= 1
+        return f'{ip}.rdns.mock.com'
+
+    ips = [f'1.1.1.{i}' for i in range(10)]
+    rdns = run(aio.list_blocked_ips_rdns(ips, resolver=resolver, workers=3))
+    assert [r['rdns'] for r in rdns] == [f'{ip}.rdns.mock.com' for ip in ips]
+    assert active['max'] == 3
+
+
+def test_aio_rdns_timeout_and_failure():
+    async def resolver(ip):
+        if ip == '1.1.1.1':
+            await asyncio.sleep(1)
+        if ip == '1.1.1.2':
+            raise socket.herror
+        return 'rdns.mock.com'
+
+    started = time.monotonic()
+    rdns = run(aio.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2', '1.1.1.3'], resolver=resolver, timeout=0.1))
+    assert time.monotonic() - started < 0.5
+    assert [r['rdns'] for r in rdns] == ['NXDOMAIN', 'NXDOMAIN', 'rdns.mock.com']
+
+
+def test_aio_rdns_deadline(slow_resolver):
+    ips = [f'1.1.1.{i}' for i in range(10)]
+    started = time.monotonic()
+    rdns = run(aio.list_blocked_ips_rdns(ips, resolver=slow_resolver(default=0.1), workers=1, deadline=0.25))
+    assert time.monotonic() - started < 0.5
+    assert rdns[0]['rdns'] == '1.1.1.0.rdns.mock.com'
+    assert rdns[-1]['rdns'] == 'NXDOMAIN'
+
+
+def test_aio_rdns_default_resolver(mocker):
+    getnameinfo = mocker.patch('socket.getnameinfo', return_value=('rdns.mock.com', '0'))
+    assert run(aio.list_blocked_ips_rdns('1.1.1.1')) == [{'ip': '1.1.1.1', 'rdns': 'rdns.mock.com'}]
+    getnameinfo.assert_called_once_with(('1.1.1.1', 0), socket.NI_NAMEREQD)
+
+
+def test_aio_rdns_uses_cache(tmp_path, slow_resolver):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    cache.update({'1.1.1.1': 'cached.mock.com'})
+    rdns = run(aio.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'], resolver=slow_resolver(), cache=cache))
+    assert rdns == [
+        {'ip': '1.1.1.1', 'rdns': 'cached.mock.com'},
+        {'ip': '1.1.1.2', 'rdns': '1.1.1.2.rdns.mock.com'},
+        ]
+    assert cache.load(['1.1.1.2']) == {'1.1.1.2': '1.1.1.2.rdns.mock.com'}
+
+
+def test_aio_rdns_cache_runs_off_the_loop(tmp_path, slow_resolver):
+    threads = []
+
+    class RecordingCache(RdnsCache):
+        def load(self, ips):
+            threads.append(threading.current_thread())
+            return super().load(ips)
+
+        def update(self, results):
+            threads.append(threading.current_thread())
+            super().update(results)
+
+    cache = RecordingCache(str(tmp_path / 'rdns.sqlite3'))
+    run(aio.list_blocked_ips_rdns(['1.1.1.1'], resolver=slow_resolver(), cache=cache))
+    assert len(threads) == 2 and threading.main_thread() not in threads
+
+
+def test_aio_rdns_timeout_not_cached(tmp_path):
+    async def resolver(ip):
+        await asyncio.sleep(1)
+
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    rdns = run(aio.list_blocked_ips_rdns(['1.1.1.1'], resolver=resolver, timeout=0.1, cache=cache))
+    assert rdns == [{'ip': '1.1.1.1', 'rdns': 'NXDOMAIN'}]
+    assert cache.load(['1.1.1.1']) == {}
+
+
+def test_aio_cancelled_request_releases_connection(snds_standin):
+    snds_standin.latency = 0.3
+
+    async def main():
+        async with aio.AsyncSndsClient(limit=1) as client:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(aio.get_data('test', client=client), 0.1)
+            snds_standin.latency = 0
+            return await asyncio.wait_for(aio.get_data('test', client=client), 2)
+
+    assert len(run(main())) == 3
+
+
+def test_aio_invalid_status_line_releases_connection(snds_standin):
+    async def main():
+        async with aio.AsyncSndsClient(limit=1) as client:
+            with patch.object(client, '_readline', return_value=b'garbage\r\n'):
+                with pytest.raises(SndsHttpError):
+                    await aio.get_data('test', client=client)
+            return await asyncio.wait_for(aio.get_data('test', client=client), 2)
+
+    assert len(run(main())) == 3
@@ -0,0 +1,115 @@
+from sndslib import sndslib
+from sndslib.archive import Archive, default_archive_path
+from tests.conftest import DATA_VALUE
+import sqlite3
+
+
+DATA = DATA_VALUE.decode().split('\r\n')
+
+YELLOW_DATA = [line.replace('GREEN', 'YELLOW').replace(',41,', ',5,') for line in DATA]
+
+
+def test_default_archive_path(tmp_path):
+    assert default_archive_path() == str(tmp_path / 'data' / 'sndslib' / 'archive.sqlite3')
+    assert Archive().path == default_archive_path()
+
+
+def test_ingest_returns_rows_and_is_idempotent(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    assert archive.ingest(DATA, '092920') == 3
+    assert archive.ingest(DATA, '092920') == 3
+    with sqlite3.connect(archive.path) as conn:
+        assert conn.execute('SELECT count(*) FROM usage').fetchone() == (3,)
+    assert archive.dates() == ['092920']
+
+
+def test_ingest_date_from_activity_end(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    archive.ingest(DATA + ['', 'not an ip,,,'])
+    assert archive.dates() == ['092920']
+    assert archive.ingest([]) == 0
+
+
+def test_history(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    archive.ingest(DATA, '092820')
+    archive.ingest(YELLOW_DATA, '092920')
+
+    history = archive.history('1.1.1.0')
+    assert [(day['date'], day['filter_result'], day['traphits']) for day in history] == [
+        ('09/28/2020', 'GREEN', '41'), ('09/29/2020', 'YELLOW', '5')
+    ]
+    # Mesmas colunas e valores do sndslib.search_ip_status, mais o dia
+    assert dict(history[0], date=None) == dict(sndslib.search_ip_status('1.1.1.0', DATA), date=None)
+
+    assert [day['date'] for day in archive.history('1.1.1.0', start='092920')] == ['09/29/2020']
+    assert [day['date'] for day in archive.history('1.1.1.0', end='092820')] == ['09/28/2020']
+    assert archive.history('1.1.1.9') == []
+    assert archive.history('not an ip') == []
+
+
+def test_summaries_match_summarize(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    archive.ingest(DATA, '092820')
+    archive.ingest(YELLOW_DATA, '092920')
+
+    summaries = archive.summaries()
+    assert list(summaries) == ['092820', '092920']
+    assert summaries['092820'] == sndslib.summarize(DATA)
+    assert summaries['092920'] == sndslib.summarize(YELLOW_DATA)
+    assert list(archive.summaries('092920', '123120')) == ['092920']
+
+
+def test_summaries_after_reingest(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    archive.ingest(DATA, '092920')
+    archive.ingest(YELLOW_DATA, '092920')
+    assert archive.summaries()['092920'] == sndslib.summarize(YELLOW_DATA)
+
+
+def test_totals(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    archive.ingest(DATA, '092820')
+    archive.ingest(YELLOW_DATA, '092920')
+
+    assert archive.totals() == {
+        'days': 2, 'ips': 3, 'messages': 146738, 'traps': 178, 'green': 1, 'yellow': 3, 'red': 2
+    }
+    assert archive.totals('092920')['days'] == 1
+    assert archive.totals(ip='1.1.1.0') == {
+        'days': 2, 'ips': 1, 'messages': 26050, 'traps': 46, 'green': 1, 'yellow': 1, 'red': 0
+    }
+    assert archive.totals(ip='1.1.1.9')['days'] == 0
+    assert archive.totals('010121') == {
+        'days': 0, 'ips': 0, 'messages': 0, 'traps': 0, 'green': 0, 'yellow': 0, 'red': 0
+    }
+
+
+def test_reingest_replaces_whole_day(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    archive.ingest(DATA, '092920')
+    assert archive.ingest(DATA[:1], '092920') == 1
+    assert archive.history('1.1.1.1') == []
+    assert archive.summaries()['092920'] == sndslib.summarize(DATA[:1])
+
+
+def test_ingest_keeps_first_row_of_duplicate_ip(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    assert archive.ingest(DATA + YELLOW_DATA[:1], '092920') == 3
+    assert archive.history('1.1.1.0')[0]['filter_result'] == 'GREEN'
+
+
+def test_empty_ingest_keeps_archived_day(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    archive.ingest(DATA, '092920')
+    assert archive.ingest([], '092920') == 0
+    assert archive.ingest([''], '092920') == 0
+    assert archive.dates() == ['092920']
+    assert len(archive.history('1.1.1.1')) == 1
+
+
+def test_ingest_tolerates_malformed_timestamps(tmp_path):
+    archive = Archive(str(tmp_path / 'archive.sqlite3'))
+    data = [DATA[0].replace('9/29/2020 8:07 AM', 'not a date')] + DATA[1:]
+    assert archive.ingest(data, '092920') == 3
+    assert archive.history('1.1.1.0')[0]['trap_message_start'] == ''
@@ -0,0 +1,206 @@
+from sndslib import sndslib
+from sndslib.exceptions import SndsHttpError
+from sndslib.cache import RdnsCache, ResponseCache, default_cache_dir
+from tests.conftest import DATA_VALUE, response_mock
+import pytest
+import gzip
+import time
+import os
+
+
+def test_default_cache_dir_uses_xdg(cache_home_mock):
+    assert default_cache_dir() == os.path.join(str(cache_home_mock), 'sndslib')
+
+
+def test_rdns_cache_default_path(cache_home_mock):
+    cache = RdnsCache()
+    assert cache.path == os.path.join(str(cache_home_mock), 'sndslib', 'rdns.sqlite3')
+
+
+def test_rdns_cache_roundtrip(tmp_path):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    cache.update({'1.1.1.1': 'rdns.mock.com', '0.0.0.1': 'NXDOMAIN'})
+    assert cache.load(['1.1.1.1', '0.0.0.1', '2.2.2.2']) == {'1.1.1.1': 'rdns.mock.com', '0.0.0.1': 'NXDOMAIN'}
+
+
+def test_rdns_cache_load_empty(tmp_path):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    assert cache.load([]) == {}
+
+
+def test_rdns_cache_load_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr('sndslib.cache.RDNS_LOAD_BATCH', 3)
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    cache.update({f'1.1.1.{n}': f'{n}.mock.com' for n in range(10)})
+    ips = [f'1.1.1.{n}' for n in range(0, 20, 2)] + ['1.1.1.0']
+    assert cache.load(ips) == {f'1.1.1.{n}': f'{n}.mock.com' for n in range(0, 10, 2)}
+
+
+def test_rdns_cache_expired_entries(tmp_path, mocker):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'), ttl=100, nxdomain_ttl=10)
+    time_mock = mocker.patch('sndslib.cache.time.time', return_value=1000)
+    cache.update({'1.1.1.1': 'rdns.mock.com', '0.0.0.1': 'NXDOMAIN'})
+    time_mock.return_value = 1050
+    assert cache.load(['1.1.1.1', '0.0.0.1']) == {'1.1.1.1': 'rdns.mock.com'}
+    time_mock.return_value = 1200
+    assert cache.load(['1.1.1.1', '0.0.0.1']) == {}
+
+
+def test_rdns_cache_clear(tmp_path):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    cache.update({'1.1.1.1': 'rdns.mock.com'})
+    cache.clear()
+    assert cache.load(['1.1.1.1']) == {}
+
+
+def test_list_blocked_ips_rdns_warm_cache_skips_lookups(tmp_path, socket_mock):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    first = sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'], cache=cache)
+    assert socket_mock.call_count == 2
+    second = sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'], cache=cache)
+    assert socket_mock.call_count == 2
+    assert first == second
+
+
+def test_list_blocked_ips_rdns_caches_nxdomain(tmp_path, socket_error_mock):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    sndslib.list_blocked_ips_rdns(['0.0.0.1'], cache=cache)
+    assert cache.load(['0.0.0.1']) == {'0.0.0.1': 'NXDOMAIN'}
+
+
+def test_list_blocked_ips_rdns_does_not_cache_timeouts(tmp_path, slow_resolver):
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    resolver = slow_resolver({'1.1.1.1': 1})
+    rdns_return = sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'], resolver=resolver, timeout=0.1, cache=cache)
+    assert rdns_return[0] == {'ip': '1.1.1.1', 'rdns': 'NXDOMAIN'}
+    assert cache.load(['1.1.1.1', '1.1.1.2']) == {'1.1.1.2': '1.1.1.2.rdns.mock.com'}
+
+
+def test_response_cache_default_directory(cache_home_mock):
+    assert ResponseCache().directory == os.path.join(str(cache_home_mock), 'sndslib', 'responses')
+
+
+def test_response_cache_miss_then_hit(tmp_path, get_data_http_mock):
+    cache = ResponseCache(str(tmp_path))
+    first = sndslib.get_data('test', cache=cache)
+    second = sndslib.get_data('test', cache=cache)
+    assert first == second
+    assert get_data_http_mock.call_count == 1
+    assert cache.stats == {'hits': 1, 'misses': 1}
+
+
+def test_response_cache_is_compressed_and_hides_key(tmp_path, get_data_http_mock):
+    cache = ResponseCache(str(tmp_path))
+    sndslib.get_data('secret-key', cache=cache)
+    names = os.listdir(str(tmp_path))
+    assert len(names) == 1 and names[0].endswith('.gz') and 'secret-key' not in names[0]
+    with gzip.open(str(tmp_path / names[0])) as f:
+        assert f.read() == DATA_VALUE
+
+
+def test_response_cache_today_expires(tmp_path, get_data_http_mock, mocker):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    sndslib.get_data('test', cache=cache)
+    mocker.patch('sndslib.cache.time.time', return_value=time.time() + 120)
+    sndslib.get_data('test', cache=cache)
+    assert get_data_http_mock.call_count == 2
+
+
+def test_response_cache_past_day_is_permanent(tmp_path, get_data_http_mock, mocker):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    sndslib.get_data('test', '092920', cache=cache)
+    mocker.patch('sndslib.cache.time.time', return_value=time.time() + 10 ** 6)
+    sndslib.get_data('test', '092920', cache=cache)
+    assert get_data_http_mock.call_count == 1
+
+
+def test_response_cache_empty_past_day_expires(tmp_path, get_data_http_mock, mocker):
+    get_data_http_mock.side_effect = lambda *args, **kwargs: response_mock(b'')
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    assert sndslib.get_data('test', '092920', cache=cache) == []
+    assert sndslib.get_data('test', '092920', cache=cache) == []
+    assert get_data_http_mock.call_count == 1
+    mocker.patch('sndslib.cache.time.time', return_value=time.time() + 120)
+    sndslib.get_data('test', '092920', cache=cache)
+    assert get_data_http_mock.call_count == 2
+
+
+def test_response_cache_past_day_stored_during_the_day_expires(tmp_path, get_data_http_mock, mocker):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    sndslib.get_data('test', '092920', cache=cache)
+    # Guardado às 12h do próprio dia: pode estar incompleto
+    path = str(tmp_path / os.listdir(str(tmp_path))[0])
+    os.utime(path, (1601380800, 1601380800))
+    sndslib.get_data('test', '092920', cache=cache)
+    assert get_data_http_mock.call_count == 2
+
+
+def test_response_cache_corrupt_header_is_a_miss(tmp_path, get_data_http_mock):
+    cache = ResponseCache(str(tmp_path))
+    sndslib.get_data('test', cache=cache)
+    path = str(tmp_path / os.listdir(str(tmp_path))[0])
+    with open(path, 'r+b') as f:
+        f.truncate(5)
+    assert cache.open('data.aspx', 'test') is None
+    assert not os.path.exists(path)
+    assert len(sndslib.get_data('test', cache=cache)) == 3
+    assert get_data_http_mock.call_count == 2
+    assert cache.stats == {'hits': 0, 'misses': 3}
+
+
+def test_response_cache_corrupt_body_is_removed_while_reading(tmp_path, get_data_http_mock):
+    cache = ResponseCache(str(tmp_path))
+    sndslib.get_data('test', cache=cache)
+    path = str(tmp_path / os.listdir(str(tmp_path))[0])
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) // 2)
+    # O erro aparece no meio da leitura (o corpo é lido em blocos), e a entrada é descartada
+    with pytest.raises(SndsHttpError):
+        sndslib.get_data('test', cache=cache)
+    assert not os.path.exists(path)
+    assert len(sndslib.get_data('test', cache=cache)) == 3
+    assert get_data_http_mock.call_count == 2
+
+
+def test_response_cache_ip_status_expires(tmp_path, get_ip_status_http_mock, mocker):
+    cache = ResponseCache(str(tmp_path), ttl=60)
+    assert len(sndslib.get_ip_status('test', cache=cache)) == 5
+    assert len(sndslib.get_ip_status('test', cache=cache)) == 5
+    assert get_ip_status_http_mock.call_count == 1
+    mocker.patch('sndslib.cache.time.time', return_value=time.time() + 120)
+    sndslib.get_ip_status('test', cache=cache)
+    assert get_ip_status_http_mock.call_count == 2
+
+
+def test_response_cache_discards_partial_reads(tmp_path, get_data_http_mock):
+    cache = ResponseCache(str(tmp_path))
+    stream = sndslib.iter_data('test', cache=cache)
+    next(stream)
+    stream.close()
+    assert os.listdir(str(tmp_path)) == []
+    assert len(sndslib.get_data('test', cache=cache)) == 3
+    assert get_data_http_mock.call_count == 2
+
+
+def test_response_cache_clear(tmp_path, get_data_http_mock):
+    cache = ResponseCache(str(tmp_path))
+    sndslib.get_data('test', cache=cache)
+    cache.clear()
+    sndslib.get_data('test', cache=cache)
+    assert get_data_http_mock.call_count == 2
+
+
+def test_response_cache_clear_removes_leftover_temporaries(tmp_path, get_data_http_mock):
+    cache = ResponseCache(str(tmp_path))
+    sndslib.get_data('test', cache=cache)
+    (tmp_path / 'interrupted.tmp').write_bytes(b'')
+    cache.clear()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_get_data_range_uses_response_cache(tmp_path, snds_standin):
+    cache = ResponseCache(str(tmp_path))
+    sndslib.get_data_range('test', '092820', '093020', cache=cache)
+    results, errors = sndslib.get_data_range('test', '092820', '093020', cache=cache)
+    assert len(snds_standin.requests) == 3
+    assert sorted(results) == ['092820', '092920', '093020'] and errors == {}
@@ -1,5 +1,11 @@
 from sndslib import cli, sndslib, __version__
+from tests.conftest import DATA_VALUE
 from argparse import ArgumentParser
+import json
+import csv
+import subprocess
+import pytest
+import io
 import sys
 
 
@@ -15,6 +21,29 @@ def test_cli_description():
     assert cli.parser.description == 'Searches and formats the SNDS dashboard data'
 
 
+def test_cli_import_is_lazy():
+    heavy = ['http.client', 'ssl', 'sqlite3', 'concurrent.futures', 'json', 'csv', 'ipaddress', 'argparse',
+             'tempfile']
+    code = f'import sys, sndslib.cli; print([m for m in {heavy!r} if m in sys.modules])'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_cli_parser_is_lazy():
+    # Montar o parser não importa o cache nem o watch (gzip, hashlib, datetime...)
+    heavy = ['sndslib.cache', 'sndslib.watch', 'gzip', 'hashlib', 'datetime', 'sqlite3', 'json']
+    code = f'import sys, sndslib.cli; sndslib.cli.get_parser(); print([m for m in {heavy!r} if m in sys.modules])'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def test_cli_version_skips_parser():
+    code = ('import sys, sndslib.cli; sys.argv = ["snds", "--version"]; sndslib.cli.main(); '
+            'print("argparse" in sys.modules)')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['sndslib', __version__, 'False']
+
+
 def test_print_list_blocked_ips(capsys, blocked_ips_mock):
     command = cli.Cli('test')
     command._print_list_blocked_ips(blocked_ips_mock)
@@ -57,7 +86,7 @@ def test_print_list_blocked_ips_rdns(capsys, blocked_ips_rdns_mock):
         assert s in captured.out
 
 
-def test_print_summary_data_mock(capsys, get_data_urlopen_mock):
+def test_print_summary_data_mock(capsys, get_data_http_mock):
     command = cli.Cli('test')
     resp = sndslib.get_data('test')
     summary = sndslib.summarize(resp)
@@ -98,7 +127,7 @@ def test_format_ip_status_blocked_ips_mock(capsys, blocked_ips_mock):
         assert s in captured.out
 
 
-def test_format_ip_data(capsys, get_data_urlopen_mock):
+def test_format_ip_data(capsys, get_data_http_mock):
     command = cli.Cli('test')
     ipdata = sndslib.search_ip_status('1.1.1.2', command.usage_data)
     command._print_ip_data(ipdata)
@@ -132,6 +161,12 @@ def test_main_summarize(capsys, get_data_function_mock, get_ip_status_function_m
         assert s in captured.out
 
 
+def test_main_summarize_blocked_messages(capsys, get_data_function_mock, get_ip_status_function_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-s']
+    cli.main()
+    assert capsys.readouterr().out.splitlines()[-1] == 'Blocked Msgs: 60409'
+
+
 def test_main_summarize_with_date(capsys, get_data_function_mock, get_ip_status_function_mock):
     sys.argv = ['cli.py', '-k', 'test', '-s', '-d', '092920']
     cli.main()
@@ -252,7 +287,7 @@ def test_cli_class_instance():
     assert test_cli.key == key
 
 
-def test_cli_ip_status_exit_on_bad_request(capsys, urlopen_raises_httperror_mock):
+def test_cli_ip_status_exit_on_bad_request(capsys, http_raises_httperror_mock):
     sys.argv = ['cli.py', '-k', 'test', '-l']
     try:
         cli.main()
@@ -260,3 +295,441 @@ def test_cli_ip_status_exit_on_bad_request(capsys, urlopen_raises_httperror_mock
         pass
     else:
         raise AssertionError
+
+
+def test_main_list_blocked_rdns_options(capsys, get_data_function_mock, get_ip_status_function_mock, mocker):
+    rdns_mock = mocker.patch('sndslib.sndslib.iter_blocked_ips_rdns', return_value=iter([]))
+    sys.argv = ['cli.py', '-k', 'test', '-r', '--rdns-workers', '4', '--rdns-timeout', '2', '--rdns-deadline', '30']
+    cli.main()
+    _, kwargs = rdns_mock.call_args
+    assert (kwargs['workers'], kwargs['timeout'], kwargs['deadline']) == (4, 2.0, 30.0)
+
+
+def test_main_list_blocked_rdns_uses_cache(capsys, get_data_function_mock, get_ip_status_function_mock, socket_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-r']
+    cli.main()
+    calls = socket_mock.call_count
+    cli.main()
+    assert socket_mock.call_count == calls
+    assert '2.0.0.0;rdns.mock.com' in capsys.readouterr().out
+
+
+def test_main_list_blocked_rdns_no_cache(capsys, get_data_function_mock, get_ip_status_function_mock, socket_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-r', '--no-rdns-cache']
+    cli.main()
+    calls = socket_mock.call_count
+    cli.main()
+    assert socket_mock.call_count == 2 * calls
+
+
+def test_main_clear_rdns_cache(capsys, tmp_path, get_data_function_mock, get_ip_status_function_mock, socket_mock):
+    path = str(tmp_path / 'rdns.sqlite3')
+    sys.argv = ['cli.py', '-k', 'test', '-r', '--rdns-cache', path]
+    cli.main()
+    calls = socket_mock.call_count
+    sys.argv = ['cli.py', '-k', 'test', '-r', '--rdns-cache', path, '--clear-rdns-cache']
+    cli.main()
+    assert socket_mock.call_count == 2 * calls
+
+
+def test_main_summarize_range(capsys, snds_standin):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '-d', '092820', '--until', '092920']
+    cli.main()
+    captured = capsys.readouterr()
+    assert 'Date          IPs  Green Yellow    Red  Traps' in captured.out
+    assert captured.out.count('09/29/2020      3      1      1      1    107') == 2
+
+
+def test_main_summarize_range_errors(capsys, snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = 404
+    sys.argv = ['cli.py', '-k', 'test', '-s', '-d', '092820', '--until', '092820']
+    cli.main()
+    assert '092820     error: HTTP Error 404' in capsys.readouterr().out
+
+
+def test_main_until_requires_date(capsys):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '--until', '092920']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+    assert '--until requires -d' in capsys.readouterr().err
+
+
+def test_main_until_before_date(capsys, snds_standin):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '-d', '093020', '--until', '092920']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+    assert '--until: 092920 is before -d 093020' in capsys.readouterr().err
+    assert snds_standin.requests == []
+
+
+def test_main_invalid_date(capsys, snds_standin):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '-d', '2020-09-29']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+    assert '-d: dates must be MMDDYY' in capsys.readouterr().err
+    assert snds_standin.requests == []
+
+
+def test_main_cache_stats(capsys, get_data_http_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '1.1.1.2', '--cache-stats']
+    cli.main()
+    cli.main()
+    captured = capsys.readouterr()
+    assert get_data_http_mock.call_count == 1
+    assert 'Cache: 0 hits, 1 misses' in captured.err
+    assert 'Cache: 1 hits, 0 misses' in captured.err
+
+
+def test_main_no_cache(capsys, get_data_http_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '1.1.1.2', '--no-cache']
+    cli.main()
+    cli.main()
+    assert get_data_http_mock.call_count == 2
+
+
+def test_main_clear_cache(capsys, get_data_http_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '1.1.1.2']
+    cli.main()
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '1.1.1.2', '--clear-cache']
+    cli.main()
+    assert get_data_http_mock.call_count == 2
+
+
+def test_main_keys_file_summary(capsys, tmp_path, snds_standin):
+    keys_file = tmp_path / 'keys.txt'
+    keys_file.write_text('# production\nkey-number-one\n\nkey2\n')
+    sys.argv = ['cli.py', '-K', str(keys_file), '-s']
+    cli.main()
+    captured = capsys.readouterr()
+    assert 'Key: key-numb...' in captured.out
+    assert 'Key: key2' in captured.out
+    assert 'All keys' in captured.out
+    assert 'IPs:          6 ' in captured.out
+    assert 'Blocked:     11' in captured.out
+
+
+def test_main_keys_file_errors_exit(capsys, tmp_path, snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = lambda params: 403 if params['key'] == 'bad' else b''
+    keys_file = tmp_path / 'keys.txt'
+    keys_file.write_text('good\nbad\n')
+    sys.argv = ['cli.py', '-K', str(keys_file), '-l']
+    try:
+        cli.main()
+    except SystemExit as e:
+        assert e.code == 1
+    else:
+        raise AssertionError
+    captured = capsys.readouterr()
+    assert 'bad: Could not connect to SNDS API' in captured.err
+    assert '2.0.0.0' in captured.out
+
+
+def test_main_requires_key_or_keys_file(capsys):
+    sys.argv = ['cli.py', '-s']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+
+
+def test_main_stats(capsys, snds_standin):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '--stats', '--no-cache']
+    cli.main()
+    err = capsys.readouterr().err
+    for stage in ('fetch', 'read', 'decode', 'summarize', 'ranges'):
+        assert f'\n{stage} ' in err
+
+
+def test_main_profile(capsys, snds_standin):
+    sys.argv = ['cli.py', '-k', 'test', '-l', '--profile', '--no-cache']
+    cli.main()
+    err = capsys.readouterr().err
+    assert 'Ordered by: cumulative time' in err
+    assert 'Top 10 allocations' in err
+
+
+def test_main_ip_data_many_flags(capsys, get_data_http_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '1.1.1.2', '-ip', '1.1.1.0', '-ip', '9.9.9.9']
+    cli.main()
+    out = capsys.readouterr().out
+    assert out.index('IP:         1.1.1.2') < out.index('IP:         1.1.1.0')
+    assert 'No data found for 1 of 3 IPs: 9.9.9.9' in out
+    assert get_data_http_mock.call_count == 1
+
+
+def test_main_ip_data_from_file(capsys, tmp_path, get_data_http_mock):
+    ips_file = tmp_path / 'ips.txt'
+    ips_file.write_text('# sending IPs\n1.1.1.0\n1.1.1.1, 1.1.1.2\n\n1.1.1.1\n')
+    sys.argv = ['cli.py', '-k', 'test', '-ip', f'@{ips_file}']
+    cli.main()
+    out = capsys.readouterr().out
+    assert out.count('Activity:') == 3
+    assert 'No data found' not in out
+
+
+def test_main_ip_data_from_stdin(capsys, monkeypatch, get_data_http_mock):
+    monkeypatch.setattr(sys, 'stdin', io.StringIO('1.1.1.1\n10.0.0.1\nnot-an-ip\n'))
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '-']
+    cli.main()
+    out = capsys.readouterr().out
+    assert 'IP:         1.1.1.1' in out
+    assert 'No data found for 2 of 3 IPs: 10.0.0.1, not-an-ip' in out
+
+
+def test_main_ip_data_empty_file(capsys, tmp_path):
+    ips_file = tmp_path / 'ips.txt'
+    ips_file.write_text('# nothing here\n')
+    sys.argv = ['cli.py', '-k', 'test', '-ip', f'@{ips_file}']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+    assert 'no IPs given' in capsys.readouterr().err
+
+
+def test_main_ip_data_missing_file(capsys, tmp_path):
+    sys.argv = ['cli.py', '-k', 'test', '-ip', f'@{tmp_path / "missing.txt"}']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+    err = capsys.readouterr().err
+    assert '-ip: [Errno 2] No such file or directory' in err and 'Traceback' not in err
+
+
+def test_ips_data_builds_index_once(get_data_http_mock, mocker):
+    command = cli.Cli('test')
+    index = mocker.spy(sndslib, 'UsageIndex')
+    command.ips_data(['1.1.1.0', '1.1.1.1'])
+    command.ips_data(['1.1.1.2', '1.1.1.3'])
+    assert index.call_count == 1
+
+
+def test_main_summary_json(capsys, get_data_function_mock, get_ip_status_function_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '--format', 'json']
+    cli.main()
+    summary = json.loads(capsys.readouterr().out)
+    assert summary == [{'date': '09/29/2020', 'ips': 3, 'green': 1, 'yellow': 1, 'red': 1, 'traps': 107,
+                        'blocked': 11, 'blocked_messages': 60409}]
+
+
+def test_main_ip_data_csv(capsys, get_data_http_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '1.1.1.2', '-ip', '9.9.9.9', '--format', 'csv']
+    cli.main()
+    captured = capsys.readouterr()
+    rows = list(csv.DictReader(io.StringIO(captured.out)))
+    assert [row['ip_address'] for row in rows] == ['1.1.1.2']
+    assert rows[0]['filter_result'] == 'RED'
+    assert 'No data found for 1 of 2 IPs: 9.9.9.9' in captured.err
+
+
+def test_main_list_blocked_ndjson(capsys, get_data_function_mock, get_ip_status_function_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-l', '--format', 'ndjson']
+    cli.main()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 11
+    assert json.loads(lines[0]) == {'ip': '1.1.1.0'}
+
+
+def test_main_list_blocked_rdns_csv(capsys, get_data_function_mock, get_ip_status_function_mock, socket_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-r', '--format', 'csv', '--no-rdns-cache']
+    cli.main()
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == 'ip,rdns'
+    assert lines[1] == '1.1.1.0,rdns.mock.com'
+    assert len(lines) == 12
+
+
+def test_main_summarize_range_ndjson(capsys, snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = lambda params: 404 if params['date'] == '092920' else DATA_VALUE
+    sys.argv = ['cli.py', '-k', 'test', '-s', '-d', '092820', '--until', '092920', '--format', 'ndjson']
+    cli.main()
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert records[0]['ips'] == 3 and records[0]['error'] is None
+    assert records[1]['date'] == '092920' and 'HTTP Error 404' in records[1]['error']
+
+
+def test_main_keys_file_summary_json(capsys, tmp_path, snds_standin):
+    keys_file = tmp_path / 'keys.txt'
+    keys_file.write_text('key-number-one\nkey-number-two\n')
+    sys.argv = ['cli.py', '-K', str(keys_file), '-s', '--format', 'json']
+    cli.main()
+    records = json.loads(capsys.readouterr().out)
+    assert [record['key'] for record in records] == ['key-numb...', 'key-numb...', 'all']
+    assert records[-1]['ips'] == 6
+
+
+def test_main_diff_against_snapshot(capsys, tmp_path, get_data_function_mock, get_ip_status_function_mock):
+    from sndslib.diff import save_snapshot
+    ip_status, data = get_ip_status_function_mock.return_value, get_data_function_mock.return_value
+    path = tmp_path / 'snapshot.json'
+    save_snapshot(path, ip_status[1:] + ['9.9.9.0,9.9.9.1,Yes,spam'], [data[0].replace('GREEN', 'YELLOW')])
+
+    sys.argv = ['cli.py', '-k', 'test', '--diff-against', str(path)]
+    cli.main()
+    assert capsys.readouterr().out.splitlines() == [
+        '+ blocked 1.1.1.0-1.1.1.1',
+        '- blocked 9.9.9.0-9.9.9.1',
+        '+ ip 1.1.1.1 YELLOW',
+        '+ ip 1.1.1.2 RED',
+        '~ ip 1.1.1.0 filter_result: YELLOW -> GREEN',
+    ]
+
+
+def test_main_diff_against_saved_snapshot(capsys, tmp_path, get_data_function_mock, get_ip_status_function_mock):
+    path = tmp_path / 'snapshot.json'
+    sys.argv = ['cli.py', '-k', 'test', '--save-snapshot', str(path)]
+    cli.main()
+    sys.argv = ['cli.py', '-k', 'test', '--diff-against', str(path), '--format', 'ndjson']
+    cli.main()
+    assert capsys.readouterr().out == ''
+    sys.argv = ['cli.py', '-k', 'test', '--diff-against', str(path)]
+    cli.main()
+    assert capsys.readouterr().out == 'No changes since the snapshot.\n'
+
+
+def test_main_diff_against_csv(capsys, tmp_path, get_data_function_mock, get_ip_status_function_mock):
+    from sndslib.diff import save_snapshot
+    path = tmp_path / 'snapshot.json'
+    save_snapshot(path, get_ip_status_function_mock.return_value, get_data_function_mock.return_value[:2])
+
+    sys.argv = ['cli.py', '-k', 'test', '--diff-against', str(path), '--format', 'csv']
+    cli.main()
+    rows = list(csv.DictReader(io.StringIO(capsys.readouterr().out)))
+    assert rows == [{'kind': 'ip', 'change': 'added', 'first_ip': '1.1.1.2', 'last_ip': '1.1.1.2',
+                     'field': 'filter_result', 'old': '', 'new': 'RED'}]
+
+
+def test_main_watch(mocker):
+    watcher = mocker.patch('sndslib.watch.Watcher')
+    watcher.return_value.run.side_effect = KeyboardInterrupt
+    sys.argv = ['cli.py', '-k', 'test', '--watch', '60']
+    cli.main()
+    watcher.assert_called_once_with('test', interval=60)
+    watcher.return_value.run.assert_called_once_with()
+
+
+@pytest.mark.parametrize('options, message', [
+    (['-d', '092920'], '--watch does not support -d'),
+    (['-s'], '--watch does not support -s'),
+    (['--format', 'csv'], '--watch does not support --format csv'),
+])
+def test_main_watch_rejects_other_outputs(capsys, mocker, options, message):
+    watcher = mocker.patch('sndslib.watch.Watcher')
+    sys.argv = ['cli.py', '-k', 'test', '--watch', '60'] + options
+    with pytest.raises(SystemExit):
+        cli.main()
+    assert message in capsys.readouterr().err
+    watcher.assert_not_called()
+
+
+def test_main_list_blocked_cidr(capsys, get_data_function_mock, get_ip_status_function_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-l', '--cidr']
+    cli.main()
+    assert capsys.readouterr().out.splitlines()[:3] == ['1.1.1.0/31', '1.1.1.3/32', '1.1.1.254/31']
+
+
+def test_main_list_blocked_cidr_csv(capsys, get_data_function_mock, get_ip_status_function_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-l', '--cidr', '--format', 'csv']
+    cli.main()
+    assert capsys.readouterr().out.splitlines()[:2] == ['cidr', '1.1.1.0/31']
+
+
+def test_main_archive_and_history(capsys, tmp_path, snds_standin):
+    archive_file = str(tmp_path / 'archive.sqlite3')
+    sys.argv = ['cli.py', '-k', 'test', '-d', '092820', '--until', '092920', '--archive',
+                '--archive-file', archive_file]
+    cli.main()
+    assert 'Archived 3 IPs of 092920' in capsys.readouterr().err
+
+    # As consultas ao histórico não precisam da chave
+    sys.argv = ['cli.py', '--history', '1.1.1.1', '--archive-file', archive_file]
+    cli.main()
+    out = capsys.readouterr().out
+    assert 'Date       Filter  Messages Complaint  Traps' in out
+    assert '09/28/2020 YELLOW     47384    < 0.1%     40' in out
+    assert '09/29/2020 YELLOW     47384    < 0.1%     40' in out
+
+
+def test_main_archive_days_and_totals(capsys, tmp_path, get_data_function_mock):
+    archive_file = str(tmp_path / 'archive.sqlite3')
+    sys.argv = ['cli.py', '-k', 'test', '-d', '092920', '--archive', '--archive-file', archive_file]
+    cli.main()
+
+    sys.argv = ['cli.py', '--archive-days', '--archive-file', archive_file, '--format', 'json']
+    cli.main()
+    assert json.loads(capsys.readouterr().out) == [
+        {'date': '09/29/2020', 'ips': 3, 'green': 1, 'yellow': 1, 'red': 1, 'traps': 107}
+    ]
+
+    sys.argv = ['cli.py', '--archive-totals', '1.1.1.2', '-d', '092920', '--archive-file', archive_file]
+    cli.main()
+    out = capsys.readouterr().out
+    assert 'Days:         1' in out
+    assert 'Messages: 12960' in out
+
+
+def test_main_archive_requires_key(capsys):
+    sys.argv = ['cli.py', '--archive', '--archive-days']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+    assert 'one of the arguments -k -K/--keys-file is required' in capsys.readouterr().err
+
+
+def test_main_activity_window(capsys, get_data_function_mock, get_ip_status_function_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '--activity-window', '-', '1231190830', '--format', 'json']
+    cli.main()
+    assert json.loads(capsys.readouterr().out)[0]['ips'] == 1
+
+
+def test_main_trap_window(capsys, get_data_function_mock):
+    sys.argv = ['cli.py', '-k', 'test', '-ip', '1.1.1.0', '-ip', '1.1.1.1', '--trap-window', '0929201300', '-']
+    cli.main()
+    out = capsys.readouterr().out
+    assert 'IP:         1.1.1.1' in out
+    assert 'IP:         1.1.1.0' not in out
+    assert 'No data found for 1 of 2 IPs: 1.1.1.0' in out
+
+
+def test_main_window_invalid_date(capsys):
+    sys.argv = ['cli.py', '-k', 'test', '-s', '--trap-window', '2020-09-29', '-']
+    try:
+        cli.main()
+    except SystemExit:
+        pass
+    else:
+        raise AssertionError
+    assert '--trap-window: dates must be MMDDYY or MMDDYYHHMM, or -' in capsys.readouterr().err
+
+
+def test_main_window_does_not_filter_snapshot(capsys, tmp_path, get_data_function_mock, get_ip_status_function_mock):
+    snapshot = str(tmp_path / 'snapshot.json')
+    sys.argv = ['cli.py', '-k', 'test', '-s', '--activity-window', '-', '1231190830', '--save-snapshot', snapshot]
+    cli.main()
+    capsys.readouterr()
+
+    sys.argv = ['cli.py', '-k', 'test', '--diff-against', snapshot]
+    cli.main()
+    assert capsys.readouterr().out == 'No changes since the snapshot.\n'
@@ -0,0 +1,121 @@
+from sndslib import sndslib
+from sndslib.client import SndsClient
+from sndslib.exceptions import SndsHttpError
+from urllib.error import HTTPError
+from tests.conftest import DATA_VALUE
+import socket
+import pytest
+import time
+
+
+def test_client_open_reads_body(snds_standin):
+    with SndsClient(snds_standin.url) as client:
+        response = client.open('data.aspx', key='test')
+        assert response.read() == DATA_VALUE
+        response.close()
+
+
+def test_client_reuses_connection(snds_standin):
+    client = SndsClient(snds_standin.url)
+    for _ in range(3):
+        assert len(sndslib.get_data('test', client=client)) == 3
+    assert client.connections == 1
+    assert snds_standin.connections == 1
+
+
+def test_default_client_is_shared(snds_standin):
+    sndslib.get_data('test')
+    sndslib.get_ip_status('test')
+    assert sndslib.get_client() is sndslib.get_client()
+    assert snds_standin.connections == 1
+
+
+def test_client_gzip_streaming(snds_standin):
+    snds_standin.compress = True
+    snds_standin.chunked = True
+    snds_standin.chunk_size = 16
+    client = SndsClient(snds_standin.url)
+    assert sndslib.get_data('test', client=client) == sndslib.get_data('test', client=SndsClient(snds_standin.url,
+                                                                                                 compress=False))
+    assert snds_standin.headers[0]['Accept-Encoding'] == 'gzip'
+    assert snds_standin.headers[1]['Accept-Encoding'] == 'identity'
+
+
+def test_client_retries_server_errors(snds_standin):
+    answers = iter([503, 500, DATA_VALUE])
+    snds_standin.routes['/snds/data.aspx'] = lambda params: next(answers)
+    client = SndsClient(snds_standin.url, retries=2, backoff=0)
+    assert len(sndslib.get_data('test', client=client)) == 3
+    assert len(snds_standin.requests) == 3
+
+
+def test_client_gives_up_after_retries(snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = 503
+    client = SndsClient(snds_standin.url, retries=1, backoff=0)
+    with pytest.raises(HTTPError) as error:
+        client.open('data.aspx', key='test')
+    assert error.value.code == 503
+    assert len(snds_standin.requests) == 2
+
+
+def test_client_does_not_retry_client_errors(snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = 404
+    client = SndsClient(snds_standin.url, backoff=0)
+    with pytest.raises(SndsHttpError):
+        sndslib.get_data('test', client=client)
+    assert len(snds_standin.requests) == 1
+
+
+def test_client_backoff_is_jittered(snds_standin, mocker):
+    snds_standin.routes['/snds/data.aspx'] = 503
+    sleep = mocker.patch('sndslib.client.time.sleep')
+    uniform = mocker.patch('sndslib.client.random.uniform', return_value=0)
+    client = SndsClient(snds_standin.url, retries=3, backoff=0.5)
+    with pytest.raises(HTTPError):
+        client.open('data.aspx', key='test')
+    assert [c.args for c in uniform.call_args_list] == [(0, 0.5), (0, 1.0), (0, 2.0)]
+    assert sleep.call_count == 3
+
+
+def test_client_read_timeout(snds_standin):
+    snds_standin.latency = 0.5
+    client = SndsClient(snds_standin.url, timeout=0.1, retries=0)
+    started = time.monotonic()
+    with pytest.raises(SndsHttpError) as error:
+        sndslib.get_data('test', client=client)
+    assert time.monotonic() - started < 0.4
+    assert isinstance(error.value.reason, socket.timeout)
+
+
+def test_client_connection_refused():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    client = SndsClient(f'http://127.0.0.1:{port}/snds', retries=1, backoff=0)
+    with pytest.raises(SndsHttpError):
+        sndslib.get_ip_status('test', client=client)
+
+
+def test_client_recovers_from_closed_idle_connection(snds_standin):
+    client = SndsClient(snds_standin.url, retries=0)
+    sndslib.get_data('test', client=client)
+    # Simula o servidor fechando a conexão ociosa
+    client._idle[0].sock.shutdown(socket.SHUT_RDWR)
+    assert len(sndslib.get_data('test', client=client)) == 3
+
+
+def test_client_timeout_on_reused_connection_is_not_resent(snds_standin):
+    client = SndsClient(snds_standin.url, timeout=0.1, retries=0)
+    sndslib.get_data('test', client=client)
+    snds_standin.latency = 0.3
+    with pytest.raises(SndsHttpError):
+        sndslib.get_data('test', client=client)
+    assert len(snds_standin.requests) == 2
+
+
+def test_client_redirect_is_an_error(snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = 302
+    client = SndsClient(snds_standin.url, backoff=0)
+    with pytest.raises(SndsHttpError):
+        sndslib.get_data('test', client=client)
+    assert len(snds_standin.requests) == 1
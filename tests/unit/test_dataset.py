@@ -0,0 +1,98 @@
+from sndslib import sndslib
+from sndslib.dataset import SndsDataset, FilterResult, complaint_rate_value
+from sndslib.parse import parse_timestamp
+from tests.conftest import DATA_VALUE
+import pytest
+
+
+LINES = DATA_VALUE.decode('utf-8').split('\r\n')
+
+
+@pytest.fixture
+def dataset():
+    return SndsDataset.from_data(LINES)
+
+
+def test_complaint_rate_value():
+    assert complaint_rate_value('< 0.1%') == 0.1
+    assert complaint_rate_value('12.5%') == 12.5
+    assert complaint_rate_value('') == 0.0
+
+
+def test_dataset_len(dataset):
+    assert len(dataset) == 3
+
+
+def test_dataset_typed_columns(dataset):
+    assert dataset.ips.typecode == 'I'
+    assert list(dataset.message_recipients) == [13025, 47384, 12960]
+    assert list(dataset.filter_results) == [FilterResult.GREEN, FilterResult.YELLOW, FilterResult.RED]
+    assert list(dataset.traphits) == [41, 40, 26]
+    assert list(dataset.complaint_rate_values()) == [0.1, 0.1, 0.1]
+
+
+def test_dataset_row_view(dataset):
+    row = dataset[1]
+    assert row.ip_address == '1.1.1.1'
+    assert row.filter_result == 'YELLOW'
+    assert row.rcpt_commands == 47386
+    assert row.activity_end == parse_timestamp('9/29/2020 9:00 PM')
+    assert row.sample_helo == ''
+    assert not hasattr(row, '__dict__')
+
+
+def test_dataset_row_as_dict_matches_search_ip_status(dataset):
+    for line, row in zip(LINES, dataset):
+        ip = line.split(',')[0]
+        assert row.as_dict() == sndslib.search_ip_status(ip, LINES)
+
+
+def test_dataset_index_out_of_range(dataset):
+    assert dataset[-1].ip_address == '1.1.1.2'
+    with pytest.raises(IndexError):
+        dataset[3]
+
+
+def test_dataset_find(dataset):
+    assert dataset.find('1.1.1.2').filter_result == 'RED'
+    assert dataset.find('9.9.9.9') is None
+
+
+def test_dataset_text_columns_are_interned():
+    dataset = SndsDataset.from_data([
+        '1.1.1.1,9/29/2020 9:00 PM,9/29/2020 9:00 PM,1,1,1,GREEN,< 0.1%,,,0,helo.example.com,from@example.com,',
+        '1.1.1.2,9/29/2020 9:00 PM,9/29/2020 9:00 PM,1,1,1,GREEN,< 0.1%,,,0,helo.example.com,,',
+    ])
+    assert dataset[0].sample_helo == dataset[1].sample_helo == 'helo.example.com'
+    assert dataset[0].sample_mailfrom == 'from@example.com'
+    assert dataset.texts.strings == ['', 'helo.example.com', 'from@example.com']
+
+
+def test_summarize_dataset(dataset):
+    assert sndslib.summarize(dataset) == sndslib.summarize(LINES)
+
+
+def test_summarize_empty_dataset():
+    assert sndslib.summarize(SndsDataset()) == sndslib.summarize([])
+
+
+def test_dataset_keeps_unknown_filter_result():
+    lines = LINES + ['1.1.1.3,,9/30/2020 9:00 PM,1,1,1,BLUE,< 0.1%,,,0,,,']
+    dataset = SndsDataset.from_data(lines)
+    assert dataset.filter_results[3] == FilterResult.UNKNOWN
+    assert dataset[3].as_dict() == sndslib.search_ip_status('1.1.1.3', lines)
+    assert sndslib.summarize(dataset) == sndslib.summarize(lines)
+
+    merged = SndsDataset.from_data(LINES)
+    merged.extend(dataset)
+    assert merged[6].filter_result == 'BLUE'
+
+
+def test_summarize_dataset_date_skips_empty_activity_end():
+    lines = ['1.1.1.9,,,1,1,1,GREEN,< 0.1%,,,0,,,'] + LINES
+    assert sndslib.summarize(SndsDataset.from_data(lines)) == sndslib.summarize(lines)
+
+
+def test_search_ip_status_dataset(dataset):
+    assert sndslib.search_ip_status('1.1.1.0', dataset) == sndslib.search_ip_status('1.1.1.0', LINES)
+    assert sndslib.search_ip_status('9.9.9.9', dataset) == {}
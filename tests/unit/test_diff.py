@@ -0,0 +1,73 @@
+from sndslib import diff
+from tests.conftest import DATA_VALUE, IP_STATUS_VALUE
+import pytest
+
+
+IP_STATUS = IP_STATUS_VALUE.decode().split('\r\n')
+DATA = DATA_VALUE.decode().split('\r\n')
+
+
+def test_diff_ip_status_without_changes():
+    changes = diff.diff_ip_status(IP_STATUS, list(reversed(IP_STATUS)))
+    assert not changes
+    assert (changes.added, changes.removed, changes.changed) == ([], [], [])
+
+
+def test_diff_ip_status_splits_partially_overlapping_ranges():
+    old = ['1.1.1.0,1.1.1.7,Yes,spam', '2.0.0.0,2.0.0.255,Yes,spam']
+    new = ['1.1.1.4,1.1.1.9,Yes,spam', '2.0.0.16,2.0.0.31,Yes,spam', '3.0.0.0,3.0.0.0,Yes,spam']
+    changes = diff.diff_ip_status(old, new)
+    assert changes.added == [('1.1.1.8', '1.1.1.9'), ('3.0.0.0', '3.0.0.0')]
+    assert changes.removed == [('1.1.1.0', '1.1.1.3'), ('2.0.0.0', '2.0.0.15'), ('2.0.0.32', '2.0.0.255')]
+
+
+def test_diff_ip_status_does_not_expand_ranges():
+    changes = diff.diff_ip_status(['10.0.0.0,10.255.255.255,Yes,spam'], ['10.0.0.1,10.255.255.254,Yes,spam'])
+    assert changes.removed == [('10.0.0.0', '10.0.0.0'), ('10.255.255.255', '10.255.255.255')]
+    assert changes.added == []
+
+
+def test_diff_ip_status_changed_reason():
+    changes = diff.diff_ip_status(['1.1.1.0,1.1.1.1,Yes,spam'], ['1.1.1.0,1.1.1.1,Yes,trap hits'])
+    assert changes.changed == [{'first_ip': '1.1.1.0', 'last_ip': '1.1.1.1', 'reason': ('Yes,spam', 'Yes,trap hits')}]
+    assert not changes.added and not changes.removed
+
+
+def test_diff_data():
+    new = [DATA[0], DATA[1].replace('YELLOW', 'RED'), '1.1.1.9,,,1,1,1,GREEN,< 0.1%,,,0,,,']
+    changes = diff.diff_data(DATA, new)
+    assert [row['ip_address'] for row in changes.added] == ['1.1.1.9']
+    assert [row['ip_address'] for row in changes.removed] == ['1.1.1.2']
+    assert changes.changed == [{'ip_address': '1.1.1.1', 'filter_result': ('YELLOW', 'RED')}]
+
+
+def test_diff_data_other_fields():
+    new = [DATA[0].replace(',41,', ',50,')]
+    assert diff.diff_data(DATA[:1], new).changed == []
+    assert diff.diff_data(DATA[:1], new, fields=('traphits',)).changed == [
+        {'ip_address': '1.1.1.0', 'traphits': ('41', '50')}
+    ]
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / 'snapshot.json'
+    diff.save_snapshot(path, iter(IP_STATUS), iter(DATA))
+    snapshot = diff.load_snapshot(path)
+    assert snapshot['ip_status'] == IP_STATUS
+    assert snapshot['data'] == DATA
+
+
+def test_failed_save_keeps_previous_snapshot(tmp_path):
+    path = tmp_path / 'snapshot.json'
+    diff.save_snapshot(path, IP_STATUS, DATA)
+    with pytest.raises(TypeError):
+        diff.save_snapshot(path, IP_STATUS, [object()])
+    assert diff.load_snapshot(path)['data'] == DATA
+    assert [p.name for p in tmp_path.iterdir()] == ['snapshot.json']
+
+
+def test_load_snapshot_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.json'
+    path.write_text('[1, 2]')
+    with pytest.raises(ValueError):
+        diff.load_snapshot(path)
@@ -0,0 +1,71 @@
+from sndslib import sndslib
+from sndslib.index import UsageIndex
+import pytest
+
+
+DATA = [
+    '1.1.1.1,12/31/2019 8:00 AM,9/29/2020 9:00 PM,10,10,10,GREEN,< 0.1%,,,0,,,',
+    '1.1.1.10,12/31/2019 8:00 AM,9/29/2020 9:00 PM,20,20,20,RED,< 0.1%,,,3,,,',
+    '1.1.2.5,12/31/2019 8:00 AM,9/29/2020 9:00 PM,30,30,30,YELLOW,< 0.1%,,,1,,,',
+    '2.0.0.1,12/31/2019 8:00 AM,9/29/2020 9:00 PM,40,40,40,GREEN,< 0.1%,,,0,,,',
+]
+
+
+@pytest.fixture
+def index():
+    return UsageIndex(DATA)
+
+
+def test_usage_index_len(index):
+    assert len(index) == 4
+
+
+def test_usage_index_get_exact_match(index):
+    assert index.get('1.1.1.1')['message_recipients'] == '10'
+    assert index.get('1.1.1.10')['message_recipients'] == '20'
+
+
+def test_usage_index_get_missing(index):
+    assert index.get('1.1.1.2') == {}
+    assert index.get('not an ip') == {}
+
+
+def test_usage_index_contains(index):
+    assert '2.0.0.1' in index
+    assert '2.0.0.2' not in index
+    assert '1.1.1.x' not in index
+
+
+def test_usage_index_get_many(index):
+    found = index.get_many(['1.1.1.10', '9.9.9.9', '2.0.0.1'])
+    assert sorted(found) == ['1.1.1.10', '2.0.0.1']
+    assert found['2.0.0.1']['filter_result'] == 'GREEN'
+
+
+def test_usage_index_search_network(index):
+    found = index.search_network('1.1.0.0/16')
+    assert [ip_data['ip_address'] for ip_data in found] == ['1.1.1.1', '1.1.1.10', '1.1.2.5']
+
+
+def test_usage_index_search_network_not_strict(index):
+    found = index.search_network('1.1.2.7/24')
+    assert [ip_data['ip_address'] for ip_data in found] == ['1.1.2.5']
+
+
+def test_usage_index_search_network_empty(index):
+    assert index.search_network('3.0.0.0/8') == []
+
+
+def test_search_ip_status_with_index(index):
+    assert sndslib.search_ip_status('1.1.2.5', index)['filter_result'] == 'YELLOW'
+    assert sndslib.search_ip_status('1.1.2.6', index) == {}
+
+
+def test_search_ip_status_exact_match_without_index():
+    assert sndslib.search_ip_status('1.1.1.10', DATA)['message_recipients'] == '20'
+    assert sndslib.search_ip_status('1.1.1.1', DATA[1:]) == {}
+    assert sndslib.search_ip_status('1.1.1.1', DATA)['message_recipients'] == '10'
+
+
+def test_search_ip_status_dot_is_not_a_wildcard():
+    assert sndslib.search_ip_status('1.1.1.1', ['1x1x1x1,,,,,,,,,,,,,']) == {}
@@ -0,0 +1,82 @@
+from sndslib.ipset import BlockedIpSet, ip_to_int, int_to_ip
+import itertools
+
+
+def test_ip_to_int():
+    assert ip_to_int('1.2.3.4') == 0x01020304
+    assert ip_to_int(16909060) == 16909060
+
+
+def test_int_to_ip():
+    assert int_to_ip(0x01020304) == '1.2.3.4'
+
+
+def test_blocked_ip_set_merges_overlapping_and_adjacent_ranges():
+    ranges = [('1.1.1.5', '1.1.1.9'), ('1.1.1.0', '1.1.1.4'), ('1.1.1.2', '1.1.1.6'), ('2.0.0.0', '2.0.0.0')]
+    blocked = BlockedIpSet(ranges)
+    assert list(blocked.ranges()) == [('1.1.1.0', '1.1.1.9'), ('2.0.0.0', '2.0.0.0')]
+    assert len(blocked) == 11
+
+
+def test_blocked_ip_set_len_does_not_expand():
+    blocked = BlockedIpSet([('10.0.0.0', '10.255.255.255')])
+    assert len(blocked) == 2 ** 24
+
+
+def test_blocked_ip_set_contains():
+    blocked = BlockedIpSet([('1.1.1.0', '1.1.1.3'), ('1.1.2.0', '1.1.2.0')])
+    assert '1.1.1.0' in blocked
+    assert '1.1.1.3' in blocked
+    assert ip_to_int('1.1.2.0') in blocked
+    assert '1.1.1.4' not in blocked
+    assert '1.1.0.255' not in blocked
+    assert 'not an ip' not in blocked
+
+
+def test_blocked_ip_set_iterates_lazily():
+    blocked = BlockedIpSet([('0.0.0.0', '255.255.255.255')])
+    assert list(itertools.islice(blocked, 3)) == ['0.0.0.0', '0.0.0.1', '0.0.0.2']
+    assert len(blocked) == 2 ** 32
+
+
+def test_blocked_ip_set_empty():
+    blocked = BlockedIpSet()
+    assert len(blocked) == 0
+    assert not blocked
+    assert list(blocked) == []
+
+
+def test_blocked_ip_set_from_ip_status():
+    blocked = BlockedIpSet.from_ip_status(['1.1.1.0,1.1.1.1,Yes,Blocked', '1.1.1.3,1.1.1.3,Yes,Blocked'])
+    assert blocked == BlockedIpSet([('1.1.1.0', '1.1.1.1'), ('1.1.1.3', '1.1.1.3')])
+
+
+def test_blocked_ip_set_cidrs():
+    blocked = BlockedIpSet([('1.1.1.0', '1.1.1.4'), ('1.1.1.5', '1.1.1.7'), ('1.1.1.254', '1.1.2.1'),
+                            ('10.0.0.0', '10.0.0.0')])
+    assert list(blocked.cidrs()) == ['1.1.1.0/29', '1.1.1.254/31', '1.1.2.0/31', '10.0.0.0/32']
+
+
+def test_blocked_ip_set_cidrs_do_not_expand():
+    assert list(BlockedIpSet([('0.0.0.0', '255.255.255.255')]).cidrs()) == ['0.0.0.0/0']
+    cidrs = list(BlockedIpSet([('0.0.0.1', '255.255.255.254')]).cidrs())
+    assert len(cidrs) == 62
+    assert cidrs[0] == '0.0.0.1/32' and cidrs[-1] == '255.255.255.254/32'
+
+
+def test_blocked_ip_set_cidrs_match_ipaddress():
+    import ipaddress
+    import random
+    rng = random.Random(20)
+    for _ in range(200):
+        start = rng.randrange(2 ** 32)
+        end = min(2 ** 32 - 1, start + rng.randrange(2 ** rng.randrange(1, 24)))
+        expected = ipaddress.summarize_address_range(ipaddress.IPv4Address(start), ipaddress.IPv4Address(end))
+        assert list(BlockedIpSet([(start, end)]).cidrs()) == [str(network) for network in expected]
+
+
+def test_reversed_range_is_merged_in_order():
+    ipset = BlockedIpSet([('1.1.1.5', '1.1.1.9'), ('1.1.1.8', '1.1.1.0')])
+    assert len(ipset) == 10
+    assert '1.1.1.2' in ipset
+    assert list(ipset.ranges()) == [('1.1.1.0', '1.1.1.9')]
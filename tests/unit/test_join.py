@@ -0,0 +1,50 @@
+from sndslib import sndslib
+from sndslib.ipset import BlockedIpSet
+from sndslib.join import join_blocked
+from tests.conftest import DATA_VALUE, IP_STATUS_VALUE
+import random
+
+
+DATA = DATA_VALUE.decode().split('\r\n')
+IP_STATUS = IP_STATUS_VALUE.decode().split('\r\n')
+
+
+def test_join_blocked_rows_and_totals():
+    joined = join_blocked(list(reversed(DATA)), IP_STATUS)
+    assert [(row['ip_address'], row['blocked']) for row in joined.rows] == [
+        ('1.1.1.0', True), ('1.1.1.1', True), ('1.1.1.2', False)
+    ]
+    assert joined.rows[0]['message_recipients'] == '13025'
+    assert joined.blocked == {'ips': 2, 'messages': 60409, 'traps': 81}
+    assert joined.unblocked == {'ips': 1, 'messages': 12960, 'traps': 26}
+
+
+def test_join_blocked_totals_only():
+    joined = join_blocked(DATA, sndslib.list_blocked_ips(IP_STATUS), rows=False)
+    assert joined.rows == []
+    assert joined.blocked['messages'] == 60409
+
+
+def test_join_blocked_without_ranges():
+    joined = join_blocked(DATA + ['not an ip,,,'], [])
+    assert joined.blocked == {'ips': 0, 'messages': 0, 'traps': 0}
+    assert joined.unblocked['ips'] == 3
+
+
+def test_join_blocked_matches_membership():
+    rng = random.Random(21)
+    ranges = []
+    for _ in range(50):
+        start = rng.randrange(2 ** 32 - 4096)
+        ranges.append((start, start + rng.randrange(4096)))
+    blocked = BlockedIpSet(ranges)
+    ips = [rng.choice(ranges)[0] + rng.randrange(-8, 8) for _ in range(500)]
+    data = [f'{".".join(str(ip >> shift & 255) for shift in (24, 16, 8, 0))},,,1,1,1,GREEN,,,,0,,,' for ip in ips]
+
+    joined = join_blocked(data, blocked)
+    assert [row['blocked'] for row in joined.rows] == [row['ip_address'] in blocked for row in joined.rows]
+    assert joined.blocked['ips'] == sum(ip in blocked for ip in ips)
+
+
+def test_join_blocked_lazy_export():
+    assert sndslib.join_blocked is join_blocked
@@ -0,0 +1,113 @@
+from sndslib import mapped, sndslib
+from sndslib.dataset import SndsDataset
+from tests.conftest import DATA_VALUE, IP_STATUS_VALUE
+import pytest
+
+
+DATA = DATA_VALUE.decode().split('\r\n')
+IP_STATUS = IP_STATUS_VALUE.decode().split('\r\n')
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / 'data.snds'
+    rows = list(reversed(DATA)) + [DATA[0].replace('1.1.1.0,', '1.1.1.9,').replace(',,,', ',helo.example.com,,é')]
+    assert mapped.write_data(path, rows) == 4
+    return path, rows
+
+
+def test_mapped_data_get(data_file):
+    path, rows = data_file
+    with mapped.open_data(path) as data:
+        assert len(data) == 4
+        for ip in ('1.1.1.0', '1.1.1.1', '1.1.1.2', '1.1.1.9'):
+            assert data.get(ip) == sndslib.search_ip_status(ip, rows)
+        assert data.get('1.1.1.9')['comments'] == 'é'
+        assert data.get('1.1.1.3') == {}
+        assert data.get('0.0.0.0') == {}
+        assert data.get('not an ip') == {}
+        assert '1.1.1.2' in data
+
+
+def test_mapped_data_iterates_in_ip_order(data_file):
+    path, _ = data_file
+    with mapped.open_data(path) as data:
+        assert [row['ip_address'] for row in data] == ['1.1.1.0', '1.1.1.1', '1.1.1.2', '1.1.1.9']
+
+
+def test_mapped_data_summarize(data_file):
+    path, rows = data_file
+    with mapped.open_data(path) as data:
+        assert data.summarize() == sndslib.summarize(rows)
+
+
+def test_mapped_data_from_dataset_keeps_first_duplicate(tmp_path):
+    path = tmp_path / 'data.snds'
+    rows = [DATA[1], DATA[0], DATA[1].replace('YELLOW', 'RED')]
+    mapped.write_data(path, SndsDataset.from_data(rows))
+    with mapped.open_data(path) as data:
+        assert data.get('1.1.1.1')['filter_result'] == 'YELLOW'
+
+
+def test_mapped_data_empty(tmp_path):
+    path = tmp_path / 'data.snds'
+    mapped.write_data(path, [])
+    with mapped.open_data(path) as data:
+        assert len(data) == 0
+        assert data.get('1.1.1.1') == {}
+        assert data.summarize() == sndslib.summarize([])
+
+
+def test_mapped_ip_status(tmp_path):
+    path = tmp_path / 'blocked.snds'
+    lines = IP_STATUS + ['1.1.0.0,1.1.255.255,Yes,Whole /16', '9.9.9.9,9.9.9.9,No,Other']
+    assert mapped.write_ip_status(path, lines) == 7
+    blocked = sndslib.list_blocked_ips(lines)
+    with mapped.open_ip_status(path) as status:
+        assert len(status) == 7
+        assert status.blocked_count() == len(blocked)
+        for ip in ('1.0.255.255', '1.1.0.0', '1.1.1.0', '1.1.1.2', '1.1.200.1', '1.2.0.0', '1.2.0.1', '9.9.9.9'):
+            assert (ip in status) == (ip in blocked), ip
+        assert status.reason('1.1.1.3') == 'Yes,Blocked due to user complaints or other evidence of spamming'
+        assert status.reason('1.1.200.1') == 'Yes,Whole /16'
+        assert status.reason('3.3.3.3') is None
+        assert next(status.ranges()) == ('1.1.0.0', '1.1.255.255', 'Yes,Whole /16')
+
+
+def test_mapped_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.snds'
+    path.write_bytes(b'not a sndslib file at all, just some text')
+    with pytest.raises(ValueError):
+        mapped.open_data(path)
+    path.write_bytes(b'')
+    with pytest.raises(ValueError):
+        mapped.open_data(path)
+
+
+def test_mapped_rejects_wrong_kind_and_corruption(tmp_path, data_file):
+    path, _ = data_file
+    with pytest.raises(ValueError, match='MappedIpStatus'):
+        mapped.open_ip_status(path)
+
+    content = bytearray(path.read_bytes())
+    content[-1] ^= 0xFF
+    path.write_bytes(bytes(content))
+    with pytest.raises(ValueError, match='checksum'):
+        mapped.open_data(path)
+    mapped.open_data(path, verify=False).close()
+
+
+def test_rewrite_keeps_open_mapping_valid(data_file):
+    path, rows = data_file
+    with mapped.open_data(path) as data:
+        mapped.write_data(path, DATA[:1])
+        assert data.summarize() == sndslib.summarize(rows)
+    with mapped.open_data(path) as data:
+        assert len(data) == 1
+    assert [p.name for p in path.parent.iterdir()] == ['data.snds']
+
+
+def test_summary_layout_matches_record():
+    record = mapped._DATA_RECORD.pack(1, 2, 3, *range(len(mapped._VALUE_KEYS)), 0, 0, 0)
+    filter_result, traphits = mapped._DATA_SUMMARY.unpack(record)
+    assert (filter_result, traphits) == (2, mapped._VALUE_KEYS.index('traphits'))
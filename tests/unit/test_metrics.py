@@ -0,0 +1,83 @@
+from sndslib import metrics, sndslib
+from tests.conftest import DATA_VALUE
+import pytest
+import time
+
+
+@pytest.fixture
+def events():
+    received = []
+
+    def listener(stage, values):
+        received.append((stage, values))
+
+    metrics.add_listener(listener)
+    yield received
+    metrics.remove_listener(listener)
+
+
+def test_stage_is_noop_when_disabled():
+    assert not metrics.enabled()
+    with metrics.stage('fetch') as stage:
+        stage.add(bytes=10, rows=1)
+    assert stage is metrics.stage('read')
+
+
+def test_stage_reports_values(events):
+    with metrics.stage('decode') as stage:
+        stage.add(bytes=10, rows=2)
+        stage.add(rows=1)
+    assert events[0][0] == 'decode'
+    assert events[0][1]['bytes'] == 10
+    assert events[0][1]['rows'] == 3
+
+
+def test_stage_self_time_excludes_inner_stages(events):
+    with metrics.stage('outer'):
+        with metrics.stage('inner'):
+            time.sleep(0.05)
+    times = {stage: values['seconds'] for stage, values in events}
+    assert times['inner'] >= 0.05
+    assert times['outer'] < 0.05
+
+
+def test_stats_sums_stages():
+    with metrics.Stats() as stats:
+        for _ in range(3):
+            with metrics.stage('read') as stage:
+                stage.add(bytes=100)
+    assert not metrics.enabled()
+    assert stats.stages['read']['calls'] == 3
+    assert stats.stages['read']['bytes'] == 300
+    assert stats.report().splitlines()[1].split()[:2] == ['read', '3']
+
+
+def test_streaming_stages(snds_standin):
+    with metrics.Stats() as stats:
+        summary = sndslib.summarize(sndslib.iter_data('test'))
+    assert summary['ips'] == 3
+    assert list(stats.stages) == ['fetch', 'read', 'decode', 'summarize']
+    assert stats.stages['fetch']['calls'] == 1
+    assert stats.stages['read']['bytes'] == len(DATA_VALUE)
+    assert stats.stages['decode']['rows'] == 3
+    assert stats.stages['summarize']['rows'] == 3
+
+
+def test_measured_stream_same_lines(snds_standin):
+    with metrics.Stats():
+        measured = sndslib.get_data('test')
+    assert measured == sndslib.get_data('test')
+
+
+def test_rdns_stages(slow_resolver):
+    with metrics.Stats() as stats:
+        sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2', '1.1.1.1'], resolver=slow_resolver())
+    assert stats.stages['expand']['rows'] == 3
+    assert stats.stages['rdns']['rows'] == 2
+
+
+def test_rdns_stage_excludes_consumer_time(slow_resolver):
+    with metrics.Stats() as stats:
+        for _ in sndslib.iter_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'], resolver=slow_resolver(), workers=1):
+            time.sleep(0.1)
+    assert stats.stages['rdns']['seconds'] < 0.1
@@ -0,0 +1,75 @@
+from sndslib import output
+from sndslib.output import CsvWriter, JsonWriter, LineWriter, NdjsonWriter, get_writer
+import pytest
+import json
+import csv
+import io
+
+
+RECORDS = [{'ip': '1.1.1.1', 'rdns': 'a.mock.com'}, {'ip': '1.1.1.2', 'rdns': 'b, "c".mock.com'}]
+
+
+def test_json_writer():
+    stream = io.StringIO()
+    with JsonWriter(stream, ['ip', 'rdns']) as writer:
+        writer.write_many(RECORDS)
+    assert json.loads(stream.getvalue()) == RECORDS
+
+
+def test_json_writer_empty():
+    stream = io.StringIO()
+    JsonWriter(stream).close()
+    assert json.loads(stream.getvalue()) == []
+
+
+def test_json_writer_error_leaves_list_open():
+    stream = io.StringIO()
+    with pytest.raises(RuntimeError):
+        with JsonWriter(stream) as writer:
+            writer.write_many(RECORDS)
+            raise RuntimeError
+    assert stream.getvalue().startswith('[\n')
+    with pytest.raises(ValueError):
+        json.loads(stream.getvalue())
+
+
+def test_ndjson_writer_selects_fields():
+    stream = io.StringIO()
+    with NdjsonWriter(stream, ['ip']) as writer:
+        writer.write_many(RECORDS)
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [{'ip': '1.1.1.1'}, {'ip': '1.1.1.2'}]
+
+
+def test_csv_writer_quotes_values():
+    stream = io.StringIO()
+    with CsvWriter(stream, ['ip', 'rdns', 'missing']) as writer:
+        writer.write_many(RECORDS)
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert rows[1] == {'ip': '1.1.1.2', 'rdns': 'b, "c".mock.com', 'missing': ''}
+
+
+def test_line_writer():
+    stream = io.StringIO()
+    with LineWriter(stream) as writer:
+        writer.write_many(['1.1.1.1', '1.1.1.2'])
+    assert stream.getvalue() == '1.1.1.1\n1.1.1.2\n'
+
+
+def test_writer_is_buffered(monkeypatch):
+    monkeypatch.setattr(output, 'BUFFER_ROWS', 10)
+    stream = io.StringIO()
+    writer = get_writer('ndjson', stream, ['ip'])
+    writer.write_many({'ip': str(n)} for n in range(25))
+    # Apenas os blocos completos foram escritos antes do close
+    assert stream.getvalue().count('\n') == 20
+    writer.close()
+    assert stream.getvalue().count('\n') == 25
+
+
+def test_writer_without_buffer_writes_each_row():
+    stream = io.StringIO()
+    writer = get_writer('csv', stream, ['ip'], buffer_rows=1)
+    writer.write({'ip': '1.1.1.1'})
+    assert stream.getvalue() == 'ip\n1.1.1.1\n'
+    writer.write({'ip': '1.1.1.2'})
+    assert stream.getvalue().count('\n') == 3
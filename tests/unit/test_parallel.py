@@ -0,0 +1,85 @@
+from sndslib import parallel, sndslib
+from sndslib.dataset import SndsDataset
+from sndslib.parse import INT_KEYS, TEXT_KEYS, TIME_KEYS, iter_lines
+from concurrent.futures import ProcessPoolExecutor
+from tests.conftest import DATA_VALUE
+import pytest
+
+
+def make_body(rows):
+    templates = DATA_VALUE.decode().split('\r\n')
+    lines = []
+    for n in range(rows):
+        fields = templates[n % len(templates)].split(',')
+        fields[0] = f'10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}'
+        fields[11] = f'helo{n % 7}.example.com' if n % 3 else ''
+        lines.append(','.join(fields))
+    return '\r\n'.join(lines).encode()
+
+
+def assert_same_dataset(left, right):
+    for column in ('ips', 'filter_results', 'complaint_rate_codes') + INT_KEYS + TIME_KEYS + TEXT_KEYS:
+        assert getattr(left, column) == getattr(right, column), column
+    assert left.complaint_rates.strings == right.complaint_rates.strings
+    assert left.texts.strings == right.texts.strings
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_CHUNK_SIZE', 256)
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+def test_split_body_is_line_aligned():
+    body = make_body(100)
+    chunks = parallel.split_body(body, 7)
+    assert len(chunks) == 7
+    assert b''.join(chunks) == body
+    assert all(chunk.endswith(b'\r\n') for chunk in chunks[:-1])
+    assert [line for chunk in chunks for line in iter_lines([chunk])] == list(iter_lines([body]))
+
+
+def test_split_body_with_more_parts_than_lines():
+    assert parallel.split_body(b'a\r\nb', 10) == [b'a\r\n', b'b']
+    assert parallel.split_body(b'', 4) == []
+
+
+def test_summarize_matches_single_process(small_chunks, executor):
+    body = make_body(1000)
+    expected = sndslib.summarize(iter_lines([body]))
+    assert parallel.summarize(body, workers=1) == expected
+    assert parallel.summarize(body, executor=executor) == expected
+
+
+def test_summarize_in_new_processes(small_chunks):
+    body = make_body(300)
+    assert parallel.summarize(body, workers=2) == sndslib.summarize(iter_lines([body]))
+
+
+def test_summarize_empty_body():
+    assert parallel.summarize(b'', workers=4) == sndslib.summarize([])
+
+
+def test_parse_dataset_matches_single_process(small_chunks, executor):
+    body = make_body(1000)
+    expected = SndsDataset.from_data(iter_lines([body]))
+    assert_same_dataset(parallel.parse_dataset(body, executor=executor), expected)
+    assert_same_dataset(parallel.parse_dataset(body, workers=1), expected)
+
+
+def test_dataset_extend():
+    lines = list(iter_lines([make_body(50)]))
+    dataset = SndsDataset.from_data(lines[:20])
+    dataset.extend(SndsDataset.from_data(lines[20:]))
+    assert_same_dataset(dataset, SndsDataset.from_data(lines))
+    assert dataset[30].as_dict() == SndsDataset.from_data(lines)[30].as_dict()
+
+
+def test_get_data_body(get_data_http_mock):
+    assert sndslib.get_data_body('test', '092920') == DATA_VALUE
+    get_data_http_mock.assert_called_once_with('data.aspx', key='test', date='092920')
@@ -0,0 +1,68 @@
+from sndslib.parse import format_ip_data, format_timestamp, iter_chunks, iter_lines, parse_timestamp, IP_KEYS
+from sndslib.parse import TIMESTAMP_FORMAT
+from datetime import datetime, timezone
+import random
+import pytest
+import io
+
+
+def test_format_ip_data_names_columns():
+    ip_data = format_ip_data('1.1.1.1,a,b,1,2,3,GREEN,< 0.1%,,,0,,,'.split(','))
+    assert tuple(ip_data) == IP_KEYS
+    assert ip_data['filter_result'] == 'GREEN'
+
+
+def test_iter_chunks():
+    assert list(iter_chunks(io.BytesIO(b'abcdefg'), 3)) == [b'abc', b'def', b'g']
+
+
+def test_iter_lines_skips_empty_lines():
+    assert list(iter_lines([b'a,1\r\n\r\nb,2\r\n'])) == ['a,1', 'b,2']
+
+
+def test_iter_lines_joins_lines_split_across_chunks():
+    assert list(iter_lines([b'a,1\r', b'\nb,', b'2'])) == ['a,1', 'b,2']
+
+
+def test_iter_lines_decodes_multibyte_split_across_chunks():
+    body = 'ação,1\r\nb,2'.encode('utf-8')
+    chunks = [body[i:i + 1] for i in range(len(body))]
+    assert list(iter_lines(chunks)) == ['ação,1', 'b,2']
+
+
+def test_iter_lines_is_lazy():
+    def chunks():
+        yield b'a,1\r\n'
+        raise AssertionError('read past the first line')
+
+    assert next(iter_lines(chunks())) == 'a,1'
+
+
+def test_parse_timestamp():
+    assert parse_timestamp('9/29/2020 9:00 PM') == 1601413200
+    assert parse_timestamp('12/31/2019 12:05 AM') == 1577750700
+    assert parse_timestamp('') == -1
+
+
+def test_parse_timestamp_matches_strptime():
+    rng = random.Random(0)
+    for _ in range(2000):
+        value = format_timestamp(rng.randrange(0, 4102444800, 60))
+        expected = datetime.strptime(value, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+        assert parse_timestamp(value) == int(expected)
+    assert parse_timestamp('2/29/2020 12:00 am') == 1582934400
+
+
+@pytest.mark.parametrize('value', [
+    '2/30/2020 1:00 PM', '13/1/2020 1:00 PM', '1/1/2020 0:00 PM', '1/1/2020 1:60 AM', '1/1/2020 1:00',
+    '1/1/20 1:00 AM', '1/1/2020 1:00 XM', 'not a date',
+])
+def test_parse_timestamp_invalid(value):
+    with pytest.raises(ValueError):
+        parse_timestamp(value)
+
+
+def test_format_timestamp_roundtrip():
+    for value in ('9/29/2020 9:00 PM', '12/31/2019 12:05 AM', '1/1/2020 12:30 PM'):
+        assert format_timestamp(parse_timestamp(value)) == value
+    assert format_timestamp(-1) == ''
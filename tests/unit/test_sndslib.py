@@ -1,6 +1,11 @@
 from sndslib import __version__
 from sndslib import sndslib
+from sndslib.parse import parse_timestamp
+import subprocess
+import threading
 import pytest
+import time
+import sys
 
 
 def test_version():
@@ -12,23 +17,23 @@ def test_get_ip_status_fail_without_key():
         sndslib.get_ip_status()
 
 
-def test_get_ip_status_is_list(get_ip_status_urlopen_mock):
+def test_get_ip_status_is_list(get_ip_status_http_mock):
     resp = sndslib.get_ip_status('test')
     assert isinstance(resp, list)
 
 
-def test_get_ip_status_have_ips(get_ip_status_urlopen_mock):
+def test_get_ip_status_have_ips(get_ip_status_http_mock):
     resp = sndslib.get_ip_status('test')
     assert '1.1.1.0' in resp[0]
 
 
-def test_get_ip_status_first_list_value(get_ip_status_urlopen_mock):
+def test_get_ip_status_first_list_value(get_ip_status_http_mock):
     resp = sndslib.get_ip_status('test')
     first_line_resp = '1.1.1.0,1.1.1.1,Yes,Blocked due to user complaints or other evidence of spamming'
     assert first_line_resp == resp[0]
 
 
-def test_get_ip_status_len(get_ip_status_urlopen_mock):
+def test_get_ip_status_len(get_ip_status_http_mock):
     resp = sndslib.get_ip_status('test')
     assert len(resp) == 5
 
@@ -38,73 +43,73 @@ def test_get_data_fail_without_key():
         sndslib.get_data()
 
 
-def test_get_data_is_list(get_data_urlopen_mock):
+def test_get_data_is_list(get_data_http_mock):
     resp = sndslib.get_data('test')
     assert isinstance(resp, list)
 
 
-def test_get_data_with_date_is_list(get_data_urlopen_mock):
+def test_get_data_with_date_is_list(get_data_http_mock):
     resp = sndslib.get_data('test', '290920')
     assert isinstance(resp, list)
 
 
-def test_get_data_have_ips(get_data_urlopen_mock):
+def test_get_data_have_ips(get_data_http_mock):
     resp = sndslib.get_data('test')
     assert '1.1.1.0' in resp[0]
 
 
-def test_get_data__with_date_have_ips(get_data_urlopen_mock):
+def test_get_data__with_date_have_ips(get_data_http_mock):
     resp = sndslib.get_data('test', '290920')
     assert '1.1.1.0' in resp[0]
 
 
-def test_get_data_first_value(get_data_urlopen_mock):
+def test_get_data_first_value(get_data_http_mock):
     resp = sndslib.get_data('test')
     first_line_value = '1.1.1.0,12/31/2019 8:00 AM,9/29/2020 9:00 PM,14129,14129,13025,GREEN,< 0.1%,9/29/2020 8:07 AM,9/29/2020 12:03 PM,41,,,'  # noqa
     assert first_line_value == resp[0]
 
 
-def test_get_data__with_date_first_value(get_data_urlopen_mock):
+def test_get_data__with_date_first_value(get_data_http_mock):
     resp = sndslib.get_data('test', '290920')
     first_line_value = '1.1.1.0,12/31/2019 8:00 AM,9/29/2020 9:00 PM,14129,14129,13025,GREEN,< 0.1%,9/29/2020 8:07 AM,9/29/2020 12:03 PM,41,,,'  # noqa
     assert first_line_value == resp[0]
 
 
-def test_get_data_len(get_data_urlopen_mock):
+def test_get_data_len(get_data_http_mock):
     resp = sndslib.get_data('test')
     assert len(resp) == 3
 
 
-def test_get_data_with_date_len(get_data_urlopen_mock):
+def test_get_data_with_date_len(get_data_http_mock):
     resp = sndslib.get_data('test', '290920')
     assert len(resp) == 3
 
 
-def test_summarize_return_dict(get_data_urlopen_mock):
+def test_summarize_return_dict(get_data_http_mock):
     resp = sndslib.get_data('test')
     summary = sndslib.summarize(resp)
     assert isinstance(summary, dict)
 
 
-def test_summarize_green_count(get_data_urlopen_mock):
+def test_summarize_green_count(get_data_http_mock):
     resp = sndslib.get_data('test')
     summary = sndslib.summarize(resp)
     assert summary['green'] == 1
 
 
-def test_summarize_yellow_count(get_data_urlopen_mock):
+def test_summarize_yellow_count(get_data_http_mock):
     resp = sndslib.get_data('test')
     summary = sndslib.summarize(resp)
     assert summary['yellow'] == 1
 
 
-def test_summarize_red_count(get_data_urlopen_mock):
+def test_summarize_red_count(get_data_http_mock):
     resp = sndslib.get_data('test')
     summary = sndslib.summarize(resp)
     assert summary['red'] == 1
 
 
-def test_search_ip_status_return_success(get_data_urlopen_mock):
+def test_search_ip_status_return_success(get_data_http_mock):
     resp = sndslib.get_data('test')
     resp_dict = sndslib.search_ip_status('1.1.1.0', resp)
     expected_return = {
@@ -126,25 +131,25 @@ def test_search_ip_status_return_success(get_data_urlopen_mock):
     assert resp_dict == expected_return
 
 
-def test_search_ip_status_return_failure(get_data_urlopen_mock):
+def test_search_ip_status_return_failure(get_data_http_mock):
     resp = sndslib.get_data('test')
     resp_dict = sndslib.search_ip_status('0.0.0.0', resp)
     assert bool(resp_dict) is False
 
 
-def test_search_ip_status_return_failure_type(get_data_urlopen_mock):
+def test_search_ip_status_return_failure_type(get_data_http_mock):
     resp = sndslib.get_data('test')
     resp_dict = sndslib.search_ip_status('0.0.0.0', resp)
     assert isinstance(resp_dict, dict)
 
 
-def test_list_blocked_ips_success_type(get_ip_status_urlopen_mock):
+def test_list_blocked_ips_success_type(get_ip_status_http_mock):
     resp = sndslib.get_ip_status('test')
     resp_list = sndslib.list_blocked_ips(resp)
-    assert isinstance(resp_list, list)
+    assert isinstance(resp_list, sndslib.BlockedIpSet)
 
 
-def test_list_blocked_ips_success_value(get_ip_status_urlopen_mock):
+def test_list_blocked_ips_success_value(get_ip_status_http_mock):
     resp = sndslib.get_ip_status('test')
     blocked_ips = sndslib.list_blocked_ips(resp)
     expected_return = [
@@ -160,10 +165,22 @@ def test_list_blocked_ips_success_value(get_ip_status_urlopen_mock):
         '1.255.255.255',
         '2.0.0.0',
         ]
-    assert blocked_ips == expected_return
+    assert list(blocked_ips) == expected_return
 
 
-def test_list_blocked_ips_rdns_success(get_ip_status_urlopen_mock, socket_mock):
+def test_list_blocked_ips_len(get_ip_status_http_mock):
+    resp = sndslib.get_ip_status('test')
+    assert len(sndslib.list_blocked_ips(resp)) == 11
+
+
+def test_list_blocked_ips_contains(get_ip_status_http_mock):
+    resp = sndslib.get_ip_status('test')
+    blocked_ips = sndslib.list_blocked_ips(resp)
+    assert '1.1.2.0' in blocked_ips
+    assert '1.1.1.2' not in blocked_ips
+
+
+def test_list_blocked_ips_rdns_success(get_ip_status_http_mock, socket_mock):
     resp = sndslib.get_ip_status('test')
     blocked_ips = sndslib.list_blocked_ips(resp)
     rdns_return = sndslib.list_blocked_ips_rdns(blocked_ips)
@@ -183,7 +200,7 @@ def test_list_blocked_ips_rdns_success(get_ip_status_urlopen_mock, socket_mock):
     assert rdns_return == expected_return
 
 
-def test_list_blocked_ips_rdns_failure(get_ip_status_urlopen_mock, socket_error_mock):
+def test_list_blocked_ips_rdns_failure(get_ip_status_http_mock, socket_error_mock):
     rdns_return = sndslib.list_blocked_ips_rdns(['0.0.0.1', '0.0.0.1'])
     expected_return = [
         {'ip': '0.0.0.1', 'rdns': 'NXDOMAIN'},
@@ -192,17 +209,241 @@ def test_list_blocked_ips_rdns_failure(get_ip_status_urlopen_mock, socket_error_
     assert rdns_return == expected_return
 
 
-def test_list_blocked_ips_rdns_success_single_ip(get_ip_status_urlopen_mock, socket_mock):
+def test_list_blocked_ips_rdns_success_single_ip(get_ip_status_http_mock, socket_mock):
     rdns_return = sndslib.list_blocked_ips_rdns('1.1.1.0')
     expected_return = [{'ip': '1.1.1.0', 'rdns': 'rdns.mock.com'}]
     assert rdns_return == expected_return
 
 
-def test_list_blocked_ips_rdns_failure_single_ip(get_ip_status_urlopen_mock, socket_error_mock):
+def test_list_blocked_ips_rdns_failure_single_ip(get_ip_status_http_mock, socket_error_mock):
     rdns_return = sndslib.list_blocked_ips_rdns('0.0.0.1')
     assert rdns_return == [{'ip': '0.0.0.1', 'rdns': 'NXDOMAIN'}]
 
 
-def test_list_blocked_ips_rdns_empty_list(get_ip_status_urlopen_mock):
+def test_list_blocked_ips_rdns_accepts_blocked_ip_set(socket_mock):
+    rdns_return = sndslib.list_blocked_ips_rdns(sndslib.BlockedIpSet([('1.1.1.0', '1.1.1.1')]))
+    assert rdns_return == [
+        {'ip': '1.1.1.0', 'rdns': 'rdns.mock.com'},
+        {'ip': '1.1.1.1', 'rdns': 'rdns.mock.com'},
+        ]
+
+
+def test_list_blocked_ips_rdns_empty_list(get_ip_status_http_mock):
     rdns_return = sndslib.list_blocked_ips_rdns([])
     assert rdns_return == []
+
+
+def test_list_blocked_ips_rdns_custom_resolver_keeps_order(slow_resolver):
+    resolver = slow_resolver({'1.1.1.1': 0.05, '1.1.1.2': 0.01})
+    rdns_return = sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2', '1.1.1.3'], resolver=resolver)
+    assert [r['rdns'] for r in rdns_return] == [
+        '1.1.1.1.rdns.mock.com',
+        '1.1.1.2.rdns.mock.com',
+        '1.1.1.3.rdns.mock.com',
+        ]
+
+
+def test_list_blocked_ips_rdns_custom_resolver_failure(slow_resolver):
+    resolver = slow_resolver(failures=('1.1.1.2',))
+    rdns_return = sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'], resolver=resolver)
+    assert rdns_return == [
+        {'ip': '1.1.1.1', 'rdns': '1.1.1.1.rdns.mock.com'},
+        {'ip': '1.1.1.2', 'rdns': 'NXDOMAIN'},
+        ]
+
+
+def test_list_blocked_ips_rdns_runs_concurrently(slow_resolver):
+    ips = [f'1.1.1.{i}' for i in range(20)]
+    started = time.monotonic()
+    rdns_return = sndslib.list_blocked_ips_rdns(ips, resolver=slow_resolver(default=0.1), workers=20)
+    assert time.monotonic() - started < 1
+    assert all(r['rdns'] != 'NXDOMAIN' for r in rdns_return)
+
+
+def test_list_blocked_ips_rdns_bounded_workers():
+    lock = threading.Lock()
+    active = {'now': 0, 'max': 0}
+
+    def resolver(ip):
+        with lock:
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+        time.sleep(0.01)
+        with lock:
+            active['now'] -= 1
+        return 'rdns.mock.com'
+
+    sndslib.list_blocked_ips_rdns([f'1.1.1.{i}' for i in range(30)], resolver=resolver, workers=3)
+    assert active['max'] <= 3
+
+
+def test_list_blocked_ips_rdns_lookup_timeout(slow_resolver):
+    resolver = slow_resolver({'1.1.1.1': 1})
+    started = time.monotonic()
+    rdns_return = sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2'], resolver=resolver, timeout=0.1)
+    assert time.monotonic() - started < 0.5
+    assert rdns_return == [
+        {'ip': '1.1.1.1', 'rdns': 'NXDOMAIN'},
+        {'ip': '1.1.1.2', 'rdns': '1.1.1.2.rdns.mock.com'},
+        ]
+
+
+def test_list_blocked_ips_rdns_timeout_frees_worker(slow_resolver):
+    resolver = slow_resolver({'1.1.1.1': 2}, default=0.01)
+    started, cpu = time.monotonic(), time.process_time()
+    rdns_return = sndslib.list_blocked_ips_rdns(['1.1.1.1', '1.1.1.2', '1.1.1.3'], resolver=resolver, workers=1,
+                                                timeout=0.1)
+    assert time.monotonic() - started < 0.5
+    assert time.process_time() - cpu < 0.3
+    assert [r['rdns'] for r in rdns_return] == ['NXDOMAIN', '1.1.1.2.rdns.mock.com', '1.1.1.3.rdns.mock.com']
+
+
+def test_list_blocked_ips_rdns_deadline_does_not_hold_exit():
+    code = ('import time; from sndslib import sndslib; '
+            'sndslib.list_blocked_ips_rdns(["1.1.1.1"], resolver=lambda ip: time.sleep(3), deadline=0.2)')
+    started = time.monotonic()
+    subprocess.run([sys.executable, '-c', code], check=True)
+    assert time.monotonic() - started < 2
+
+
+def test_list_blocked_ips_rdns_deadline(slow_resolver):
+    ips = [f'1.1.1.{i}' for i in range(10)]
+    started = time.monotonic()
+    rdns_return = sndslib.list_blocked_ips_rdns(ips, resolver=slow_resolver(default=0.1), workers=1, deadline=0.25)
+    assert time.monotonic() - started < 0.5
+    assert [r['ip'] for r in rdns_return] == ips
+    assert rdns_return[0]['rdns'] == '1.1.1.0.rdns.mock.com'
+    assert rdns_return[-1]['rdns'] == 'NXDOMAIN'
+
+
+def test_iter_data_is_lazy(get_data_http_mock):
+    resp = sndslib.iter_data('test')
+    assert not isinstance(resp, list)
+    assert next(resp).startswith('1.1.1.0,')
+
+
+def test_iter_data_same_as_get_data(get_data_http_mock):
+    assert list(sndslib.iter_data('test')) == sndslib.get_data('test')
+
+
+def test_iter_ip_status_first_value(get_ip_status_http_mock):
+    first_line_resp = '1.1.1.0,1.1.1.1,Yes,Blocked due to user complaints or other evidence of spamming'
+    assert next(sndslib.iter_ip_status('test')) == first_line_resp
+
+
+def test_iter_data_standin_server(snds_standin):
+    resp = list(sndslib.iter_data('test', '092920'))
+    assert len(resp) == 3
+    assert snds_standin.requests == [('/snds/data.aspx', {'key': 'test', 'date': '092920'})]
+
+
+def test_summarize_stream(snds_standin):
+    summary = sndslib.summarize(sndslib.iter_data('test'))
+    assert (summary['ips'], summary['green'], summary['yellow'], summary['red'], summary['traps']) == (3, 1, 1, 1, 107)
+
+
+def test_list_blocked_ips_stream(snds_standin):
+    blocked_ips = sndslib.list_blocked_ips(sndslib.iter_ip_status('test'))
+    assert len(blocked_ips) == 11
+
+
+def test_get_data_range_results(snds_standin):
+    results, errors = sndslib.get_data_range('test', '092820', '093020')
+    assert sorted(results) == ['092820', '092920', '093020']
+    assert errors == {}
+    assert len(results['092920']) == 3
+
+
+def test_get_data_range_single_day(snds_standin):
+    results, errors = sndslib.get_data_range('test', '092920', '092920')
+    assert list(results) == ['092920']
+
+
+def test_get_data_range_end_before_start(snds_standin):
+    with pytest.raises(ValueError):
+        sndslib.get_data_range('test', '093020', '092920')
+    assert snds_standin.requests == []
+
+
+def test_get_data_range_crosses_month(snds_standin):
+    results, _ = sndslib.get_data_range('test', '093020', '100220')
+    assert list(results) == ['093020', '100120', '100220']
+
+
+def test_get_data_range_per_date_errors(snds_standin):
+    snds_standin.routes['/snds/data.aspx'] = lambda params: 500 if params['date'] == '092920' else b'1.1.1.1,,,,,,GREEN'
+    results, errors = sndslib.get_data_range('test', '092820', '093020')
+    assert sorted(results) == ['092820', '093020']
+    assert list(errors) == ['092920']
+    assert errors['092920'].reason.code == 500
+
+
+def test_get_data_range_concurrent_keep_alive(snds_standin):
+    snds_standin.latency = 0.1
+    started = time.monotonic()
+    results, errors = sndslib.get_data_range('test', '090120', '091220', workers=4)
+    elapsed = time.monotonic() - started
+    assert len(results) == 12 and not errors
+    assert elapsed < 0.1 * 12 / 2
+    assert snds_standin.connections <= 4
+
+
+def test_list_blocked_cidrs(get_ip_status_function_mock):
+    assert sndslib.list_blocked_cidrs(get_ip_status_function_mock.return_value) == [
+        '1.1.1.0/31', '1.1.1.3/32', '1.1.1.254/31', '1.1.2.0/31', '1.1.255.255/32', '1.2.0.0/32',
+        '1.255.255.255/32', '2.0.0.0/32',
+    ]
+
+
+def test_filter_window_activity(get_data_function_mock):
+    data = sndslib.get_data('test')
+    assert sndslib.filter_window(data) == data
+    early = sndslib.filter_window(data, end=parse_timestamp('12/31/2019 8:30 AM'))
+    assert [line.split(',')[0] for line in early] == ['1.1.1.0']
+    assert sndslib.filter_window(data, start=parse_timestamp('9/29/2020 9:01 PM')) == []
+
+
+def test_filter_window_trap(get_data_function_mock):
+    data = sndslib.get_data('test') + ['1.1.1.3,9/29/2020 8:00 AM,9/29/2020 9:00 PM,1,1,1,GREEN,< 0.1%,,,0,,,']
+    rows = sndslib.filter_window(data, parse_timestamp('9/29/2020 12:00 PM'), window='trap')
+    assert sndslib.summarize(rows) == {'red': 0, 'green': 1, 'yellow': 1, 'traps': 81, 'ips': 2, 'date': '09/29/2020'}
+    # Linhas sem spamtraps ficam de fora mesmo sem limites
+    assert len(sndslib.filter_window(data, window='trap')) == 3
+
+
+def test_filter_window_skips_malformed_dates(get_data_function_mock):
+    data = sndslib.get_data('test') + ['1.1.1.3,not a date,9/29/2020 9:00 PM,1,1,1,GREEN,< 0.1%,,,0,,,']
+    assert sndslib.filter_window(data) == data[:3]
+
+
+def test_filter_window_invalid_window():
+    with pytest.raises(ValueError):
+        sndslib.filter_window([], window='complaints')
+
+
+def test_iter_blocked_ips_rdns_yields_before_slow_lookups(slow_resolver):
+    resolver = slow_resolver({'1.1.1.3': 0.5})
+    started = time.monotonic()
+    rdns = sndslib.iter_blocked_ips_rdns(['1.1.1.1', '1.1.1.2', '1.1.1.3'], resolver=resolver, workers=3)
+    assert [next(rdns)['ip'], next(rdns)['ip']] == ['1.1.1.1', '1.1.1.2']
+    assert time.monotonic() - started < 0.3
+    assert list(rdns) == [{'ip': '1.1.1.3', 'rdns': '1.1.1.3.rdns.mock.com'}]
+
+
+def test_iter_blocked_ips_rdns_keeps_order_with_cache(tmp_path, slow_resolver):
+    from sndslib.cache import RdnsCache
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    cache.update({'1.1.1.2': 'cached.mock.com'})
+    rdns = sndslib.iter_blocked_ips_rdns(['1.1.1.1', '1.1.1.2', '1.1.1.1'], resolver=slow_resolver(), cache=cache)
+    assert [r['rdns'] for r in rdns] == ['1.1.1.1.rdns.mock.com', 'cached.mock.com', '1.1.1.1.rdns.mock.com']
+    assert cache.load(['1.1.1.1']) == {'1.1.1.1': '1.1.1.1.rdns.mock.com'}
+
+
+def test_iter_blocked_ips_rdns_deadline_keeps_answers_behind_slow_ip(tmp_path, slow_resolver):
+    from sndslib.cache import RdnsCache
+    cache = RdnsCache(str(tmp_path / 'rdns.sqlite3'))
+    cache.update({'1.1.1.3': 'cached.mock.com'})
+    ips = ['1.1.1.1', '1.1.1.2', '1.1.1.3']
+    rdns = sndslib.iter_blocked_ips_rdns(ips, resolver=slow_resolver({'1.1.1.1': 1}), workers=2, deadline=0.3,
+                                         cache=cache)
+    assert [r['rdns'] for r in rdns] == ['NXDOMAIN', '1.1.1.2.rdns.mock.com', 'cached.mock.com']
@@ -0,0 +1,88 @@
+from sndslib.client import SndsClient
+from sndslib.watch import Watcher
+from tests.conftest import DATA_VALUE, IP_STATUS_VALUE
+import threading
+import time
+import json
+import io
+
+
+def test_watcher_first_poll_only_records_the_state(snds_standin):
+    watcher = Watcher('test', callback=None)
+    assert watcher.poll() == []
+    assert watcher.polls == 1
+    assert [path for path, _ in snds_standin.requests] == ['/snds/ipStatus.aspx', '/snds/data.aspx']
+
+
+def test_watcher_skips_unchanged_bodies(snds_standin, mocker):
+    watcher = Watcher('test')
+    state = mocker.spy(watcher, '_state')
+    watcher.poll()
+    assert watcher.poll() == []
+    assert watcher.unchanged == 2
+    assert state.call_count == 2
+
+
+def test_watcher_emits_only_the_changes(snds_standin):
+    watcher = Watcher('test', client=SndsClient(snds_standin.url, retries=0))
+    watcher.poll()
+
+    snds_standin.routes['/snds/ipStatus.aspx'] = IP_STATUS_VALUE + b'\r\n9.9.9.0,9.9.9.3,Yes,spam'
+    snds_standin.routes['/snds/data.aspx'] = DATA_VALUE.replace(b'YELLOW', b'RED')
+    events = watcher.poll()
+    for event in events:
+        assert isinstance(event.pop('time'), int)
+    assert events == [
+        {'kind': 'blocked', 'change': 'added', 'first_ip': '9.9.9.0', 'last_ip': '9.9.9.3'},
+        {'kind': 'ip', 'change': 'changed', 'first_ip': '1.1.1.1', 'last_ip': '1.1.1.1', 'field': 'filter_result',
+         'old': 'YELLOW', 'new': 'RED'},
+    ]
+    assert watcher.unchanged == 0
+
+
+def test_watcher_reports_errors_and_keeps_going(snds_standin):
+    watcher = Watcher('test', client=SndsClient(snds_standin.url, retries=0))
+    watcher.poll()
+    snds_standin.routes['/snds/ipStatus.aspx'] = 500
+    events = watcher.poll()
+    assert [(event['kind'], event['endpoint']) for event in events] == [('error', 'ipStatus.aspx')]
+
+
+def test_watcher_empty_body_is_an_error_until_repeated(snds_standin):
+    watcher = Watcher('test', client=SndsClient(snds_standin.url, retries=0))
+    watcher.poll()
+    snds_standin.routes['/snds/ipStatus.aspx'] = b''
+    events = watcher.poll()
+    assert [(event['kind'], event['error']) for event in events] == [('error', 'empty response')]
+
+    # Uma falha transitória: a volta dos mesmos dados não gera nenhum evento
+    snds_standin.routes['/snds/ipStatus.aspx'] = IP_STATUS_VALUE
+    assert watcher.poll() == []
+
+    # Vazio duas vezes seguidas: aceito como o novo estado
+    snds_standin.routes['/snds/ipStatus.aspx'] = b''
+    watcher.poll()
+    events = watcher.poll()
+    assert [event['change'] for event in events] == ['removed'] * 5
+
+
+def test_watcher_run_writes_ndjson(snds_standin, mocker):
+    stream = io.StringIO()
+    mocker.patch('sys.stdout', stream)
+    bodies = iter([DATA_VALUE, DATA_VALUE.replace(b'GREEN', b'YELLOW')])
+    snds_standin.routes['/snds/data.aspx'] = lambda params: next(bodies)
+
+    Watcher('test', interval=0).run(polls=2)
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(event['first_ip'], event['old'], event['new']) for event in events] == [('1.1.1.0', 'GREEN', 'YELLOW')]
+
+
+def test_watcher_stop_interrupts_the_wait(snds_standin):
+    watcher = Watcher('test', interval=60)
+    thread = threading.Thread(target=watcher.run)
+    thread.start()
+    while not watcher.polls:
+        time.sleep(0.01)
+    watcher.stop()
+    thread.join(5)
+    assert not thread.is_alive()